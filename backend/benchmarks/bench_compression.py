@@ -0,0 +1,104 @@
+"""
+Measure the bytes and time response compression saves on realistic guide payloads.
+
+Payloads are full template-engine guides over varied assessments: one
+guide, and profile history pages of 10 and 50 guides. For each available
+encoding the first table shows compressed size, compression time and the
+transfer time saved at --mbps; the second times requests through the app
+in-process, where repeats of a guide are served from the compressed
+variant cache.
+
+Run from the backend directory:
+    python -m benchmarks.bench_compression --mbps 10
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+os.environ["STORAGE_BACKEND"] = os.getenv("STORAGE_BACKEND", "memory")
+
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+import httpx
+from benchmarks.bench_guide_concurrency import sample_inputs
+from main import app
+from services.Compression import ENCODERS, compress
+from services.GroqService import GroqService
+from services.LLMBackend import FakeBackend
+from services.Storage import guides
+from shared.constants import CauseOfDeath, Relationship, TimeSinceLoss
+
+PROFILE_ID = "profile_bench"
+
+def store_guides(count: int):
+    service = GroqService(FakeBackend(), mode="template")
+    profile, base = sample_inputs()
+    combinations = itertools.cycle(itertools.product(Relationship, CauseOfDeath, TimeSinceLoss))
+    guide_ids = []
+    for index, (relationship, cause, since) in zip(range(count), combinations):
+        assessment = base.model_copy(update={"relationship": relationship, "cause_of_death": cause, "time_since_loss": since})
+        guide = service.build_guide(service.templates.sections(profile, assessment),
+                                    guide_id=f"guide_bench_{index}", profile_id=PROFILE_ID)
+        guides.add(guide.id, guide, profile_id=PROFILE_ID, created_at=guide.created_at)
+        guide_ids.append(guide.id)
+    return guide_ids
+
+def timed(func, repeat: int) -> float:
+    """Median seconds per call"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+async def request_latency(client: httpx.AsyncClient, path: str, encoding: str, repeat: int) -> float:
+    headers = {"Accept-Encoding": encoding}
+    await client.get(path, headers=headers)  # Fill the compressed variant cache
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await client.get(path, headers=headers)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+async def main(mbps: float, repeat: int):
+    guide_ids = store_guides(50)
+    payloads = {
+        "1 guide": f"/api/v1/guide/{guide_ids[0]}",
+        "10 guides": f"/api/v1/guides/profile/{PROFILE_ID}?limit=10",
+        "50 guides": f"/api/v1/guides/profile/{PROFILE_ID}?limit=50"
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        bodies = {label: (await client.get(path, headers={"Accept-Encoding": "identity"})).content
+                  for label, path in payloads.items()}
+
+        bytes_per_second = mbps * 1e6 / 8
+        print(f"{'payload':<10} {'encoding':<9} {'bytes':>8} {'ratio':>6} {'compress':>10} {'transfer saved':>15}")
+        for label, body in bodies.items():
+            print(f"{label:<10} {'identity':<9} {len(body):8d} {1:6.2f} {'':>10} {'':>15}")
+            for encoding in ENCODERS:
+                compressed = compress(encoding, body)
+                seconds = timed(lambda: compress(encoding, body), repeat)
+                saved = (len(body) - len(compressed)) / bytes_per_second
+                print(f"{'':<10} {encoding:<9} {len(compressed):8d} {len(body) / len(compressed):6.2f} "
+                      f"{seconds * 1000:8.2f}ms {saved * 1000:13.1f}ms")
+
+        print()
+        print(f"{'payload':<10} " + " ".join(f"{encoding:>10}" for encoding in ["identity", *ENCODERS]) + "   (ms per request, in-process)")
+        for label, path in payloads.items():
+            latencies = [await request_latency(client, path, encoding, repeat) for encoding in ["identity", *ENCODERS]]
+            print(f"{label:<10} " + " ".join(f"{latency * 1000:10.2f}" for latency in latencies))
+
+    for guide_id in guide_ids:
+        guides.delete(guide_id)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mbps", type=float, default=10, help="Client bandwidth for the transfer time estimate")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed repetitions per measurement")
+    args = parser.parse_args()
+    asyncio.run(main(args.mbps, args.repeat))
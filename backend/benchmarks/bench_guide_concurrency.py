@@ -0,0 +1,53 @@
+"""
+Compare sequential and concurrent guide generation against the in-process fake backend.
+
+Run from the backend directory:
+    python -m benchmarks.bench_guide_concurrency --latency 0.3 --runs 5
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import asyncio
+import time
+from models.ProfileModel import ProfileModel
+from models.AssessmentModel import AssessmentModel
+from services.GroqService import GroqService
+from services.LLMBackend import FakeBackend, LatencyDistribution
+from services.RateLimitedClient import RateLimiter
+
+def sample_inputs():
+    profile = ProfileModel(**ProfileModel.model_config["json_schema_extra"]["example"])
+    assessment = AssessmentModel(**AssessmentModel.model_config["json_schema_extra"]["example"])
+    return profile, assessment
+
+async def generate_sequentially(service: GroqService, profile: ProfileModel, assessment: AssessmentModel):
+    """The pre-concurrency behaviour: one section after another"""
+    await service.generate_overview(profile, assessment)
+    await service.generate_routine(profile, assessment)
+    await service.generate_questions(assessment)
+    await service.generate_resources(profile, assessment)
+    await service.analyze_mood(assessment.story)
+
+async def time_runs(label: str, runs: int, func) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        await func()
+    elapsed = (time.perf_counter() - start) / runs
+    print(f"{label:<12} {elapsed * 1000:8.1f} ms/guide")
+    return elapsed
+
+async def main(latency: float, runs: int):
+    service = GroqService(FakeBackend(latency=LatencyDistribution(f"fixed:{latency}")), mode="multi", limiter=RateLimiter())
+    profile, assessment = sample_inputs()
+    sequential = await time_runs("sequential", runs, lambda: generate_sequentially(service, profile, assessment))
+    concurrent = await time_runs("concurrent", runs, lambda: service.generate_guide(profile, assessment))
+    print(f"speedup      {sequential / concurrent:8.2f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake latency per completion in seconds")
+    parser.add_argument("--runs", type=int, default=5, help="Guides generated per mode")
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.runs))
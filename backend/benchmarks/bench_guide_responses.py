@@ -0,0 +1,96 @@
+"""
+Compare guide read endpoints serving models through response_model with serving stored JSON bytes.
+
+"before" re-validates each stored guide into a GuideModel and lets FastAPI
+serialize it again; "after" is the app's own routes, which send the JSON
+encoded when the guide was stored; "304" repeats the request with the
+ETag it returned. Requests go through the full ASGI app in-process, one at
+a time.
+
+Run from the backend directory:
+    python -m benchmarks.bench_guide_responses --guides 50 --seconds 3
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+os.environ["STORAGE_BACKEND"] = os.getenv("STORAGE_BACKEND", "memory")
+
+import argparse
+import asyncio
+import time
+from typing import List
+import httpx
+from fastapi import FastAPI, HTTPException
+from benchmarks.bench_guide_concurrency import sample_inputs
+from models.GuideModel import GuideModel
+from routers.guide_router import router
+from services.GroqService import GroqService
+from services.LLMBackend import FakeBackend
+from services.Storage import guides
+
+PROFILE_ID = "profile_bench"
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(router, prefix="/after")
+
+    @app.get("/before/guide/{guide_id}", response_model=GuideModel)
+    async def get_guide_before(guide_id: str):
+        guide = guides.get(guide_id)
+        if guide is None:
+            raise HTTPException(status_code=404, detail="Guide not found")
+        return guide
+
+    @app.get("/before/guides/profile/{profile_id}", response_model=List[GuideModel])
+    async def get_profile_guides_before(profile_id: str, limit: int = 50):
+        return guides.page_by_profile(profile_id, limit)[0]
+
+    return app
+
+def store_guides(count: int) -> List[str]:
+    service = GroqService(FakeBackend(), mode="template")
+    profile, assessment = sample_inputs()
+    guide_ids = []
+    for index in range(count):
+        guide = service.build_guide(service.templates.sections(profile, assessment),
+                                    guide_id=f"guide_bench_{index}", profile_id=PROFILE_ID)
+        guides.add(guide.id, guide, profile_id=PROFILE_ID, created_at=guide.created_at)
+        guide_ids.append(guide.id)
+    return guide_ids
+
+async def rate(client: httpx.AsyncClient, url: str, seconds: float, revalidate: bool = False) -> float:
+    first = await client.get(url)
+    headers = {"If-None-Match": first.headers["etag"]} if revalidate else {}
+    status, body = (304, b"") if revalidate else (200, first.content)
+    requests = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        response = await client.get(url, headers=headers)
+        assert response.status_code == status and response.content == body
+        requests += 1
+    return requests / (time.perf_counter() - start)
+
+async def main(count: int, seconds: float):
+    guide_ids = store_guides(count)
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, path in (("GET guide", f"/guide/{guide_ids[0]}"),
+                            (f"GET {count} guides", f"/guides/profile/{PROFILE_ID}?limit={count}")):
+            before_response = await client.get(f"/before{path}")
+            after_response = await client.get(f"/after{path}")
+            assert before_response.json() == after_response.json()
+            before = await rate(client, f"/before{path}", seconds)
+            after = await rate(client, f"/after{path}", seconds)
+            revalidated = await rate(client, f"/after{path}", seconds, revalidate=True)
+            print(f"{label:<16} before {before:8.0f} req/s   after {after:8.0f} req/s   {after / before:5.2f}x   "
+                  f"304 {revalidated:8.0f} req/s   {len(after_response.content):8d} bytes")
+
+    for guide_id in guide_ids:
+        guides.delete(guide_id)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guides", type=int, default=50, help="Guides in the listed page")
+    parser.add_argument("--seconds", type=float, default=3, help="Seconds to run each endpoint for")
+    args = parser.parse_args()
+    asyncio.run(main(args.guides, args.seconds))
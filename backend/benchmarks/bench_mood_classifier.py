@@ -0,0 +1,76 @@
+"""
+Accuracy, latency and batch throughput of the lexicon MoodClassifier on a labelled fixture set.
+
+Run from the backend directory:
+    python -m benchmarks.bench_mood_classifier
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import json
+import time
+from services.MoodClassifier import MoodClassifier
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "mood_samples.json")
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def throughput(samples, classifier: MoodClassifier, batch_size: int):
+    texts = [samples[i % len(samples)]["text"] for i in range(batch_size)]
+
+    start = time.perf_counter()
+    for text in texts:
+        classifier.classify(text)
+    one_by_one = batch_size / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    classifier.classify_batch(texts)
+    batched = batch_size / (time.perf_counter() - start)
+
+    print(f"one by one            {one_by_one:,.0f} texts/s")
+    print(f"classify_batch        {batched:,.0f} texts/s ({batch_size:,} texts)")
+
+def main(repeat: int, threshold: float, verbose: bool, batch_size: int):
+    with open(FIXTURES, 'r') as f:
+        samples = json.load(f)
+    classifier = MoodClassifier()
+
+    correct = confident = confident_correct = 0
+    for sample in samples:
+        result = classifier.classify(sample["text"])
+        hit = result["mood"] == sample["mood"]
+        correct += hit
+        if result["confidence"] >= threshold:
+            confident += 1
+            confident_correct += hit
+        elif verbose:
+            print(f"low confidence {result}: {sample['text']}")
+
+    latencies = []
+    for _ in range(repeat):
+        for sample in samples:
+            start = time.perf_counter()
+            classifier.classify(sample["text"])
+            latencies.append(time.perf_counter() - start)
+
+    print(f"samples               {len(samples)}")
+    print(f"accuracy              {correct / len(samples):.1%}")
+    print(f"answered locally      {confident / len(samples):.1%} (confidence >= {threshold})")
+    print(f"accuracy when local   {confident_correct / max(confident, 1):.1%}")
+    print(f"latency p50           {percentile(latencies, 0.50) * 1e6:.1f} us")
+    print(f"latency p99           {percentile(latencies, 0.99) * 1e6:.1f} us")
+    throughput(samples, classifier, batch_size)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="Timing passes over the fixture set")
+    parser.add_argument("--threshold", type=float, default=float(os.getenv("MOOD_CONFIDENCE_THRESHOLD", "0.5")),
+                        help="Confidence needed to skip the LLM")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Texts per throughput run")
+    parser.add_argument("--verbose", action="store_true", help="Print low-confidence samples")
+    args = parser.parse_args()
+    main(args.repeat, args.threshold, args.verbose, args.batch_size)
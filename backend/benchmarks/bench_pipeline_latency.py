@@ -0,0 +1,70 @@
+"""
+Measure end-to-end guide latency percentiles offline, against the fake backend.
+
+Guides are generated by a number of concurrent users through the full
+GroqService pipeline (rate limiter, retries, parsing, template fallbacks)
+while the fake backend draws per-call latencies from a distribution and
+injects failures, so production tail latency can be reproduced without
+network access or an API key.
+
+Run from the backend directory:
+    python -m benchmarks.bench_pipeline_latency --latency lognormal:0.6,0.5 --error-rate 0.05 --users 16 --guides 200
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import asyncio
+import statistics
+import time
+from benchmarks.bench_guide_concurrency import sample_inputs
+from services.GroqService import GroqService
+from services.LLMBackend import FakeBackend, LatencyDistribution
+from services.RateLimitedClient import RateLimiter
+
+def percentile(values, q: float) -> float:
+    return values[int(q * (len(values) - 1))]
+
+async def main(args):
+    backend = FakeBackend(latency=LatencyDistribution(args.latency), tokens_per_second=args.tokens_per_second,
+                          error_rate=args.error_rate, retry_after=0.1, seed=args.seed)
+    service = GroqService(backend, mode=args.mode, limiter=RateLimiter(max_concurrency=args.concurrency))
+    service.llm.backoff_base, service.llm.backoff_cap = 0.05, 1.0
+    profile, assessment = sample_inputs()
+    remaining = iter(range(args.guides))
+    timings = []
+
+    async def user():
+        for _ in remaining:
+            start = time.perf_counter()
+            await service.generate_guide(profile, assessment)
+            timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(args.users)))
+    elapsed = time.perf_counter() - start
+
+    timings.sort()
+    llm = service.llm.stats()
+    print(f"guides       {len(timings)} by {args.users} users in {elapsed:.2f} s ({len(timings) / elapsed:.1f}/s)")
+    print(f"p50          {statistics.median(timings) * 1000:8.1f} ms/guide")
+    print(f"p95          {percentile(timings, 0.95) * 1000:8.1f} ms/guide")
+    print(f"p99          {percentile(timings, 0.99) * 1000:8.1f} ms/guide")
+    print(f"max          {timings[-1] * 1000:8.1f} ms/guide")
+    print(f"completions  {llm['calls']} calls, {llm['retries']} retries, {llm['failures']} failures, "
+          f"{backend.errors} injected errors")
+    print(f"fallbacks    {dict(service.template_fallbacks)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", default="lognormal:0.6,0.5", help="Per-call latency distribution, e.g. fixed:0.3, "
+                        "uniform:0.1,0.5, lognormal:0.6,0.5 or empirical:latencies.json")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Completion tokens generated per second; 0 for instant")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Share of completions failed with a 429")
+    parser.add_argument("--mode", default="multi", choices=["multi", "single"], help="Guide generation mode")
+    parser.add_argument("--users", type=int, default=16, help="Concurrent users generating guides")
+    parser.add_argument("--guides", type=int, default=200, help="Guides generated in total")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent completions allowed by the limiter")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of the fake backend")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,72 @@
+"""
+Measure what prompt token budgets save on a guide with a very long story.
+
+The story is built from the mood fixtures, repeated to the requested size.
+The fake backend charges per prompt token, so trimmed prompts are faster
+as well as cheaper.
+
+Run from the backend directory:
+    python -m benchmarks.bench_prompt_budget --story-tokens 6000 --prompt-tokens-per-second 5000
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import asyncio
+import json
+import time
+from benchmarks.bench_guide_concurrency import sample_inputs
+from services import PromptBudget
+from services.GroqService import GroqService
+from services.LLMBackend import FakeBackend, LatencyDistribution
+from services.PromptBudget import TokenUsage, count_tokens, current_usage, fit
+from services.RateLimitedClient import RateLimiter
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "mood_samples.json")
+
+def long_story(tokens: int) -> str:
+    with open(FIXTURES) as f:
+        sentences = [sample["text"] for sample in json.load(f)]
+    story = []
+    while count_tokens(" ".join(story)) < tokens:
+        story.extend(sentences)
+    return " ".join(story)
+
+async def run(label: str, story: str, latency: float, prompt_tokens_per_second: float):
+    profile, assessment = sample_inputs()
+    assessment = assessment.model_copy(update={"story": story})
+    backend = FakeBackend(latency=LatencyDistribution(f"fixed:{latency}"), prompt_tokens_per_second=prompt_tokens_per_second)
+    service = GroqService(backend, mode="multi", limiter=RateLimiter())
+    usage = TokenUsage()
+    token = current_usage.set(usage)
+    try:
+        start = time.perf_counter()
+        await service.generate_guide(profile, assessment)
+        elapsed = time.perf_counter() - start
+    finally:
+        current_usage.reset(token)
+    print(f"{label:<10} {elapsed * 1000:8.1f} ms/guide  {usage.prompt_tokens:7d} prompt tokens  "
+          f"{usage.completion_tokens:5d} completion tokens  {usage.tokens_saved:7d} tokens saved")
+
+async def main(story_tokens: int, latency: float, prompt_tokens_per_second: float):
+    story = long_story(story_tokens)
+    budgets = dict(PromptBudget.PROMPT_BUDGETS)
+
+    start = time.perf_counter()
+    fit.cache_clear()
+    fit(story, budgets["overview"])
+    print(f"story      {count_tokens(story)} tokens, summarized to {budgets['overview']} in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    PromptBudget.PROMPT_BUDGETS.update({name: 10 ** 9 for name in budgets})
+    await run("unbudgeted", story, latency, prompt_tokens_per_second)
+    PromptBudget.PROMPT_BUDGETS.update(budgets)
+    await run("budgeted", story, latency, prompt_tokens_per_second)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--story-tokens", type=int, default=6000, help="Approximate length of the story")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake latency per call in seconds")
+    parser.add_argument("--prompt-tokens-per-second", type=float, default=5000, help="Fake prompt processing speed")
+    args = parser.parse_args()
+    asyncio.run(main(args.story_tokens, args.latency, args.prompt_tokens_per_second))
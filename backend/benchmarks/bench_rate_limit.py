@@ -0,0 +1,84 @@
+"""
+Exercise the rate-limited client against the fake Groq server.
+
+Runs the same burst of completions through the bare backend and through
+RateLimitedClient while the server injects failures, then measures how long
+interactive calls wait when they arrive behind a queue of batch calls.
+
+Run from the backend directory:
+    python -m benchmarks.bench_rate_limit --calls 60 --error-rate 0.2 --latency 0.05
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+import uvicorn
+from benchmarks.fake_groq_server import create_app
+from services.LLMBackend import FakeBackend, GroqBackend, LatencyDistribution
+from services.RateLimitedClient import BATCH_PRIORITY, RateLimitedClient, RateLimiter, priority
+
+MESSAGES = [{"role": "user", "content": "Create a structured weekly routine for someone grieving."}]
+
+def start_server(port: int, backend: FakeBackend) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(create_app(backend), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+async def run_burst(label: str, create, calls: int):
+    async def one():
+        try:
+            await create()
+            return True
+        except Exception:
+            return False
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(calls)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<14} {sum(results):4d}/{calls} succeeded in {elapsed:6.2f} s")
+
+async def run_priorities(client: RateLimitedClient, batch_calls: int, interactive_calls: int):
+    """Queue batch calls, then add interactive ones and compare their latencies"""
+    async def timed(level: int):
+        start = time.perf_counter()
+        with priority(level):
+            await client.complete(messages=MESSAGES)
+        return time.perf_counter() - start
+
+    batch = [asyncio.ensure_future(timed(BATCH_PRIORITY)) for _ in range(batch_calls)]
+    await asyncio.sleep(0.01)
+    interactive = await asyncio.gather(*(timed(0) for _ in range(interactive_calls)))
+    batch = await asyncio.gather(*batch)
+    print(f"interactive    p50 {statistics.median(interactive) * 1000:7.1f} ms  ({interactive_calls} calls)")
+    print(f"batch          p50 {statistics.median(batch) * 1000:7.1f} ms  ({batch_calls} calls)")
+
+async def main(port: int, calls: int, concurrency: int):
+    raw = GroqBackend(model="fake", api_key="fake", base_url=f"http://127.0.0.1:{port}")
+    limited = RateLimitedClient(raw, RateLimiter(max_concurrency=concurrency), backoff_base=0.05, backoff_cap=0.5)
+
+    await run_burst("bare backend", lambda: raw.complete(MESSAGES), calls)
+    await run_burst("rate limited", lambda: limited.complete(MESSAGES), calls)
+    print(f"client stats   {limited.stats()}")
+    await run_priorities(limited, batch_calls=calls, interactive_calls=max(1, calls // 10))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8101)
+    parser.add_argument("--calls", type=int, default=60, help="Completions per burst")
+    parser.add_argument("--error-rate", type=float, default=0.2, help="Share of calls the server fails with 429")
+    parser.add_argument("--latency", type=float, default=0.05, help="Server latency per call in seconds")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent completions allowed by the limiter")
+    args = parser.parse_args()
+    server = start_server(args.port, FakeBackend(latency=LatencyDistribution(f"fixed:{args.latency}"),
+                                                 error_rate=args.error_rate, retry_after=0.1))
+    try:
+        asyncio.run(main(args.port, args.calls, args.concurrency))
+    finally:
+        server.should_exit = True
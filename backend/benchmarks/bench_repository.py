@@ -0,0 +1,61 @@
+"""
+Compare read/write throughput of the in-memory dicts and the SQLite repository.
+
+Run from the backend directory:
+    python -m benchmarks.bench_repository --sizes 10000,100000,1000000
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import random
+import tempfile
+import time
+from models.ProfileModel import ProfileModel
+from services.Repository import InMemoryRepository, SQLiteRepository
+
+RECORDS_PER_PROFILE = 10
+
+def sample_profile() -> ProfileModel:
+    return ProfileModel(**ProfileModel.model_config["json_schema_extra"]["example"])
+
+def rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:12,.0f}/s"
+
+def run(label: str, repository, size: int, reads: int):
+    record = sample_profile()
+    record_ids = [f"record_{i}" for i in range(size)]
+
+    start = time.perf_counter()
+    for i, record_id in enumerate(record_ids):
+        repository.add(record_id, record, profile_id=f"profile_{i // RECORDS_PER_PROFILE}")
+    write_time = time.perf_counter() - start
+
+    lookups = random.sample(record_ids, min(reads, size))
+    start = time.perf_counter()
+    for record_id in lookups:
+        repository.get(record_id)
+    read_time = time.perf_counter() - start
+
+    profile_ids = [f"profile_{random.randrange(size // RECORDS_PER_PROFILE)}" for _ in range(min(reads, size) // RECORDS_PER_PROFILE)]
+    start = time.perf_counter()
+    for profile_id in profile_ids:
+        repository.list_by_profile(profile_id)
+    list_time = time.perf_counter() - start
+
+    print(f"{label:<8} {size:>9,}  writes {rate(size, write_time)}  "
+          f"reads {rate(len(lookups), read_time)}  profile lists {rate(len(profile_ids), list_time)}")
+
+def main(sizes, reads: int):
+    for size in sizes:
+        run("dict", InMemoryRepository(ProfileModel), size, reads)
+        with tempfile.TemporaryDirectory() as directory:
+            run("sqlite", SQLiteRepository(ProfileModel, "profiles", os.path.join(directory, "bench.db")), size, reads)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated record counts")
+    parser.add_argument("--reads", type=int, default=10000, help="Random lookups per size")
+    args = parser.parse_args()
+    main([int(size) for size in args.sizes.split(",")], args.reads)
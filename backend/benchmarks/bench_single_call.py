@@ -0,0 +1,45 @@
+"""
+Compare token use and latency of the multi-call and single-call guide modes.
+
+The fake backend charges a fixed latency per call plus a per-token generation
+time, so the single call pays less overhead but generates one long reply.
+
+Run from the backend directory:
+    python -m benchmarks.bench_single_call --latency 0.3 --tokens-per-second 500
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import asyncio
+import time
+from benchmarks.bench_guide_concurrency import sample_inputs
+from services.GroqService import GroqService
+from services.LLMBackend import FakeBackend, LatencyDistribution
+from services.RateLimitedClient import RateLimiter
+
+async def run_mode(mode: str, latency: float, tokens_per_second: float, runs: int):
+    backend = FakeBackend(latency=LatencyDistribution(f"fixed:{latency}"), tokens_per_second=tokens_per_second)
+    service = GroqService(backend, mode=mode, limiter=RateLimiter())
+    profile, assessment = sample_inputs()
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        await service.generate_guide(profile, assessment)
+    elapsed = (time.perf_counter() - start) / runs
+
+    print(f"{mode:<8} {elapsed * 1000:8.1f} ms/guide  {backend.calls / runs:4.1f} calls  "
+          f"{backend.prompt_tokens / runs:7.0f} prompt tokens  {backend.completion_tokens / runs:7.0f} completion tokens")
+
+async def main(latency: float, tokens_per_second: float, runs: int):
+    for mode in ("multi", "single"):
+        await run_mode(mode, latency, tokens_per_second, runs)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake latency per call in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=500, help="Fake generation speed in completion tokens")
+    parser.add_argument("--runs", type=int, default=3, help="Guides generated per mode")
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.tokens_per_second, args.runs))
@@ -0,0 +1,48 @@
+"""
+Time the offline template engine over every relationship / cause / time-since-loss combination.
+
+Each combination is built into a full GuideModel, so every template must
+produce a valid guide.
+
+Run from the backend directory:
+    python -m benchmarks.bench_template_engine --rounds 20
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import itertools
+import statistics
+import time
+from benchmarks.bench_guide_concurrency import sample_inputs
+from services.GroqService import GroqService
+from services.LLMBackend import FakeBackend
+from services.RateLimitedClient import RateLimiter
+from shared.constants import CauseOfDeath, Relationship, TimeSinceLoss
+
+def assessments():
+    profile, base = sample_inputs()
+    for relationship, cause, since in itertools.product(Relationship, CauseOfDeath, TimeSinceLoss):
+        yield profile, base.model_copy(update={"relationship": relationship, "cause_of_death": cause, "time_since_loss": since})
+
+def main(rounds: int):
+    service = GroqService(FakeBackend(), mode="template", limiter=RateLimiter())
+    inputs = list(assessments())
+    timings = []
+    for _ in range(rounds):
+        for profile, assessment in inputs:
+            start = time.perf_counter()
+            service.build_guide(service.templates.sections(profile, assessment))
+            timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    print(f"guides       {len(timings)} ({len(inputs)} combinations x {rounds} rounds)")
+    print(f"p50          {statistics.median(timings) * 1e6:8.1f} us/guide")
+    print(f"p99          {timings[int(0.99 * (len(timings) - 1))] * 1e6:8.1f} us/guide")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20, help="Passes over all combinations")
+    args = parser.parse_args()
+    main(args.rounds)
@@ -0,0 +1,98 @@
+"""
+Local stand-in for the Groq chat completions API, serving a FakeBackend over HTTP.
+
+Point the real client at it with GROQ_BASE_URL, e.g.:
+    python -m benchmarks.fake_groq_server --port 8100 --latency lognormal:0.6,0.5 --error-rate 0.2 --rpm 60
+    GROQ_BASE_URL=http://127.0.0.1:8100 uvicorn main:app
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import json
+import time
+import uuid
+from collections import deque
+from typing import Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from services.LLMBackend import FakeBackend, FakeLLMError, LatencyDistribution
+
+def create_app(backend: Optional[FakeBackend] = None, rpm: int = 0, retry_after: float = 1.0) -> FastAPI:
+    """
+    Build the fake API.
+
+    Latency, token throughput, injected failures and replies come from
+    `backend`. Once more than `rpm` calls arrive within a minute (if set)
+    the rest get a 429 asking to retry after `retry_after` seconds.
+    """
+    app = FastAPI()
+    backend = backend or FakeBackend()
+    recent = deque()
+    app.state.counts = {"requests": 0, "errors": 0, "rate_limited": 0}
+
+    def error(status: int, headers: dict) -> JSONResponse:
+        return JSONResponse({"error": {"message": "Injected failure", "type": "fake_error"}}, status_code=status, headers=headers)
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.counts["requests"] += 1
+
+        now = time.monotonic()
+        while recent and recent[0] < now - 60:
+            recent.popleft()
+        if rpm and len(recent) >= rpm:
+            app.state.counts["rate_limited"] += 1
+            return error(429, {"retry-after": str(retry_after)})
+        recent.append(now)
+
+        try:
+            response = await backend.complete(body["messages"])
+        except FakeLLMError as e:
+            app.state.counts["errors"] += 1
+            return error(e.status_code, e.response.headers)
+
+        usage = response.usage
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", backend.model),
+            "system_fingerprint": None,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": response.choices[0].message.content},
+                         "finish_reason": "stop", "logprobs": None}],
+            "usage": {"prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens,
+                      "total_tokens": usage.total_tokens}
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return app.state.counts
+
+    return app
+
+if __name__ == "__main__":
+    import uvicorn
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", default="fixed:0.1", help="Latency distribution, e.g. fixed:0.1, uniform:0.1,0.5, "
+                        "lognormal:0.6,0.5 or empirical:latencies.json")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Completion tokens generated per second; 0 for instant")
+    parser.add_argument("--prompt-tokens-per-second", type=float, default=0.0, help="Prompt tokens read per second; 0 for instant")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls that fail")
+    parser.add_argument("--error-status", type=int, default=429, help="Status code of injected failures")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--rpm", type=int, default=0, help="Calls allowed per minute; 0 for unlimited")
+    parser.add_argument("--outputs", help="JSON file of canned replies keyed by prompt prefix")
+    args = parser.parse_args()
+
+    outputs = None
+    if args.outputs:
+        with open(args.outputs) as f:
+            outputs = json.load(f)
+    backend = FakeBackend(latency=LatencyDistribution(args.latency), tokens_per_second=args.tokens_per_second,
+                          prompt_tokens_per_second=args.prompt_tokens_per_second, error_rate=args.error_rate,
+                          error_status=args.error_status, retry_after=args.retry_after, outputs=outputs)
+    uvicorn.run(create_app(backend, args.rpm, args.retry_after), host="127.0.0.1", port=args.port)
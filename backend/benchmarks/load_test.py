@@ -0,0 +1,275 @@
+"""
+End-to-end HTTP load test of the API.
+
+Virtual users drive the real app over HTTP with a weighted mix of profile
+creation, assessment submission, guide generation, guide listing, guide
+reads and guide deletion. Each user keeps the ids it created, and runs a
+prerequisite step first when an operation needs one it does not have yet.
+Unless --url points at a running server, the app is started under uvicorn
+in a subprocess with the fake LLM backend and in-memory storage, so the
+test runs offline.
+
+Throughput and p50/p95/p99 latency per endpoint are printed and saved as
+JSON; --baseline compares them with an earlier run.
+
+Run from the backend directory:
+    python -m benchmarks.load_test --users 32 --duration 30 --output results.json
+    python -m benchmarks.load_test --users 32 --duration 30 --baseline results.json
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import socket
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import httpx
+from models.AssessmentModel import AssessmentModel
+from models.ProfileModel import ProfileModel
+from shared.constants import CauseOfDeath, Relationship, TimeSinceLoss
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MIX = "profile=1,assessment=2,guide=2,list=4,get=4,delete=1"
+PROFILE = ProfileModel.model_config["json_schema_extra"]["example"]
+ASSESSMENT = AssessmentModel.model_config["json_schema_extra"]["example"]
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name}; choose from {', '.join(OPERATIONS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+def percentile(values: List[float], q: float) -> float:
+    return values[int(q * (len(values) - 1))]
+
+class Recorder:
+    """Latencies and failures per endpoint"""
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Send a request, timing it under `endpoint`; None if it failed"""
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        self.latencies[endpoint].append(time.perf_counter() - start)
+        if response is None or response.status_code >= 400:
+            self.errors[endpoint] += 1
+            return None
+        return response
+
+    def summary(self, elapsed: float) -> Dict[str, Dict[str, Any]]:
+        endpoints = {}
+        for endpoint, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            endpoints[endpoint] = {
+                "requests": len(latencies),
+                "errors": self.errors[endpoint],
+                "throughput": round(len(latencies) / elapsed, 2),
+                "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+                "max_ms": round(latencies[-1] * 1000, 2)
+            }
+        return endpoints
+
+class VirtualUser:
+    """One simulated user and the records it has created"""
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.profile_id: Optional[str] = None
+        self.assessment_ids: List[str] = []
+        self.guide_ids: List[str] = []
+
+    async def create_profile(self):
+        response = await self.recorder.request(self.client, "POST /profile", "POST", "/api/v1/profile", json=PROFILE)
+        if response is not None:
+            self.profile_id = response.json()["profile_id"]
+
+    async def submit_assessment(self):
+        if self.profile_id is None:
+            return await self.create_profile()
+        # Vary the inputs so guide generation is not served entirely from the section cache
+        assessment = {
+            **ASSESSMENT,
+            "relationship": self.rng.choice(list(Relationship)).value,
+            "cause_of_death": self.rng.choice(list(CauseOfDeath)).value,
+            "time_since_loss": self.rng.choice(list(TimeSinceLoss)).value,
+            "story": f"{ASSESSMENT['story']} It has been {self.rng.randint(1, 10 ** 6)} minutes."
+        }
+        response = await self.recorder.request(self.client, "POST /assessment", "POST", "/api/v1/assessment",
+                                               json=assessment, params={"profile_id": self.profile_id})
+        if response is not None:
+            self.assessment_ids.append(response.json()["assessment_id"])
+
+    async def generate_guide(self):
+        if not self.assessment_ids:
+            return await self.submit_assessment()
+        response = await self.recorder.request(
+            self.client, "POST /generate-guide", "POST", "/api/v1/generate-guide",
+            params={"profile_id": self.profile_id, "assessment_id": self.assessment_ids.pop()}
+        )
+        if response is not None:
+            self.guide_ids.append(response.json()["id"])
+
+    async def list_guides(self):
+        if self.profile_id is None:
+            return await self.create_profile()
+        await self.recorder.request(self.client, "GET /guides/profile/{id}", "GET", f"/api/v1/guides/profile/{self.profile_id}")
+
+    async def get_guide(self):
+        if not self.guide_ids:
+            return await self.generate_guide()
+        await self.recorder.request(self.client, "GET /guide/{id}", "GET", f"/api/v1/guide/{self.rng.choice(self.guide_ids)}")
+
+    async def delete_guide(self):
+        if not self.guide_ids:
+            return await self.generate_guide()
+        guide_id = self.guide_ids.pop(self.rng.randrange(len(self.guide_ids)))
+        await self.recorder.request(self.client, "DELETE /guide/{id}", "DELETE", f"/api/v1/guide/{guide_id}")
+
+OPERATIONS = {
+    "profile": VirtualUser.create_profile,
+    "assessment": VirtualUser.submit_assessment,
+    "guide": VirtualUser.generate_guide,
+    "list": VirtualUser.list_guides,
+    "get": VirtualUser.get_guide,
+    "delete": VirtualUser.delete_guide
+}
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(port: int, llm_latency: str) -> subprocess.Popen:
+    """Run the app under uvicorn, offline unless the environment says otherwise"""
+    env = {
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY": llm_latency,
+        "STORAGE_BACKEND": "memory",
+        "GROQ_REQUESTS_PER_MINUTE": "0",
+        "GROQ_TOKENS_PER_MINUTE": "0",
+        **os.environ
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return server
+        except httpx.HTTPError:
+            if server.poll() is not None:
+                raise RuntimeError("The server exited during startup")
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("The server did not start within 30 seconds")
+
+async def run(url: str, users: int, duration: float, mix: Dict[str, float], seed: int) -> Dict[str, Any]:
+    recorder = Recorder()
+    names, weights = list(mix), list(mix.values())
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120) as client:
+        async def user(index: int):
+            rng = random.Random(seed + index)
+            virtual_user = VirtualUser(client, recorder, rng)
+            while time.perf_counter() < deadline:
+                await OPERATIONS[rng.choices(names, weights)[0]](virtual_user)
+
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(user(index) for index in range(users)))
+        elapsed = time.perf_counter() - start
+
+    endpoints = recorder.summary(elapsed)
+    total = sum(endpoint["requests"] for endpoint in endpoints.values())
+    return {
+        "elapsed_seconds": round(elapsed, 2),
+        "requests": total,
+        "errors": sum(endpoint["errors"] for endpoint in endpoints.values()),
+        "throughput": round(total / elapsed, 2),
+        "endpoints": endpoints
+    }
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]]):
+    print(f"{'endpoint':<26} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for endpoint, stats in results["endpoints"].items():
+        line = (f"{endpoint:<26} {stats['requests']:8d} {stats['errors']:6d} {stats['throughput']:8.1f} "
+                f"{stats['p50_ms']:9.1f} {stats['p95_ms']:9.1f} {stats['p99_ms']:9.1f}")
+        before = (baseline or {}).get("endpoints", {}).get(endpoint)
+        if before and before["p95_ms"]:
+            line += f"   p95 {(stats['p95_ms'] / before['p95_ms'] - 1) * 100:+6.1f}% vs {baseline.get('commit') or 'baseline'}"
+        print(line)
+    print(f"{'total':<26} {results['requests']:8d} {results['errors']:6d} {results['throughput']:8.1f}")
+
+def main(args):
+    mix = parse_mix(args.mix)
+    server = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        server = start_server(port, args.llm_latency)
+        url = f"http://127.0.0.1:{port}"
+    try:
+        results = asyncio.run(run(url, args.users, args.duration, mix, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": {"url": args.url, "users": args.users, "duration": args.duration, "mix": mix,
+                   "llm_latency": None if args.url else args.llm_latency, "seed": args.seed},
+        **results
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    report(results, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"results saved to {args.output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running server; by default one is started with the fake LLM backend")
+    parser.add_argument("--users", type=int, default=16, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds to run for")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Operation weights, default {DEFAULT_MIX}")
+    parser.add_argument("--llm-latency", default="lognormal:0.3,0.5", help="Fake LLM latency distribution of the started server")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of the virtual users")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare with results saved by an earlier run")
+    main(parser.parse_args())
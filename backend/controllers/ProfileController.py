@@ -1,13 +1,15 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Response
 from models.AssessmentModel import AssessmentModel
 from services.ProfileManager import ProfileManager
-from typing import List
+from services.Repository import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from typing import List, Optional
+from datetime import datetime
 
 router = APIRouter()
 profile_manager = ProfileManager()
 
 @router.post("/profiles/", response_model=AssessmentModel)
-async def create_profile(profile: AssessmentModel):
+def create_profile(profile: AssessmentModel):
     """
     Create a new profile.
     
@@ -26,11 +28,32 @@ async def create_profile(profile: AssessmentModel):
     return profile
 
 @router.get("/profiles/", response_model=List[AssessmentModel])
-async def get_profiles():
+def get_profiles(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
     """
-    Get all saved profiles.
+    Get a page of saved profiles, oldest first.
+    
+    Args:
+        limit: Maximum number of profiles to return
+        cursor: The X-Next-Cursor value of the previous page
+        since: Only profiles saved at or after this time
+        until: Only profiles saved before this time
     
     Returns:
-        List of all saved profiles
+        List of saved profiles; X-Next-Cursor is set when more remain
+        
+    Raises:
+        HTTPException: If the cursor is malformed
     """
-    return profile_manager.get_profiles() 
\ No newline at end of file
+    try:
+        profiles, next_cursor = profile_manager.get_profiles_page(limit, cursor, since, until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return profiles
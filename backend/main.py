@@ -1,19 +1,32 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from routers.assessment_router import router as assessment_router
-from routers.guide_router import router as guide_router
+from routers.guide_router import guide_jobs, router as guide_router
 from routers.profile_router import router as profile_router
+from services.Compression import CompressionMiddleware
+from services.Metrics import MetricsMiddleware, registry
 from dotenv import load_dotenv
 import os
 
 # Load environment variables
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Resume or fail the guide jobs left unfinished by stopped processes"""
+    recovered = guide_jobs.recover()
+    if recovered:
+        print(f"Recovered {recovered} unfinished guide jobs")
+    yield
+
 # Create FastAPI app
 app = FastAPI(
     title="Grief Support System API",
     description="API for personalized grief support and guide generation",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -25,6 +38,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses for clients that accept it
+app.add_middleware(CompressionMiddleware.from_env)
+
+# Time every request for /metrics, including compression
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(profile_router, prefix="/api/v1", tags=["profiles"])
 app.include_router(assessment_router, prefix="/api/v1", tags=["assessments"])
@@ -39,6 +58,11 @@ async def root():
         "redoc_url": "/redoc"
     }
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Request latencies, guide stage timings and service counters in the Prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
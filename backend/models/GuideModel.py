@@ -2,6 +2,10 @@ from pydantic import BaseModel, Field
 from typing import List, Dict, Optional
 from datetime import datetime
 
+# How much of a guide its summary keeps
+SUMMARY_OVERVIEW_LENGTH = 200
+SUMMARY_COPING_STRATEGIES = 3
+
 class DailyActivity(BaseModel):
     time_period: str
     activity: str
@@ -87,4 +91,25 @@ class GuideModel(BaseModel):
                     "Journaling before bed"
                 ]
             }
-        } 
\ No newline at end of file
+        }
+
+class GuideSummaryModel(BaseModel):
+    id: str
+    created_at: datetime
+    profile_id: str
+    detected_mood: str
+    mood_emoji: str
+    overview: str = Field(..., description=f"The first {SUMMARY_OVERVIEW_LENGTH} characters of the guide's overview")
+    coping_strategies: List[str] = Field(..., description=f"The guide's first {SUMMARY_COPING_STRATEGIES} coping strategies")
+
+    @classmethod
+    def from_guide(cls, guide: GuideModel) -> "GuideSummaryModel":
+        return cls(
+            id=guide.id,
+            created_at=guide.created_at,
+            profile_id=guide.profile_id,
+            detected_mood=guide.detected_mood,
+            mood_emoji=guide.mood_emoji,
+            overview=guide.overview[:SUMMARY_OVERVIEW_LENGTH],
+            coping_strategies=guide.coping_strategies[:SUMMARY_COPING_STRATEGIES]
+        )
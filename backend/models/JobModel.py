@@ -0,0 +1,37 @@
+from datetime import datetime
+from enum import Enum
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class JobModel(BaseModel):
+    id: str = Field(..., description="Unique identifier for the job")
+    status: JobStatus = JobStatus.QUEUED
+    profile_id: str
+    assessment_id: str
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    guide_id: Optional[str] = None  # Set once the job has succeeded
+    error: Optional[str] = None  # Set if the job has failed
+    worker: Optional[str] = None  # "host:pid" of the process running the job
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": "job_123",
+                "status": "succeeded",
+                "profile_id": "user_123",
+                "assessment_id": "assessment_123",
+                "created_at": "2024-01-01T00:00:00",
+                "started_at": "2024-01-01T00:00:01",
+                "finished_at": "2024-01-01T00:00:09",
+                "guide_id": "guide_123",
+                "error": None
+            }
+        }
@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class MoodBatchRequest(BaseModel):
+    texts: List[str] = Field(..., min_items=1, max_items=10000)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "texts": [
+                    "I miss my mother so much. I cry when I see her photos.",
+                    "I'm so grateful for the years we had together."
+                ]
+            }
+        }
+
+class MoodResult(BaseModel):
+    mood: str
+    emoji: str
+    confidence: float
+
+class MoodBatchResponse(BaseModel):
+    results: List[MoodResult]
+    count: int
+    elapsed_ms: float
+    texts_per_second: float
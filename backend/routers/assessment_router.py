@@ -1,53 +1,68 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from models.AssessmentModel import AssessmentModel
-from typing import Dict, List
+from models.MoodModel import MoodBatchRequest, MoodBatchResponse
+from services.HttpCache import etag_matches, json_response, not_modified
+from services.Repository import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from services.Storage import assessments
+from routers.guide_router import groq_service
+from typing import Dict, List, Optional
+from datetime import datetime
+import time
 import uuid
 
 router = APIRouter()
 
-# In-memory storage for assessments (replace with database in production)
-assessments: Dict[str, AssessmentModel] = {}
-profile_assessments: Dict[str, List[str]] = {}  # Maps profile_id to list of assessment_ids
-
 @router.post("/assessment", response_model=Dict[str, str])
 async def create_assessment(assessment: AssessmentModel, profile_id: str):
     """Create a new grief assessment"""
     assessment_id = f"assessment_{str(uuid.uuid4())}"
-    assessments[assessment_id] = assessment
-    
-    if profile_id not in profile_assessments:
-        profile_assessments[profile_id] = []
-    profile_assessments[profile_id].append(assessment_id)
+    assessments.add(assessment_id, assessment, profile_id=profile_id)
     
     return {"assessment_id": assessment_id}
 
 @router.get("/assessment/{assessment_id}", response_model=AssessmentModel)
-async def get_assessment(assessment_id: str):
-    """Get an assessment by ID"""
-    if assessment_id not in assessments:
+async def get_assessment(assessment_id: str, request: Request):
+    """Get an assessment by ID; 304 if If-None-Match has its ETag"""
+    etag = assessments.get_etag(assessment_id)
+    if etag is not None and etag_matches(request, etag):
+        return not_modified(etag)
+    assessment = assessments.get_json(assessment_id)
+    if assessment is None:
         raise HTTPException(status_code=404, detail="Assessment not found")
-    return assessments[assessment_id]
+    return json_response(assessment)
 
 @router.get("/assessments/profile/{profile_id}", response_model=List[AssessmentModel])
-async def get_profile_assessments(profile_id: str):
-    """Get all assessments for a profile"""
-    if profile_id not in profile_assessments:
-        return []
-    
-    profile_assessment_list = []
-    for assessment_id in profile_assessments[profile_id]:
-        if assessment_id in assessments:
-            profile_assessment_list.append(assessments[assessment_id])
-    
-    return profile_assessment_list
+async def get_profile_assessments(
+    profile_id: str,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """Get a page of assessments for a profile, oldest first; the next page's cursor is in X-Next-Cursor"""
+    try:
+        page, next_cursor = assessments.page_by_profile(profile_id, limit, cursor, since, until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return page
 
 @router.post("/analyze-mood")
 async def analyze_mood(text: str):
     """Analyze the emotional state from text"""
-    # TODO: Implement mood analysis using Groq API
-    # This is a placeholder that returns a default mood
+    return await groq_service.analyze_mood(text)
+
+@router.post("/analyze-mood/batch", response_model=MoodBatchResponse)
+async def analyze_mood_batch(request: MoodBatchRequest):
+    """Analyze many texts at once with the local classifier; results are in input order"""
+    start = time.perf_counter()
+    results = groq_service.mood_classifier.classify_batch(request.texts)
+    elapsed = time.perf_counter() - start
     return {
-        "mood": "sad",
-        "emoji": "😔",
-        "confidence": 0.8
-    } 
\ No newline at end of file
+        "results": results,
+        "count": len(results),
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "texts_per_second": round(len(results) / elapsed, 1) if elapsed > 0 else 0.0
+    }
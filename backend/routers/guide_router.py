@@ -1,99 +1,343 @@
-from fastapi import APIRouter, HTTPException
-from models.GuideModel import GuideModel, DailyActivity, WeeklySchedule, ReflectiveQuestion, Resource
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from models.GuideModel import GuideModel, GuideSummaryModel
+from models.JobModel import JobModel
 from models.AssessmentModel import AssessmentModel
 from models.ProfileModel import ProfileModel
-from typing import Dict, List
+from services.GroqService import GroqService
+from services.HttpCache import CACHE_CONTROL, etag_matches, json_response, not_modified, variant_etag
+from services.JobQueue import JobQueue
+from services.Metrics import registry
+from services.PromptBudget import TokenUsage, current_usage
+from services.RateLimitedClient import BATCH_PRIORITY, PriorityLane, current_lane, priority
+from services.Repository import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from services.SectionCache import SectionCache
+from services.SingleFlight import SharedSectionStream, SingleFlight
+from services.Storage import assessments, guides, jobs, profiles
+from typing import AsyncIterator, Iterator, List, NamedTuple, Optional, Tuple
+import asyncio
+import json
 import uuid
 from datetime import datetime
 
 router = APIRouter()
+section_cache = SectionCache.from_env()
+groq_service = GroqService(cache=section_cache)
+guide_generations = SingleFlight()
 
-# In-memory storage for guides (replace with database in production)
-guides: Dict[str, GuideModel] = {}
-profile_guides: Dict[str, List[str]] = {}  # Maps profile_id to list of guide_ids
+def _load_inputs(profile_id: str, assessment_id: str) -> Tuple[ProfileModel, AssessmentModel]:
+    """Look up the profile and assessment a guide is generated from"""
+    profile = profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    assessment = assessments.get(assessment_id)
+    if assessment is None:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    return profile, assessment
 
-@router.post("/generate-guide", response_model=GuideModel)
-async def generate_guide(profile_id: str, assessment_id: str):
-    """Generate a personalized grief guide based on profile and assessment"""
-    # TODO: Implement guide generation using Groq API
-    # This is a placeholder that returns a sample guide
-    guide_id = f"guide_{str(uuid.uuid4())}"
+def _store_guide(guide: GuideModel):
+    """Persist a guide and index it under its profile"""
+    guides.add(guide.id, guide, profile_id=guide.profile_id, created_at=guide.created_at)
+
+def _sse_event(event: str, data) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data), ensure_ascii=False)}\n\n"
+
+class GenerationState(NamedTuple):
+    """What a shared generation's followers can see of it"""
+    usage: TokenUsage
+    lane: PriorityLane  # Promoted when a caller of higher priority joins
+
+def _join_generation(profile_id: str, assessment_id: str) -> SharedSectionStream[GuideModel]:
+    """
+    Join the in-flight generation for this profile and assessment, starting one if needed.
     
-    guide = GuideModel(
-        id=guide_id,
-        created_at=datetime.now(),
-        profile_id=profile_id,
-        detected_mood="sad",
-        mood_emoji="😔",
-        overview="This is a personalized guide based on your recent loss...",
-        weekly_routine=WeeklySchedule(
-            monday=[],
-            tuesday=[],
-            wednesday=[],
-            thursday=[],
-            friday=[],
-            saturday=[],
-            sunday=[]
-        ),
-        reflective_questions=[
-            ReflectiveQuestion(
-                question="What memory brings you the most comfort?",
-                context="Reflecting on positive memories can help in the healing process",
-                suggested_prompts=["Think about a happy moment", "Remember a time when you laughed together"]
-            )
-        ],
-        physical_activity="Daily 15-minute walks",
-        meal_plan="Focus on nutritious, easy-to-prepare meals",
-        evening_ritual="Create a calming bedtime routine",
-        resources=[
-            Resource(
-                title="Local Grief Support Group",
-                description="Weekly meetings for those experiencing loss",
-                category="Support Groups",
-                contact="555-0123"
-            )
-        ],
-        coping_strategies=["Deep breathing", "Journaling"]
-    )
+    Duplicate requests (reruns, double clicks, retries) share one set of model
+    calls and one persisted guide. The stream's `state` is a GenerationState.
+    The generation runs in its own lane at the starter's priority, raised to
+    that of any caller who joins later, so an interactive request never waits
+    behind the batch lane for a generation a job started.
+    """
+    profile, assessment = _load_inputs(profile_id, assessment_id)
     
-    guides[guide_id] = guide
+    def finish(sections) -> GuideModel:
+        guide = groq_service.build_guide(sections, f"guide_{str(uuid.uuid4())}", profile_id)
+        _store_guide(guide)
+        return guide
     
-    if profile_id not in profile_guides:
-        profile_guides[profile_id] = []
-    profile_guides[profile_id].append(guide_id)
+    def start() -> SharedSectionStream[GuideModel]:
+        usage = TokenUsage()
+        token = current_usage.set(usage)  # Inherited by the generation task and its section tasks
+        try:
+            with priority(current_lane().level) as lane:
+                return SharedSectionStream(groq_service.stream_sections(profile, assessment), finish,
+                                           state=GenerationState(usage, lane))
+        finally:
+            current_usage.reset(token)
+    
+    generation = guide_generations.join((profile_id, assessment_id), start)
+    generation.state.lane.promote(current_lane().level)
+    return generation
+
+async def _run_guide_job(job: JobModel) -> str:
+    """Generate a queued job's guide in the batch lane, behind interactive generations, until an interactive request joins it"""
+    with priority(BATCH_PRIORITY):
+        generation = _join_generation(job.profile_id, job.assessment_id)
+        guide = await generation.result()
+    return guide.id
+
+guide_jobs = JobQueue.from_env(jobs, _run_guide_job)
+
+@router.post("/generate-guide", response_model=GuideModel, responses={202: {"model": JobModel}})
+async def generate_guide(request: Request, response: Response, profile_id: str, assessment_id: str,
+                         run_async: bool = Query(False, alias="async")):
+    """
+    Generate a personalized grief guide based on profile and assessment.
     
+    The generation's token counts are in the X-Prompt-Tokens and
+    X-Completion-Tokens headers. With `async=true` the guide is queued
+    instead: the response is a 202 with the job, whose status is at
+    GET /jobs/{job_id}.
+    """
+    if run_async:
+        _load_inputs(profile_id, assessment_id)
+        try:
+            job = guide_jobs.submit(profile_id, assessment_id)
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="Guide job queue is full", headers={"Retry-After": "30"})
+        return JSONResponse(
+            status_code=202,
+            content=jsonable_encoder(job),
+            headers={"Location": str(request.url_for("get_job", job_id=job.id))}
+        )
+    
+    generation = _join_generation(profile_id, assessment_id)
+    try:
+        guide = await generation.result()
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Error generating guide: {str(e)}")
+    response.headers["X-Prompt-Tokens"] = str(generation.state.usage.prompt_tokens)
+    response.headers["X-Completion-Tokens"] = str(generation.state.usage.completion_tokens)
     return guide
 
+@router.post("/generate-guide/stream")
+async def generate_guide_stream(profile_id: str, assessment_id: str):
+    """
+    Generate a guide, streaming each section as Server-Sent Events.
+    
+    Emits one `section` event per section as soon as it is ready, then a
+    `complete` event carrying the id of the persisted guide and the token
+    usage, or an `error` event if the guide could not be built.
+    """
+    generation = _join_generation(profile_id, assessment_id)
+    
+    async def event_stream():
+        async for name, value in generation.follow():
+            yield _sse_event("section", {"section": name, "data": value})
+        try:
+            guide = await generation.result()
+        except Exception as e:
+            yield _sse_event("error", {"detail": f"Error generating guide: {str(e)}"})
+            return
+        yield _sse_event("complete", {"guide_id": guide.id, "usage": generation.state.usage.to_dict()})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/generate-guide/draft", response_model=GuideModel)
+async def generate_guide_draft(profile_id: str, assessment_id: str):
+    """Build an instant, unsaved draft guide from templates, without any model calls"""
+    profile, assessment = _load_inputs(profile_id, assessment_id)
+    return groq_service.build_guide(groq_service.templates.sections(profile, assessment), "draft", profile_id)
+
+@router.get("/generate-guide/stats")
+async def get_generate_guide_stats():
+    """Get in-flight generations, duplicate generations avoided, parse outcomes, LLM client counters, template fallbacks and token totals"""
+    return {
+        **guide_generations.stats(),
+        "parse": groq_service.get_parse_stats(),
+        "llm": groq_service.llm.stats(),
+        "template_fallbacks": dict(groq_service.template_fallbacks),
+        "tokens": groq_service.token_usage.to_dict()
+    }
+
+async def _json_array(items: List[bytes]) -> AsyncIterator[bytes]:
+    """Stream already-encoded JSON values as one JSON array"""
+    yield b"["
+    for index, item in enumerate(items):
+        yield b"," + item if index else item
+    yield b"]"
+
+# Guides never change once stored, so they are served from the JSON encoded when they were
+# stored instead of being validated and serialized again; response_model only documents them.
+# A request whose If-None-Match still matches gets a 304 from the stored ETags alone.
+
 @router.get("/guide/{guide_id}", response_model=GuideModel)
-async def get_guide(guide_id: str):
-    """Get a guide by ID"""
-    if guide_id not in guides:
+async def get_guide(guide_id: str, request: Request):
+    """Get a guide by ID; 304 if If-None-Match has its ETag"""
+    etag = guides.get_etag(guide_id)
+    if etag is not None and etag_matches(request, etag):
+        return not_modified(etag)
+    guide = guides.get_json(guide_id)
+    if guide is None:
         raise HTTPException(status_code=404, detail="Guide not found")
-    return guides[guide_id]
+    return json_response(guide)
 
 @router.get("/guides/profile/{profile_id}", response_model=List[GuideModel])
-async def get_profile_guides(profile_id: str):
-    """Get all guides for a profile"""
-    if profile_id not in profile_guides:
-        return []
+async def get_profile_guides(
+    profile_id: str,
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """
+    Get a page of guides for a profile, oldest first.
+    
+    The next page's cursor is in X-Next-Cursor. The ETag covers the guides
+    in the page and the cursor; 304 if If-None-Match has it.
+    """
+    try:
+        etag = guides.page_etag_by_profile(profile_id, limit, cursor, since, until)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        page, next_cursor = guides.page_json_by_profile(profile_id, limit, cursor, since, until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return StreamingResponse(_json_array(page), media_type="application/json", headers=headers)
+
+def _history_json(page: List[bytes], next_cursor: Optional[str]) -> bytes:
+    """
+    Group a newest-first page of stored guide summaries by the month they were created in.
+
+    Month and day labels are formatted here once, so the frontend renders
+    the groups as they come; each summary is embedded as stored.
+    """
+    months: List[Tuple[str, str, List[bytes]]] = []
+    for guide in page:
+        created_at = datetime.fromisoformat(json.loads(guide)["created_at"])
+        month = created_at.strftime("%Y-%m")
+        if not months or months[-1][0] != month:
+            months.append((month, created_at.strftime("%B %Y"), []))
+        day = json.dumps(created_at.strftime("%d %b")).encode("utf-8")
+        months[-1][2].append(b'{"day":' + day + b',"guide":' + guide + b"}")
+    groups = [
+        f'{{"month":"{month}","label":"{label}","guides":['.encode("utf-8") + b",".join(entries) + b"]}"
+        for month, label, entries in months
+    ]
+    return b'{"months":[' + b",".join(groups) + b'],"next_cursor":' + json.dumps(next_cursor).encode("utf-8") + b"}"
+
+@router.get("/guides/profile/{profile_id}/history")
+async def get_profile_guide_history(
+    profile_id: str,
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """
+    Get a page of guide summaries for a profile, newest first and grouped by month.
     
-    profile_guide_list = []
-    for guide_id in profile_guides[profile_id]:
-        if guide_id in guides:
-            profile_guide_list.append(guides[guide_id])
+    The body is {"months": [{"month", "label", "guides": [{"day", "guide"}]}],
+    "next_cursor"}, where each guide is a GuideSummaryModel; a month can
+    continue on the next page. The ETag is derived from the guides' ETags;
+    304 if If-None-Match has it.
+    """
+    try:
+        etag = variant_etag(guides.page_etag_by_profile(profile_id, limit, cursor, descending=True), "history")
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        page, next_cursor = guides.page_summaries_by_profile(profile_id, limit, cursor, descending=True)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response(_history_json(page, next_cursor), etag=etag)
+
+@router.get("/guides/profile/{profile_id}/summaries", response_model=List[GuideSummaryModel])
+async def get_profile_guide_summaries(
+    profile_id: str,
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """
+    Get a page of guide summaries for a profile, newest first.
     
-    return profile_guide_list
+    Summaries are built when a guide is stored and served as stored. The
+    next page's cursor is in X-Next-Cursor; the ETag is derived from the
+    guides' ETags, and 304 if If-None-Match has it.
+    """
+    try:
+        etag = variant_etag(guides.page_etag_by_profile(profile_id, limit, cursor, since, until, descending=True), "summaries")
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        page, next_cursor = guides.page_summaries_by_profile(profile_id, limit, cursor, since, until, descending=True)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return StreamingResponse(_json_array(page), media_type="application/json", headers=headers)
 
 @router.delete("/guide/{guide_id}")
 async def delete_guide(guide_id: str):
     """Delete a guide"""
-    if guide_id not in guides:
+    if not guides.delete(guide_id):
         raise HTTPException(status_code=404, detail="Guide not found")
-    
-    # Remove guide from profile_guides
-    for profile_id in profile_guides:
-        if guide_id in profile_guides[profile_id]:
-            profile_guides[profile_id].remove(guide_id)
-    
-    del guides[guide_id]
-    return {"message": "Guide deleted successfully"} 
\ No newline at end of file
+    return {"message": "Guide deleted successfully"}
+
+@router.get("/jobs/stats")
+async def get_job_stats():
+    """Get guide job queue depth, worker use and queue wait times"""
+    return guide_jobs.stats()
+
+@router.get("/jobs/{job_id}", response_model=JobModel)
+async def get_job(job_id: str, wait: float = Query(0, ge=0, le=60)):
+    """Get a guide job; with `wait`, hold the request up to that many seconds for the job to finish"""
+    job = await guide_jobs.wait(job_id, wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/guide-cache/stats")
+async def get_guide_cache_stats():
+    """Get hit and miss counts for the section cache"""
+    return section_cache.stats()
+
+def _collect_metrics() -> Iterator[Tuple]:
+    """Report the service, cache and job counters at /metrics"""
+    yield ("guide_section_cache_hits_total", "counter", "Section cache hits",
+           [({"section": section}, count) for section, count in section_cache.hits.items()])
+    yield ("guide_section_cache_misses_total", "counter", "Section cache misses",
+           [({"section": section}, count) for section, count in section_cache.misses.items()])
+    yield ("guide_parse_outcomes_total", "counter", "Completion parses by section and strategy, or failed / invalid",
+           [({"section": section, "outcome": outcome}, count)
+            for section, outcomes in groq_service.parse_outcomes.items() for outcome, count in outcomes.items()])
+    yield ("guide_template_fallbacks_total", "counter", "Model sections replaced by their template version",
+           [({"section": section}, count) for section, count in groq_service.template_fallbacks.items()])
+    yield ("guide_generations_coalesced_total", "counter", "Guide requests that joined an identical generation in flight",
+           [({}, guide_generations.coalesced)])
+    yield ("llm_tokens_total", "counter", "Tokens used by completions",
+           [({"section": section, "kind": kind}, counts[f"{kind}_tokens"])
+            for section, counts in groq_service.token_usage.sections.items() for kind in ("prompt", "completion")])
+    llm = groq_service.llm.stats()
+    for name in ("calls", "retries", "timeouts", "failures"):
+        yield (f"llm_{name}_total", "counter", f"LLM completion {name}", [({}, llm[name])])
+    yield ("llm_in_flight", "gauge", "Completions in progress", [({}, llm["in_flight"])])
+    yield ("llm_waiting", "gauge", "Completions waiting for the rate limiter", [({}, llm["waiting"])])
+    queue = guide_jobs.stats()
+    yield ("guide_jobs_depth", "gauge", "Guide jobs waiting for a worker", [({}, queue["depth"])])
+    yield ("guide_jobs_busy", "gauge", "Guide job workers running a job", [({}, queue["busy"])])
+    yield ("guide_jobs_total", "counter", "Guide jobs by outcome",
+           [({"status": "succeeded"}, queue["succeeded"]), ({"status": "failed"}, queue["failed"]),
+            ({"status": "rejected"}, queue["rejected"])])
+
+registry.collector(_collect_metrics)
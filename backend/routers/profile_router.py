@@ -1,39 +1,45 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from models.ProfileModel import ProfileModel
+from services.HttpCache import etag_matches, json_response, not_modified
+from services.Storage import assessments, guides, jobs, profiles
 from typing import Dict
 import uuid
 
 router = APIRouter()
 
-# In-memory storage for profiles (replace with database in production)
-profiles: Dict[str, ProfileModel] = {}
-
 @router.post("/profile", response_model=Dict[str, str])
 async def create_profile(profile: ProfileModel):
     """Create a new user profile"""
     profile_id = f"profile_{str(uuid.uuid4())}"
-    profiles[profile_id] = profile
+    profiles.add(profile_id, profile)
     return {"profile_id": profile_id}
 
 @router.get("/profile/{profile_id}", response_model=ProfileModel)
-async def get_profile(profile_id: str):
-    """Get a user profile by ID"""
-    if profile_id not in profiles:
+async def get_profile(profile_id: str, request: Request):
+    """Get a user profile by ID; 304 if If-None-Match has its ETag"""
+    etag = profiles.get_etag(profile_id)
+    if etag is not None and etag_matches(request, etag):
+        return not_modified(etag)
+    profile = profiles.get_json(profile_id)
+    if profile is None:
         raise HTTPException(status_code=404, detail="Profile not found")
-    return profiles[profile_id]
+    return json_response(profile)
 
 @router.put("/profile/{profile_id}", response_model=ProfileModel)
 async def update_profile(profile_id: str, profile: ProfileModel):
     """Update a user profile"""
-    if profile_id not in profiles:
+    if not profiles.update(profile_id, profile):
         raise HTTPException(status_code=404, detail="Profile not found")
-    profiles[profile_id] = profile
     return profile
 
 @router.delete("/profile/{profile_id}")
 async def delete_profile(profile_id: str):
     """Delete a user profile"""
-    if profile_id not in profiles:
+    if not profiles.delete(profile_id):
         raise HTTPException(status_code=404, detail="Profile not found")
-    del profiles[profile_id]
-    return {"message": "Profile deleted successfully"} 
\ No newline at end of file
+    
+    # Remove everything that belonged to the profile
+    guides.delete_by_profile(profile_id)
+    assessments.delete_by_profile(profile_id)
+    jobs.delete_by_profile(profile_id)
+    return {"message": "Profile deleted successfully"}
@@ -0,0 +1,280 @@
+import os
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from services.Metrics import registry
+
+# brotli and zstandard are optional; without them only gzip is offered
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/plain", "text/html", "text/css", "application/javascript")
+
+compression_bytes = registry.counter(
+    "http_compression_bytes_total", "Response bytes before (in) and after (out) compression", ("encoding", "direction")
+)
+compression_cache_lookups = registry.counter(
+    "http_compression_cache_lookups_total", "Compressed variant cache lookups by result", ("result",)
+)
+
+class _Gzip:
+    def __init__(self, level: int = 6):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+class _Brotli:
+    def __init__(self, quality: int = 5):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+class _Zstd:
+    def __init__(self, level: int = 3):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+# Supported encodings in order of preference: zstd and brotli compress JSON better than gzip
+ENCODERS = {name: encoder for name, encoder, available in (
+    ("zstd", _Zstd, zstandard is not None),
+    ("br", _Brotli, brotli is not None),
+    ("gzip", _Gzip, True)
+) if available}
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """The preferred supported encoding the client accepts, or None"""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, parameters = part.strip().partition(";")
+        quality = 1.0
+        parameter = parameters.strip()
+        if parameter.startswith("q="):
+            try:
+                quality = float(parameter[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for name in ENCODERS:
+        quality = accepted.get(name, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """The ETag of a response's body once compressed with `encoding`: '"abc"' becomes '"abc-gzip"'"""
+    return f'{etag[:-1]}-{encoding}"' if etag.endswith('"') else etag
+
+def compress(encoding: str, data: bytes) -> bytes:
+    encoder = ENCODERS[encoding]()
+    return encoder.compress(data) + encoder.finish()
+
+class CompressedCache:
+    """
+    LRU cache of compressed bodies keyed by (URL, ETag, encoding), bounded by total size.
+
+    The URL is part of the key because an ETag only identifies a body
+    within its own resource.
+    """
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+
+    def get(self, url: str, etag: str, encoding: str) -> Optional[bytes]:
+        key = (url, etag, encoding)
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        compression_cache_lookups.inc("hit" if body is not None else "miss")
+        return body
+
+    def set(self, url: str, etag: str, encoding: str, body: bytes):
+        key = (url, etag, encoding)
+        if len(body) > self.max_bytes or key in self._entries:
+            return
+        self._entries[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+def _vary(start: dict) -> dict:
+    """A response start with Accept-Encoding added to its Vary header"""
+    vary = [value for name, value in start["headers"] if name.lower() == b"vary"]
+    if any(b"accept-encoding" in value.lower() or value.strip() == b"*" for value in vary):
+        return start
+    headers = [(name, value) for name, value in start["headers"] if name.lower() != b"vary"]
+    headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+    return {**start, "headers": headers}
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with the best encoding the client accepts.
+
+    Bodies under `minimum_size` bytes, non-text types, event streams and
+    already-encoded responses pass through untouched. Streamed bodies are
+    compressed chunk by chunk once `minimum_size` bytes have arrived. A
+    response with an ETag identifies its exact content, so its compressed
+    body is cached under the URL, ETag and encoding, and a repeat is served
+    without compressing again. The ETag of a compressed response gets a
+    "-<encoding>" suffix, as the representations differ; the suffix is
+    removed from If-None-Match on the way in, so conditional requests still
+    match. Every response that could have been compressed, and every 304,
+    carries Vary: Accept-Encoding, whether or not this one was.
+    """
+    def __init__(self, app, minimum_size: int = 1024, cache: Optional[CompressedCache] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = cache if cache is not None else CompressedCache()
+
+    @classmethod
+    def from_env(cls, app) -> "CompressionMiddleware":
+        """Threshold from COMPRESSION_MIN_BYTES, cache bound from COMPRESSION_CACHE_MAX_BYTES"""
+        return cls(
+            app,
+            minimum_size=int(os.getenv("COMPRESSION_MIN_BYTES", "1024")),
+            cache=CompressedCache(int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(32 * 1024 * 1024))))
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        suffix = f'-{encoding}"'.encode("latin-1") if encoding is not None else None
+        revalidating = suffix is not None and suffix in headers.get(b"if-none-match", b"")
+        if revalidating:
+            # In place: the router records the matched endpoint in this scope for MetricsMiddleware
+            scope["headers"] = [
+                (name, value.replace(suffix, b'"') if name == b"if-none-match" else value)
+                for name, value in scope["headers"]
+            ]
+        url = scope["path"] + "?" + scope["query_string"].decode("latin-1")
+        responder = _CompressingResponder(send, encoding, self.minimum_size, self.cache, revalidating, url)
+        await self.app(scope, receive, responder.send)
+
+class _CompressingResponder:
+    """Compresses one response on its way out; with no `encoding`, only marks it as varying"""
+    def __init__(self, send, encoding: Optional[str], minimum_size: int, cache: CompressedCache, revalidating: bool, url: str):
+        self._send = send
+        self.url = url
+        self.revalidating = revalidating  # If-None-Match named a compressed variant
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.cache = cache
+        self.start: Optional[dict] = None
+        self.etag: Optional[str] = None
+        self.state = "pending"  # pending -> passthrough | compressing | cached
+        self.buffered: List[bytes] = []
+        self.buffered_size = 0
+        self.encoder = None
+        self.compressed: List[bytes] = []  # Kept for the cache while compressing a response with an ETag
+        self.size_in = 0
+        self.size_out = 0
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = {name.lower(): value for name, value in message["headers"]}
+            content_type = headers.get(b"content-type", b"").decode("latin-1")
+            if message["status"] == 304 and self.revalidating and b"etag" in headers:
+                # Confirm the compressed variant the client holds
+                etag = encoded_etag(headers[b"etag"].decode("latin-1"), self.encoding).encode("latin-1")
+                message = {**message, "headers": [(name, etag if name.lower() == b"etag" else value)
+                                                  for name, value in message["headers"]]}
+            if message["status"] == 304:
+                self.state = "passthrough"
+                return await self._send(_vary(message))
+            if (b"content-encoding" in headers or message["status"] == 204
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                self.state = "passthrough"
+                return await self._send(message)
+            # From here on the body is compressed for some clients, so every variant says so
+            self.start = _vary(message)
+            if self.encoding is None:
+                self.state = "passthrough"
+                return await self._send(self.start)
+            self.etag = headers.get(b"etag", b"").decode("latin-1") or None
+            if self.etag is not None:
+                cached = self.cache.get(self.url, self.etag, self.encoding)
+                if cached is not None:
+                    self.state = "cached"
+                    await self._start(len(cached))
+                    return await self._send({"type": "http.response.body", "body": cached, "more_body": False})
+            return
+
+        if message["type"] != "http.response.body" or self.state == "passthrough":
+            return await self._send(message)
+        if self.state == "cached":
+            return  # The app's body is already sent in compressed form
+
+        body, more_body = message.get("body", b""), message.get("more_body", False)
+        if self.state == "pending":
+            self.buffered.append(body)
+            self.buffered_size += len(body)
+            if self.buffered_size < self.minimum_size and more_body:
+                return
+            body = b"".join(self.buffered)
+            self.buffered = []
+            if self.buffered_size < self.minimum_size:
+                self.state = "passthrough"
+                await self._send(self.start)
+                return await self._send({"type": "http.response.body", "body": body, "more_body": False})
+            self.state = "compressing"
+            self.encoder = ENCODERS[self.encoding]()
+            if not more_body:
+                compressed = self.encoder.compress(body) + self.encoder.finish()
+                self._record(len(body), len(compressed), compressed)
+                await self._start(len(compressed))
+                return await self._send({"type": "http.response.body", "body": compressed, "more_body": False})
+            await self._start(None)
+
+        self.size_in += len(body)
+        chunk = self.encoder.compress(body)
+        if not more_body:
+            chunk += self.encoder.finish()
+        self.size_out += len(chunk)
+        if self.etag is not None:
+            self.compressed.append(chunk)
+        if chunk or not more_body:
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+        if not more_body:
+            self._record(self.size_in, self.size_out, b"".join(self.compressed))
+
+    async def _start(self, length: Optional[int]):
+        """Send the response start with encoding headers, and Content-Length if the body is whole"""
+        headers = [(name, value) for name, value in self.start["headers"]
+                   if name.lower() not in (b"content-length", b"etag")]
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        if self.etag is not None:
+            headers.append((b"etag", encoded_etag(self.etag, self.encoding).encode("latin-1")))
+        if length is not None:
+            headers.append((b"content-length", str(length).encode("latin-1")))
+        await self._send({**self.start, "headers": headers})
+
+    def _record(self, size_in: int, size_out: int, compressed: bytes):
+        compression_bytes.inc(self.encoding, "in", amount=size_in)
+        compression_bytes.inc(self.encoding, "out", amount=size_out)
+        if self.etag is not None:
+            self.cache.set(self.url, self.etag, self.encoding, compressed)
@@ -1,101 +1,332 @@
-from groq import Groq
 from models.ProfileModel import ProfileModel
 from models.AssessmentModel import AssessmentModel
-from models.GuideModel import GuideModel, DailyRoutine, WeeklySchedule, ReflectiveQuestion, Resource
+from models.GuideModel import GuideModel, DailyActivity, WeeklySchedule, ReflectiveQuestion, Resource
+from services.JsonExtractor import extract_json, normalize_keys
+from services.LLMBackend import LLMBackend, create_backend
+from services.Metrics import span
+from services.MoodClassifier import MoodClassifier
+from services.PromptBudget import PROMPT_BUDGETS, TokenUsage, count_tokens, current_usage, fit
+from services.RateLimitedClient import RateLimitedClient, RateLimiter
+from services.SectionCache import SectionCache
+from services.TemplateGuideEngine import TemplateGuideEngine
 from shared.constants import EMOJI_MOOD_MAP, TIME_PERIODS, REFLECTIVE_PROMPTS, RESOURCE_CATEGORIES
+import asyncio
 import os
-from typing import Dict, List
+from collections import Counter, defaultdict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 import json
 
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# Local mood classifications at or above this confidence skip the LLM
+MOOD_CONFIDENCE_THRESHOLD = float(os.getenv("MOOD_CONFIDENCE_THRESHOLD", "0.5"))
+
+# "multi": one completion per section; "single": one structured completion for the whole guide;
+# "template": no completions, every section from TemplateGuideEngine
+GENERATION_MODE = os.getenv("GUIDE_GENERATION_MODE", "multi")
+
+# Model sections still missing after this many seconds are replaced by their template version
+SECTION_TIMEOUT_SECONDS = float(os.getenv("GUIDE_SECTION_TIMEOUT_SECONDS", "60")) or None
+
+# Request, token and concurrency budgets per process, shared by every GroqService instance
+rate_limiter = RateLimiter.from_env()
+
 class GroqService:
-    def __init__(self):
-        self.client = Groq(
-            api_key=os.getenv("GROQ_API_KEY", "your-api-key-here")
-        )
-        self.model = "mixtral-8x7b-32768"  # Using Mixtral for its strong reasoning capabilities
+    def __init__(self, backend: Optional[LLMBackend] = None, cache: Optional[SectionCache] = None, mode: str = GENERATION_MODE,
+                 limiter: Optional[RateLimiter] = None):
+        if mode not in ("multi", "single", "template"):
+            raise ValueError(f"Unknown generation mode: {mode}")
+        self.backend = backend or create_backend()
+        self.llm = RateLimitedClient.from_env(self.backend, limiter or rate_limiter)
+        self.model = self.backend.model
+        self.cache = cache
+        self.mode = mode
+        self.mood_classifier = MoodClassifier()
+        self.templates = TemplateGuideEngine(self.mood_classifier)
+        self.parse_outcomes: Dict[str, Counter] = defaultdict(Counter)
+        self.template_fallbacks: Counter = Counter()
+        self.token_usage = TokenUsage()  # Totals across every generation
     
-    async def analyze_mood(self, text: str) -> Dict[str, str]:
-        """Analyze the emotional state from text"""
-        prompt = f"""Analyze the emotional state in this text and categorize it into one of these moods: devastated, sad, anxious, angry, numb, hopeful, accepting, grateful. Return only the mood word.
-
-Text: {text}"""
+    async def _complete(self, prompt: str, section: str) -> str:
+        """Run a single chat completion within the rate limits, retrying transient failures"""
+        with span(section, "llm"):
+            response = await self.llm.complete(messages=[{"role": "user", "content": prompt}])
+        content = response.choices[0].message.content
         
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", None) or count_tokens(prompt)
+        completion_tokens = getattr(usage, "completion_tokens", None) or count_tokens(content)
+        for tracker in (self.token_usage, current_usage.get()):
+            if tracker is not None:
+                tracker.add(section, prompt_tokens, completion_tokens)
+        return content
+    
+    def _fit(self, budget: str, text: str) -> str:
+        """Summarize free text that is over its prompt token budget"""
+        fitted, before, after = fit(text, PROMPT_BUDGETS[budget])
+        for tracker in (self.token_usage, current_usage.get()):
+            if tracker is not None:
+                tracker.record_fit(before, after)
+        return fitted
+    
+    def _cache_key(self, section: str, features: Dict[str, Any]) -> str:
+        return SectionCache.make_key(section, {"model": self.model, **features})
+    
+    async def _cached_section(self, section: str, features: Dict[str, Any], prompt: str,
+                              coerce: Callable[[Any], Any], fallback: Callable[[], Any]) -> Any:
+        """
+        Generate a section unless a completion for the same section features is already cached.
+        
+        Only completions that parse and validate are cached, so a malformed
+        reply falls back to the default section once and is asked again next time.
+        """
+        key = self._cache_key(section, features) if self.cache is not None else None
+        if key is not None:
+            completion = self.cache.get(section, key)
+            if completion is not None:
+                return self._parse_section(section, completion, coerce, fallback)
+        
+        completion = await self._complete(prompt, section)
+        try:
+            value = self._coerce_section(section, completion, coerce)
+        except ValueError:
+            return fallback()
+        if key is not None:
+            self.cache.set(section, key, completion)
+        return value
+    
+    async def analyze_mood(self, text: str) -> Dict[str, Any]:
+        """Analyze the emotional state from text, asking the LLM only when the local classifier is unsure"""
+        local = self.mood_classifier.classify(text)
+        if local["confidence"] >= MOOD_CONFIDENCE_THRESHOLD:
+            return {**local, "source": "lexicon"}
+        
+        with span("mood", "prompt"):
+            prompt = f"""Analyze the emotional state in this text and categorize it into one of these moods: devastated, sad, anxious, angry, numb, hopeful, accepting, grateful. Return only the mood word.
+
+Text: {self._fit("mood", text)}"""
         
-        mood = response.choices[0].message.content.strip().lower()
+        mood = (await self._complete(prompt, "mood")).strip().strip(".!\"'").lower()
+        if mood not in EMOJI_MOOD_MAP:
+            return {**local, "source": "lexicon"}
         return {
             "mood": mood,
-            "emoji": EMOJI_MOOD_MAP.get(mood, "😔")
+            "emoji": EMOJI_MOOD_MAP[mood],
+            "confidence": None,
+            "source": "llm"
         }
     
-    async def generate_guide(self, profile: ProfileModel, assessment: AssessmentModel) -> GuideModel:
-        """Generate a personalized grief guide"""
-        # Generate overview
-        overview_prompt = self._create_overview_prompt(profile, assessment)
-        overview_response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": overview_prompt}]
-        )
-        overview = overview_response.choices[0].message.content.strip()
+    async def generate_overview(self, profile: ProfileModel, assessment: AssessmentModel) -> str:
+        """Generate the overview section"""
+        with span("overview", "prompt"):
+            prompt = self._create_overview_prompt(profile, assessment)
+        return (await self._complete(prompt, "overview")).strip()
+    
+    async def generate_routine(self, profile: ProfileModel, assessment: AssessmentModel) -> WeeklySchedule:
+        """Generate the weekly routine section"""
+        with span("weekly_routine", "prompt"):
+            prompt = self._create_routine_prompt(profile, assessment)
+        return await self._cached_section("weekly_routine", self._routine_features(profile, assessment), prompt,
+                                          self._coerce_routine, self._default_routine)
+    
+    async def generate_questions(self, assessment: AssessmentModel) -> List[ReflectiveQuestion]:
+        """Generate the reflective questions section"""
+        with span("reflective_questions", "prompt"):
+            prompt = self._create_questions_prompt(assessment)
+        return await self._cached_section("reflective_questions", self._questions_features(assessment), prompt,
+                                          self._coerce_questions, self._default_questions)
+    
+    async def generate_resources(self, profile: ProfileModel, assessment: AssessmentModel) -> List[Resource]:
+        """Generate the resources section"""
+        with span("resources", "prompt"):
+            prompt = self._create_resources_prompt(profile, assessment)
+        return await self._cached_section("resources", self._resources_features(profile, assessment), prompt,
+                                          self._coerce_resources, self._default_resources)
+    
+    def _rule_based_sections(self, assessment: AssessmentModel) -> Dict[str, Any]:
+        """Sections computed locally from the assessment, without a model call"""
+        return self.templates.rule_based_sections(assessment)
+    
+    def _model_sections(self, profile: ProfileModel, assessment: AssessmentModel) -> Dict[str, Callable[[], Awaitable[Any]]]:
+        """Sections that each need one model call, as factories for their coroutines"""
+        return {
+            "mood": lambda: self._or_template("mood", self.analyze_mood(assessment.story), profile, assessment),
+            "overview": lambda: self._or_template("overview", self.generate_overview(profile, assessment), profile, assessment),
+            "weekly_routine": lambda: self._or_template("weekly_routine", self.generate_routine(profile, assessment), profile, assessment),
+            "reflective_questions": lambda: self._or_template("reflective_questions", self.generate_questions(assessment), profile, assessment),
+            "resources": lambda: self._or_template("resources", self.generate_resources(profile, assessment), profile, assessment)
+        }
+    
+    async def _or_template(self, section: str, generation: Awaitable[Any], profile: ProfileModel, assessment: AssessmentModel) -> Any:
+        """Await a model section, substituting the template version if the model fails or is too slow"""
+        try:
+            with span(section, "total"):
+                return await asyncio.wait_for(generation, SECTION_TIMEOUT_SECONDS)
+        except Exception as e:
+            print(f"Error generating {section}, using the template instead: {str(e)}")
+            self.template_fallbacks[section] += 1
+            return self.templates.section(section, profile, assessment)
+    
+    def _cached_section_features(self, profile: ProfileModel, assessment: AssessmentModel) -> Dict[str, Dict[str, Any]]:
+        """Cache features of the sections that go through the section cache"""
+        return {
+            "weekly_routine": self._routine_features(profile, assessment),
+            "reflective_questions": self._questions_features(assessment),
+            "resources": self._resources_features(profile, assessment)
+        }
+    
+    async def _as_completed(self, sections: Dict[str, Callable[[], Awaitable[Any]]]) -> AsyncIterator[Tuple[str, Any]]:
+        """Run section coroutines concurrently, yielding (section, value) as each finishes"""
+        async def run(name: str, section: Awaitable[Any]) -> Tuple[str, Any]:
+            return name, await section
         
-        # Generate weekly routine
-        routine_prompt = self._create_routine_prompt(profile, assessment)
-        routine_response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": routine_prompt}]
-        )
-        weekly_routine = self._parse_routine_response(routine_response.choices[0].message.content)
+        tasks = [asyncio.ensure_future(run(name, section())) for name, section in sections.items()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Stop paying for sections nobody will read if the consumer goes away
+            for task in tasks:
+                task.cancel()
+    
+    async def stream_sections(self, profile: ProfileModel, assessment: AssessmentModel) -> AsyncIterator[Tuple[str, Any]]:
+        """Yield (section, value) pairs in the order the sections become available"""
+        if self.mode == "template":
+            for name, value in self.templates.sections(profile, assessment).items():
+                yield name, value
+            return
         
-        # Generate reflective questions
-        questions_prompt = self._create_questions_prompt(assessment)
-        questions_response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": questions_prompt}]
-        )
-        reflective_questions = self._parse_questions_response(questions_response.choices[0].message.content)
+        for name, value in self._rule_based_sections(assessment).items():
+            yield name, value
         
-        # Generate resources
-        resources_prompt = self._create_resources_prompt(profile, assessment)
-        resources_response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": resources_prompt}]
-        )
-        resources = self._parse_resources_response(resources_response.choices[0].message.content)
+        if self.mode == "single":
+            model_sections = self._single_call_sections(profile, assessment)
+        else:
+            # The model sections are independent, so issue all calls at once
+            model_sections = self._as_completed(self._model_sections(profile, assessment))
+        async for name, value in model_sections:
+            yield name, value
+    
+    async def _single_call_sections(self, profile: ProfileModel, assessment: AssessmentModel) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Produce the model sections from one structured completion.
+        
+        Sections already in the cache, and a mood the local classifier is sure
+        of, are left out of the request. Each returned section is validated on
+        its own; only the ones that fail are re-requested with their
+        per-section prompts. If the completion fails or takes longer than
+        GUIDE_SECTION_TIMEOUT_SECONDS, the requested sections come from the
+        templates.
+        """
+        fallbacks = self._model_sections(profile, assessment)
+        wanted = ["overview", "weekly_routine", "reflective_questions", "resources"]
+        
+        local_mood = self.mood_classifier.classify(assessment.story)
+        if local_mood["confidence"] >= MOOD_CONFIDENCE_THRESHOLD:
+            yield "mood", {**local_mood, "source": "lexicon"}
+        else:
+            wanted.append("mood")
         
-        # Analyze mood from story
-        mood_analysis = await self.analyze_mood(assessment.story)
+        cache_keys = {}
+        if self.cache is not None:
+            for section, features in self._cached_section_features(profile, assessment).items():
+                cache_keys[section] = self._cache_key(section, features)
+                cached = self.cache.get(section, cache_keys[section])
+                if cached is not None:
+                    wanted.remove(section)
+                    yield section, self._section_parsers()[section](cached)
+        
+        with span("guide", "prompt"):
+            prompt = self._create_guide_prompt(profile, assessment, wanted)
+        try:
+            completion = await asyncio.wait_for(self._complete(prompt, "guide"), SECTION_TIMEOUT_SECONDS)
+        except Exception as e:
+            # The model is failing or too slow; per-section calls would only wait on it again
+            print(f"Error generating guide, using the templates instead: {str(e)}")
+            for section in wanted:
+                self.template_fallbacks[section] += 1
+                yield section, self.templates.section(section, profile, assessment)
+            return
+        try:
+            document = self._extract("guide", completion, dict)
+        except ValueError:
+            document = {}
         
+        failed = {}
+        for section in wanted:
+            try:
+                with span(section, "validate"):
+                    value = self._section_validators()[section](document[section])
+            except Exception:
+                self._record_parse(section, "invalid")
+                failed[section] = fallbacks[section]
+                continue
+            if section in cache_keys:
+                self.cache.set(section, cache_keys[section], json.dumps(document[section]))
+            yield section, value
+        
+        async for name, value in self._as_completed(failed):
+            yield name, value
+    
+    def build_guide(self, sections: Dict[str, Any], guide_id: str = "temp_id", profile_id: str = "temp_profile_id") -> GuideModel:
+        """Assemble a guide from the values produced by stream_sections"""
         return GuideModel(
-            id="temp_id",  # Will be replaced when saved
-            profile_id="temp_profile_id",  # Will be replaced when saved
-            detected_mood=mood_analysis["mood"],
-            mood_emoji=mood_analysis["emoji"],
-            overview=overview,
-            weekly_routine=weekly_routine,
-            reflective_questions=reflective_questions,
-            physical_activity=self._generate_physical_activity(assessment),
-            meal_plan=self._generate_meal_plan(assessment),
-            evening_ritual=self._generate_evening_ritual(assessment),
-            resources=resources,
-            coping_strategies=self._generate_coping_strategies(assessment)
+            id=guide_id,
+            profile_id=profile_id,
+            detected_mood=sections["mood"]["mood"],
+            mood_emoji=sections["mood"]["emoji"],
+            overview=sections["overview"],
+            weekly_routine=sections["weekly_routine"],
+            reflective_questions=sections["reflective_questions"],
+            physical_activity=sections["physical_activity"],
+            meal_plan=sections["meal_plan"],
+            evening_ritual=sections["evening_ritual"],
+            resources=sections["resources"],
+            coping_strategies=sections["coping_strategies"]
         )
     
+    async def generate_guide(self, profile: ProfileModel, assessment: AssessmentModel) -> GuideModel:
+        """Generate a personalized grief guide"""
+        sections = {name: value async for name, value in self.stream_sections(profile, assessment)}
+        return self.build_guide(sections)
+    
+    # Cache features: exactly the fields the matching _create_*_prompt reads, normalized
+    
+    def _routine_features(self, profile: ProfileModel, assessment: AssessmentModel) -> Dict[str, Any]:
+        return {
+            "work_schedule": " ".join((profile.work_schedule or "").lower().split()),
+            "energy_level": assessment.energy_level,
+            "sleep_quality": assessment.sleep_quality,
+            "coping_methods": sorted(m.value for m in assessment.coping_methods)
+        }
+    
+    def _questions_features(self, assessment: AssessmentModel) -> Dict[str, Any]:
+        return {
+            "relationship": assessment.relationship.value,
+            "time_since_loss": assessment.time_since_loss.value,
+            "coping_methods": sorted(m.value for m in assessment.coping_methods)
+        }
+    
+    def _resources_features(self, profile: ProfileModel, assessment: AssessmentModel) -> Dict[str, Any]:
+        return {
+            "location": " ".join(profile.location.lower().split()),
+            "relationship": assessment.relationship.value,
+            "current_support": sorted(s.value for s in assessment.current_support)
+        }
+    
     def _create_overview_prompt(self, profile: ProfileModel, assessment: AssessmentModel) -> str:
         return f"""Create a compassionate and personalized overview for someone grieving. Consider:
 - They lost their {assessment.relationship.value}
 - Cause: {assessment.cause_of_death.value}
 - Time since loss: {assessment.time_since_loss.value}
 - Current support: {', '.join([s.value for s in assessment.current_support])}
-- Their story: {assessment.story}
+- Their story: {self._fit("overview", assessment.story)}
 
 Write a 2-3 paragraph overview that validates their feelings and offers hope."""
     
     def _create_routine_prompt(self, profile: ProfileModel, assessment: AssessmentModel) -> str:
         return f"""Create a structured weekly routine for someone grieving. Consider:
-- Their work schedule: {profile.work_schedule}
+- Their work schedule: {profile.work_schedule and self._fit("work_schedule", profile.work_schedule)}
 - Their energy level: {assessment.energy_level}/5
 - Their sleep quality: {assessment.sleep_quality}/5
 - Their current coping methods: {', '.join([m.value for m in assessment.coping_methods])}
@@ -118,99 +349,179 @@ Return as a JSON array of question objects with 'question', 'context', and 'sugg
 
 Return as a JSON array of resource objects with 'title', 'description', 'category', and optional 'contact' fields."""
     
-    def _parse_routine_response(self, response: str) -> WeeklySchedule:
+    def _create_guide_prompt(self, profile: ProfileModel, assessment: AssessmentModel, sections: List[str]) -> str:
+        schemas = {
+            "overview": '"overview": a compassionate 2-3 paragraph overview that validates their feelings and offers hope',
+            "weekly_routine": '"weekly_routine": an object with keys "monday" through "sunday", each an array of {"time_period", "activity", "description"} objects',
+            "reflective_questions": '"reflective_questions": an array of 3 objects with "question", "context" and "suggested_prompts" (an array of strings)',
+            "resources": '"resources": an array of objects with "title", "description", "category" and optional "contact"',
+            "mood": '"mood": one of devastated, sad, anxious, angry, numb, hopeful, accepting, grateful'
+        }
+        keys = "\n".join(f"- {schemas[section]}" for section in sections)
+        return f"""Create a personalized grief support guide for someone who:
+- Lost their {assessment.relationship.value}
+- Cause: {assessment.cause_of_death.value}
+- Time since loss: {assessment.time_since_loss.value}
+- Lives in {profile.location}
+- Has support from: {', '.join([s.value for s in assessment.current_support])}
+- Uses these coping methods: {', '.join([m.value for m in assessment.coping_methods])}
+- Work schedule: {profile.work_schedule and self._fit("work_schedule", profile.work_schedule)}
+- Energy level: {assessment.energy_level}/5, sleep quality: {assessment.sleep_quality}/5
+- Their story: {self._fit("guide", assessment.story)}
+
+Return only a JSON object with these keys:
+{keys}"""
+    
+    def _section_parsers(self) -> Dict[str, Callable[[str], Any]]:
+        """Lenient parsers for cached per-section completions"""
+        return {
+            "weekly_routine": self._parse_routine_response,
+            "reflective_questions": self._parse_questions_response,
+            "resources": self._parse_resources_response
+        }
+    
+    def _section_validators(self) -> Dict[str, Callable[[Any], Any]]:
+        """Strict validators for the sections of a single-call guide document; they raise on bad data"""
+        return {
+            "overview": self._validate_overview,
+            "weekly_routine": self._coerce_routine,
+            "reflective_questions": self._validate_questions,
+            "resources": self._validate_resources,
+            "mood": self._validate_mood
+        }
+    
+    def _validate_overview(self, data: Any) -> str:
+        if not isinstance(data, str) or len(data.strip()) < 100:
+            raise ValueError("Overview must be at least 100 characters")
+        return data.strip()
+    
+    def _validate_questions(self, data: Any) -> List[ReflectiveQuestion]:
+        questions = [ReflectiveQuestion(**q) for q in self._unwrap_list(data)]
+        if not 3 <= len(questions) <= 5:
+            raise ValueError("Expected 3 to 5 reflective questions")
+        return questions
+    
+    def _validate_resources(self, data: Any) -> List[Resource]:
+        resources = [Resource(**r) for r in self._unwrap_list(data)]
+        if not resources:
+            raise ValueError("Expected at least one resource")
+        return resources
+    
+    def _validate_mood(self, data: Any) -> Dict[str, Any]:
+        mood = str(data).strip().lower()
+        if mood not in EMOJI_MOOD_MAP:
+            raise ValueError(f"Unknown mood: {mood}")
+        return {"mood": mood, "emoji": EMOJI_MOOD_MAP[mood], "confidence": None, "source": "llm"}
+    
+    def _record_parse(self, section: str, outcome: str):
+        self.parse_outcomes[section][outcome] += 1
+    
+    def get_parse_stats(self) -> Dict[str, Dict[str, int]]:
+        """Parse outcomes per section: the strategy that found the JSON, or failed / invalid"""
+        return {section: dict(outcomes) for section, outcomes in self.parse_outcomes.items()}
+    
+    def _extract(self, section: str, response: str, expected_type: Optional[type] = None) -> Any:
+        """Extract and key-normalize the JSON in a completion, recording how it was found"""
         try:
-            data = json.loads(response)
-            return WeeklySchedule(**data)
-        except:
-            # Return a basic schedule if parsing fails
-            return WeeklySchedule(
-                monday=[],
-                tuesday=[],
-                wednesday=[],
-                thursday=[],
-                friday=[],
-                saturday=[],
-                sunday=[]
+            with span(section, "parse"):
+                value, strategy = extract_json(response, expected_type)
+                value = normalize_keys(value)
+        except ValueError:
+            self._record_parse(section, "failed")
+            raise
+        self._record_parse(section, strategy)
+        return value
+    
+    def _unwrap_list(self, data: Any) -> List[Any]:
+        """Accept {"questions": [...]}-style wrappers around a list"""
+        if isinstance(data, dict):
+            lists = [value for value in data.values() if isinstance(value, list)]
+            if len(lists) == 1:
+                return lists[0]
+        if not isinstance(data, list):
+            raise ValueError("Expected a JSON array")
+        return data
+    
+    def _coerce_routine(self, data: Any) -> WeeklySchedule:
+        """Build a schedule, tolerating a wrapper object, missing days and period-keyed days"""
+        if isinstance(data, dict) and not set(data) & set(DAYS) and len(data) == 1:
+            data = next(iter(data.values()))
+        if not isinstance(data, dict):
+            raise ValueError("Expected a JSON object keyed by day")
+        
+        schedule = {}
+        for day in DAYS:
+            activities = data.get(day) or []
+            if isinstance(activities, dict):
+                # {"morning": "Walk"} or {"morning": {"activity": ..., "description": ...}}
+                activities = [
+                    {"time_period": period.replace("_", " ").capitalize(), **details} if isinstance(details, dict)
+                    else {"time_period": period.replace("_", " ").capitalize(), "activity": str(details), "description": str(details)}
+                    for period, details in activities.items()
+                ]
+            schedule[day] = [DailyActivity(**activity) for activity in activities]
+        return WeeklySchedule(**schedule)
+    
+    def _default_questions(self) -> List[ReflectiveQuestion]:
+        return [
+            ReflectiveQuestion(
+                question=prompt,
+                context="This question helps process memories",
+                suggested_prompts=["Think about...", "Remember when..."]
             )
+            for prompt in REFLECTIVE_PROMPTS[:3]
+        ]
     
-    def _parse_questions_response(self, response: str) -> List[ReflectiveQuestion]:
+    def _coerce_section(self, section: str, response: str, coerce: Callable[[Any], Any]) -> Any:
+        """Extract a section's JSON and coerce it into models; raises ValueError if either fails"""
+        data = self._extract(section, response)
         try:
-            data = json.loads(response)
-            return [ReflectiveQuestion(**q) for q in data]
-        except:
-            # Return default questions if parsing fails
-            return [
-                ReflectiveQuestion(
-                    question=REFLECTIVE_PROMPTS[0],
-                    context="This question helps process memories",
-                    suggested_prompts=["Think about...", "Remember when..."]
-                )
-            ]
+            with span(section, "validate"):
+                return coerce(data)
+        except Exception as e:
+            self._record_parse(section, "invalid")
+            raise ValueError(f"Invalid {section}: {str(e)}")
     
-    def _parse_resources_response(self, response: str) -> List[Resource]:
+    def _parse_section(self, section: str, response: str, coerce: Callable[[Any], Any], fallback: Callable[[], Any]) -> Any:
+        """Extract a section's JSON and coerce it into models, falling back to defaults on failure"""
         try:
-            data = json.loads(response)
-            return [Resource(**r) for r in data]
-        except:
-            # Return a default resource if parsing fails
-            return [
-                Resource(
-                    title="Grief Support Hotline",
-                    description="24/7 support line for those experiencing grief",
-                    category="Crisis Support",
-                    contact="1-800-XXX-XXXX"
-                )
-            ]
-    
-    def _generate_physical_activity(self, assessment: AssessmentModel) -> str:
-        if assessment.energy_level <= 2:
-            return "Gentle stretching and short walks"
-        elif assessment.energy_level <= 4:
-            return "Daily 15-minute walks and light yoga"
-        else:
-            return "Regular exercise including walks, yoga, or your preferred physical activity"
+            return self._coerce_section(section, response, coerce)
+        except ValueError:
+            return fallback()
     
-    def _generate_meal_plan(self, assessment: AssessmentModel) -> str:
-        if assessment.appetite_changes:
-            return "Start with small, frequent meals. Focus on nutritious, easy-to-digest foods."
-        else:
-            return "Maintain regular meal times with balanced nutrition."
-    
-    def _generate_evening_ritual(self, assessment: AssessmentModel) -> str:
-        components = []
-        if assessment.sleep_quality <= 3:
-            components.extend([
-                "Create a calm environment 1 hour before bed",
-                "Practice deep breathing or gentle stretching",
-                "Avoid screens 30 minutes before sleep"
-            ])
-        if CopingMethod.JOURNALING in assessment.coping_methods:
-            components.append("Write in your journal")
-        if CopingMethod.MEDITATION in assessment.coping_methods:
-            components.append("Practice a short meditation")
-            
-        return " ".join(components) if components else "Develop a consistent bedtime routine"
-    
-    def _generate_coping_strategies(self, assessment: AssessmentModel) -> List[str]:
-        strategies = []
-        for method in assessment.coping_methods:
-            if method == CopingMethod.EXERCISE:
-                strategies.append("Regular physical activity")
-            elif method == CopingMethod.MEDITATION:
-                strategies.append("Daily meditation practice")
-            elif method == CopingMethod.JOURNALING:
-                strategies.append("Express feelings through writing")
-            elif method == CopingMethod.ART:
-                strategies.append("Creative expression through art")
-            elif method == CopingMethod.NATURE:
-                strategies.append("Time in nature")
-        
-        # Add general strategies
-        strategies.extend([
-            "Deep breathing exercises",
-            "Connecting with others",
-            "Self-compassion practice"
-        ])
-        
-        return strategies[:5]  # Return top 5 strategies 
\ No newline at end of file
+    def _coerce_questions(self, data: Any) -> List[ReflectiveQuestion]:
+        questions = [ReflectiveQuestion(**q) for q in self._unwrap_list(data)]
+        if not questions:
+            raise ValueError("No questions")
+        # A guide needs 3 to 5 questions: trim extras, top up with defaults
+        return (questions + self._default_questions())[:max(3, min(len(questions), 5))]
+    
+    def _coerce_resources(self, data: Any) -> List[Resource]:
+        resources = [Resource(**r) for r in self._unwrap_list(data)]
+        if not resources:
+            raise ValueError("No resources")
+        return resources
+    
+    def _default_routine(self) -> WeeklySchedule:
+        return WeeklySchedule(**{day: [] for day in DAYS})
+    
+    def _default_resources(self) -> List[Resource]:
+        return [
+            Resource(
+                title="Grief Support Hotline",
+                description="24/7 support line for those experiencing grief",
+                category="Crisis Support",
+                contact="1-800-XXX-XXXX"
+            )
+        ]
+    
+    # Lenient parsers: on failure they return a basic schedule, default questions or a default resource
+    
+    def _parse_routine_response(self, response: str) -> WeeklySchedule:
+        return self._parse_section("weekly_routine", response, self._coerce_routine, self._default_routine)
+    
+    def _parse_questions_response(self, response: str) -> List[ReflectiveQuestion]:
+        return self._parse_section("reflective_questions", response, self._coerce_questions, self._default_questions)
+    
+    def _parse_resources_response(self, response: str) -> List[Resource]:
+        return self._parse_section("resources", response, self._coerce_resources, self._default_resources)
@@ -0,0 +1,29 @@
+from typing import Dict, Optional
+from fastapi import Request, Response
+from services.Repository import make_etag
+
+# Clients may keep responses, but must revalidate them with If-None-Match before reuse
+CACHE_CONTROL = "private, no-cache"
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match header matches `etag`, using the weak comparison GETs allow"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tag = etag[2:] if etag.startswith("W/") else etag
+    return any((candidate[2:] if candidate.startswith("W/") else candidate) == tag
+               for candidate in (part.strip() for part in header.split(",")))
+
+def variant_etag(etag: str, representation: str) -> str:
+    """ETag of another representation of the same records, e.g. their summaries, distinct from theirs"""
+    return make_etag(f"{representation}:{etag}".encode("utf-8"))
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+def json_response(body: bytes, etag: Optional[str] = None, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Send stored JSON with its ETag, computed from the body unless given"""
+    return Response(body, media_type="application/json",
+                    headers={"ETag": etag or make_etag(body), "Cache-Control": CACHE_CONTROL, **(headers or {})})
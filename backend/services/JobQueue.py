@@ -0,0 +1,221 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from models.JobModel import JobModel, JobStatus
+from services.Repository import Repository
+
+class JobQueue:
+    """
+    Bounded in-process queue of guide jobs, worked by a pool of asyncio workers.
+
+    Job records live in a repository, so any worker process sharing the
+    database can report a job's status. The queue itself and the workers
+    belong to the process that accepted the job, which is recorded on it.
+    Workers are started lazily inside the running event loop. `run` turns a
+    job into the id of the guide it produced. A restarted process picks up
+    the unfinished jobs of stopped ones with `recover`. Finished jobs are
+    kept for `retention` and then pruned, at startup and as workers finish
+    jobs. The repository must index job statuses.
+    """
+    PRUNE_INTERVAL_SECONDS = 600.0  # How often workers prune expired jobs
+
+    def __init__(self, jobs: Repository[JobModel], run: Callable[[JobModel], Awaitable[str]],
+                 workers: int = 2, max_depth: int = 100, retention: timedelta = timedelta(days=7)):
+        self.jobs = jobs
+        self.run = run
+        self.workers = workers
+        self.max_depth = max_depth
+        self.retention = retention
+        self.busy = 0
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected = 0
+        self.started = 0
+        self._wait_seconds = 0.0
+        self._recent_waits = deque(maxlen=1000)  # Queue waits of the latest started jobs
+        self._run_seconds = 0.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._finished: Dict[str, asyncio.Event] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pruned_at = 0.0
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    @classmethod
+    def from_env(cls, jobs: Repository[JobModel], run: Callable[[JobModel], Awaitable[str]]) -> "JobQueue":
+        """Pool size from GUIDE_JOB_WORKERS, queue bound from GUIDE_JOB_QUEUE_SIZE, retention from GUIDE_JOB_RETENTION_HOURS"""
+        return cls(
+            jobs,
+            run,
+            workers=int(os.getenv("GUIDE_JOB_WORKERS", "2")),
+            max_depth=int(os.getenv("GUIDE_JOB_QUEUE_SIZE", "100")),
+            retention=timedelta(hours=float(os.getenv("GUIDE_JOB_RETENTION_HOURS", "168")))
+        )
+
+    def _get_queue(self) -> asyncio.Queue:
+        """Lazily create the queue and start the workers inside the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._queue = asyncio.Queue(maxsize=self.max_depth)
+            self._loop = loop
+            self._tasks = [loop.create_task(self._work()) for _ in range(self.workers)]
+        return self._queue
+
+    def submit(self, profile_id: str, assessment_id: str) -> JobModel:
+        """
+        Queue a guide generation.
+
+        Returns:
+            JobModel: The queued job
+
+        Raises:
+            asyncio.QueueFull: If `max_depth` jobs are already waiting
+        """
+        queue = self._get_queue()
+        if queue.full():
+            self.rejected += 1
+            raise asyncio.QueueFull()
+
+        job = JobModel(id=f"job_{str(uuid.uuid4())}", profile_id=profile_id, assessment_id=assessment_id,
+                       worker=self.worker_id)
+        self.jobs.add(job.id, job, profile_id=profile_id, created_at=job.created_at)
+        self._finished[job.id] = asyncio.Event()
+        queue.put_nowait(job)
+        self.submitted += 1
+        return job
+
+    def recover(self) -> int:
+        """
+        Take over the unfinished jobs of processes that have stopped; call at startup, inside the event loop.
+
+        Queued jobs are queued here again, or failed if the queue is full.
+        Running jobs were interrupted part way and are marked failed. Jobs of
+        live processes, and of other hosts, are left alone. Only unfinished
+        jobs are read; expired finished ones are pruned first.
+
+        Returns:
+            int: The number of jobs recovered
+        """
+        queue = self._get_queue()
+        self.prune()
+        unfinished = self.jobs.list_by_status(JobStatus.QUEUED.value) + self.jobs.list_by_status(JobStatus.RUNNING.value)
+        recovered = 0
+        for job in sorted(unfinished, key=lambda job: job.created_at):
+            if not self._orphaned(job):
+                continue
+            recovered += 1
+            if job.status == JobStatus.QUEUED and not queue.full():
+                job.worker = self.worker_id
+                self.jobs.update(job.id, job)
+                self._finished[job.id] = asyncio.Event()
+                queue.put_nowait(job)
+                continue
+            job.status = JobStatus.FAILED
+            job.error = "Interrupted by a server restart" if job.started_at else "Job queue full after a server restart"
+            job.finished_at = datetime.now()
+            self.jobs.update(job.id, job)
+        return recovered
+
+    def prune(self) -> int:
+        """
+        Delete finished jobs created more than `retention` ago.
+
+        Returns:
+            int: The number of jobs deleted
+        """
+        self._pruned_at = time.monotonic()
+        cutoff = datetime.now() - self.retention
+        try:
+            return sum(self.jobs.delete_by_status(status.value, cutoff) for status in (JobStatus.SUCCEEDED, JobStatus.FAILED))
+        except Exception as e:
+            print(f"Error pruning jobs: {str(e)}")
+            return 0
+
+    def _orphaned(self, job: JobModel) -> bool:
+        """Whether the process a job belongs to has stopped"""
+        if job.worker is None:
+            return True  # Recorded before jobs named their process
+        host, _, pid = job.worker.rpartition(":")
+        if host != socket.gethostname():
+            return False
+        if int(pid) == os.getpid():
+            return job.id not in self._finished  # Left by an earlier process with the same pid
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass
+        return False
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[JobModel]:
+        """Get a job, first waiting up to `timeout` seconds for it to finish if it runs in this process"""
+        finished = self._finished.get(job_id)
+        if finished is not None and timeout > 0:
+            try:
+                await asyncio.wait_for(finished.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.jobs.get(job_id)
+
+    async def _work(self):
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            self.busy += 1
+            try:
+                await self._run_job(job)
+            finally:
+                self.busy -= 1
+                queue.task_done()
+
+    async def _run_job(self, job: JobModel):
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.now()
+        waited = (job.started_at - job.created_at).total_seconds()
+        self.started += 1
+        self._wait_seconds += waited
+        self._recent_waits.append(waited)
+        self.jobs.update(job.id, job)
+        try:
+            job.guide_id = await self.run(job)
+            job.status = JobStatus.SUCCEEDED
+            self.succeeded += 1
+        except Exception as e:
+            print(f"Error running job {job.id}: {str(e)}")
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+            self.failed += 1
+        job.finished_at = datetime.now()
+        self._run_seconds += (job.finished_at - job.started_at).total_seconds()
+        self.jobs.update(job.id, job)
+        finished = self._finished.pop(job.id, None)
+        if finished is not None:
+            finished.set()
+        if time.monotonic() - self._pruned_at >= self.PRUNE_INTERVAL_SECONDS:
+            self.prune()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, worker use, outcome counts and queue wait / run times"""
+        waits = sorted(self._recent_waits)
+        finished = self.succeeded + self.failed
+        return {
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_depth": self.max_depth,
+            "workers": self.workers,
+            "busy": self.busy,
+            "submitted": self.submitted,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_seconds": round(self._wait_seconds / self.started, 3) if self.started else 0.0,
+            "p95_wait_seconds": round(waits[int(0.95 * (len(waits) - 1))], 3) if waits else 0.0,  # Over recent jobs
+            "max_wait_seconds": round(waits[-1], 3) if waits else 0.0,
+            "avg_run_seconds": round(self._run_seconds / finished, 3) if finished else 0.0
+        }
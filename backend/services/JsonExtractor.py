@@ -0,0 +1,109 @@
+import ast
+import json
+import re
+from typing import Any, Iterator, Optional, Tuple, Type
+
+_FENCE_PATTERN = re.compile(r"```[a-zA-Z]*\s*\n?(.*?)```", re.DOTALL)
+_TRAILING_COMMA_PATTERN = re.compile(r",\s*([}\]])")
+_LINE_COMMENT_PATTERN = re.compile(r"^\s*//.*$", re.MULTILINE)
+_CAMEL_BOUNDARY_PATTERN = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+def extract_json(text: str, expected_type: Optional[Type] = None) -> Tuple[Any, str]:
+    """
+    Pull a JSON value out of an LLM completion.
+
+    Tries, in order: the raw text, the contents of ``` fences, every balanced
+    {...} / [...] span, and finally the same candidates after a lenient repair
+    pass (trailing commas, // comments, smart quotes, Python-style literals).
+
+    Args:
+        text: The raw completion
+        expected_type: dict or list to only accept values of that type
+
+    Returns:
+        The parsed value and the strategy that produced it:
+        "direct", "fenced", "scanned" or "repaired"
+
+    Raises:
+        ValueError: If no candidate parses to the expected type
+    """
+    candidates = list(_candidates(text))
+    for strategy, candidate in candidates:
+        value = _try_loads(candidate, expected_type)
+        if value is not None:
+            return value, strategy
+    for _, candidate in candidates:
+        value = _try_loads(_repair(candidate), expected_type)
+        if value is None:
+            value = _try_literal(candidate, expected_type)
+        if value is not None:
+            return value, "repaired"
+    raise ValueError("No JSON value found in completion")
+
+def _candidates(text: str) -> Iterator[Tuple[str, str]]:
+    yield "direct", text.strip()
+    for match in _FENCE_PATTERN.finditer(text):
+        yield "fenced", match.group(1).strip()
+    for span in _balanced_spans(text):
+        yield "scanned", span
+
+def _balanced_spans(text: str) -> Iterator[str]:
+    """Yield every top-level {...} or [...] span, skipping brackets inside strings"""
+    start, stack, in_string, escaped = None, [], None, False
+    closers = {"{": "}", "[": "]"}
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == in_string:
+                in_string = None
+            continue
+        if char == '"' and stack:
+            in_string = char
+        elif char in closers:
+            if not stack:
+                start = i
+            stack.append(closers[char])
+        elif stack and char == stack[-1]:
+            stack.pop()
+            if not stack:
+                yield text[start:i + 1]
+        elif char in "}]":
+            stack = []  # Unbalanced closer: start over
+
+def _repair(candidate: str) -> str:
+    repaired = candidate.translate(_SMART_QUOTES)
+    repaired = _LINE_COMMENT_PATTERN.sub("", repaired)
+    return _TRAILING_COMMA_PATTERN.sub(r"\1", repaired)
+
+def _try_loads(candidate: str, expected_type: Optional[Type]) -> Any:
+    try:
+        value = json.loads(candidate)
+    except ValueError:
+        return None
+    return value if expected_type is None or isinstance(value, expected_type) else None
+
+def _try_literal(candidate: str, expected_type: Optional[Type]) -> Any:
+    """Accept Python-style dicts and lists (single quotes, True/False/None)"""
+    literal = re.sub(r"\btrue\b", "True", re.sub(r"\bfalse\b", "False", re.sub(r"\bnull\b", "None", _repair(candidate))))
+    try:
+        value = ast.literal_eval(literal)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return None
+    return value if expected_type is None or isinstance(value, expected_type) else None
+
+def normalize_key(key: str) -> str:
+    """'Time Period', 'timePeriod' and 'time-period' all become 'time_period'"""
+    key = _CAMEL_BOUNDARY_PATTERN.sub("_", str(key).strip())
+    return re.sub(r"[\s\-]+", "_", key).lower()
+
+def normalize_keys(value: Any) -> Any:
+    """Recursively normalize the keys of every object in a JSON value"""
+    if isinstance(value, dict):
+        return {normalize_key(key): normalize_keys(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [normalize_keys(item) for item in value]
+    return value
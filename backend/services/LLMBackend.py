@@ -0,0 +1,241 @@
+import asyncio
+import json
+import math
+import os
+import random
+from abc import ABC, abstractmethod
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+from groq import AsyncGroq
+from services.PromptBudget import count_tokens
+
+DEFAULT_MODEL = "mixtral-8x7b-32768"  # Using Mixtral for its strong reasoning capabilities
+
+class LLMBackend(ABC):
+    """A chat completion API serving one model"""
+    model: str
+
+    @abstractmethod
+    async def complete(self, messages: List[Dict[str, str]], **kwargs) -> Any:
+        """
+        Create a chat completion.
+
+        Returns:
+            An OpenAI-style completion: `choices[0].message.content`, and `usage` if the API reports it
+
+        Raises:
+            Exception: API errors, with `status_code` and `response.headers` where there is an HTTP status
+        """
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+class GroqBackend(LLMBackend):
+    """
+    The Groq API.
+
+    The base URL defaults to GROQ_BASE_URL, so the client can be pointed at
+    benchmarks/fake_groq_server.py. The SDK does not retry; RateLimitedClient
+    does.
+    """
+    def __init__(self, model: str = DEFAULT_MODEL, api_key: Optional[str] = None, base_url: Optional[str] = None):
+        self.model = model
+        self.client = AsyncGroq(
+            api_key=api_key or os.getenv("GROQ_API_KEY", "your-api-key-here"),
+            base_url=base_url,
+            max_retries=0
+        )
+
+    async def complete(self, messages: List[Dict[str, str]], **kwargs) -> Any:
+        return await self.client.chat.completions.create(model=self.model, messages=messages, **kwargs)
+
+class LatencyDistribution:
+    """
+    Seconds of latency per call, drawn from a distribution given as "<kind>:<parameters>".
+
+    fixed:0.3                 every call takes 0.3 s
+    uniform:0.1,0.5           evenly between 0.1 and 0.5 s
+    lognormal:0.6,0.5         median 0.6 s, log standard deviation 0.5; a long right tail like real APIs
+    empirical:latencies.json  resampled from recorded seconds, a JSON list or one number per line
+    """
+    def __init__(self, spec: str = "fixed:0"):
+        kind, _, parameters = spec.partition(":")
+        if kind == "empirical":
+            with open(parameters) as f:
+                text = f.read()
+            try:
+                samples = json.loads(text)
+            except ValueError:
+                samples = text.split()
+            self.samples = sorted(float(sample) for sample in samples)
+            if not self.samples:
+                raise ValueError(f"No latencies in {parameters}")
+        else:
+            try:
+                self.parameters = [float(value) for value in parameters.split(",") if value]
+            except ValueError:
+                raise ValueError(f"Invalid latency distribution: {spec}")
+            expected = {"fixed": 1, "uniform": 2, "lognormal": 2}.get(kind)
+            if expected is None or len(self.parameters) != expected:
+                raise ValueError(f"Invalid latency distribution: {spec}")
+        self.kind = kind
+        self.spec = spec
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.parameters[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.parameters)
+        if self.kind == "lognormal":
+            median, sigma = self.parameters
+            return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        return rng.choice(self.samples)
+
+class FakeLLMError(Exception):
+    """An injected API failure, shaped like the SDK's status errors"""
+    def __init__(self, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(f"Injected failure with status {status_code}")
+        self.status_code = status_code
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+FAKE_ROUTINE = {
+    day: [{"time_period": "Morning (9 AM-12 PM)", "activity": "Gentle walk", "description": "A short walk outside."}]
+    for day in ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+}
+FAKE_QUESTIONS = [
+    {"question": "What memory brings you comfort?", "context": "Memories can soothe.", "suggested_prompts": ["Think about..."]}
+] * 3
+FAKE_RESOURCES = [
+    {"title": "Local Grief Support Group", "description": "Weekly meetings", "category": "Support Groups"}
+]
+FAKE_OVERVIEW = "Grief is a natural response to loss, and what you are feeling is valid. " * 3
+
+# Canned replies keyed by the start of the prompt they answer; the first match wins.
+# A dict reply to a prompt that lists `- "key":` lines is cut down to the listed keys.
+CANNED_OUTPUTS: Dict[str, Any] = {
+    "Create a personalized grief support guide": {
+        "overview": FAKE_OVERVIEW,
+        "weekly_routine": FAKE_ROUTINE,
+        "reflective_questions": FAKE_QUESTIONS,
+        "resources": FAKE_RESOURCES,
+        "mood": "sad"
+    },
+    "Create a structured weekly routine": FAKE_ROUTINE,
+    "Generate 3 reflective questions": FAKE_QUESTIONS,
+    "Suggest grief support resources": FAKE_RESOURCES,
+    "Analyze the emotional state": "sad",
+    "": FAKE_OVERVIEW
+}
+
+class FakeBackend(LLMBackend):
+    """
+    In-process stand-in for the Groq API, for benchmarks and offline runs.
+
+    Each call waits a latency drawn from `latency`, plus its prompt tokens at
+    `prompt_tokens_per_second` and its completion tokens at
+    `tokens_per_second` (0 for no per-token time). A share `error_rate` of
+    calls then fails with `error_status`; 429s ask to retry after
+    `retry_after` seconds. Replies come from `outputs`, merged over
+    CANNED_OUTPUTS.
+    """
+    def __init__(self, model: str = "fake", latency: Optional[LatencyDistribution] = None,
+                 tokens_per_second: float = 0.0, prompt_tokens_per_second: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 429, retry_after: float = 1.0,
+                 outputs: Optional[Dict[str, Any]] = None, seed: Optional[int] = None):
+        self.model = model
+        self.latency = latency or LatencyDistribution()
+        self.tokens_per_second = tokens_per_second
+        self.prompt_tokens_per_second = prompt_tokens_per_second
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.outputs = dict(outputs or {})
+        for prefix, output in CANNED_OUTPUTS.items():
+            self.outputs.setdefault(prefix, output)
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    @classmethod
+    def from_env(cls, model: str) -> "FakeBackend":
+        """
+        Configure the fake from FAKE_LLM_LATENCY, FAKE_LLM_TOKENS_PER_SECOND,
+        FAKE_LLM_PROMPT_TOKENS_PER_SECOND, FAKE_LLM_ERROR_RATE,
+        FAKE_LLM_ERROR_STATUS and FAKE_LLM_OUTPUTS (a JSON file of canned replies)
+        """
+        outputs = None
+        if os.getenv("FAKE_LLM_OUTPUTS"):
+            with open(os.environ["FAKE_LLM_OUTPUTS"]) as f:
+                outputs = json.load(f)
+        return cls(
+            model=model,
+            latency=LatencyDistribution(os.getenv("FAKE_LLM_LATENCY", "lognormal:0.6,0.5")),
+            tokens_per_second=float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "0")),
+            prompt_tokens_per_second=float(os.getenv("FAKE_LLM_PROMPT_TOKENS_PER_SECOND", "0")),
+            error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+            error_status=int(os.getenv("FAKE_LLM_ERROR_STATUS", "429")),
+            outputs=outputs
+        )
+
+    def reply(self, prompt: str) -> str:
+        """The canned reply to `prompt`"""
+        for prefix, output in self.outputs.items():
+            if prompt.startswith(prefix):
+                if isinstance(output, str):
+                    return output
+                if isinstance(output, dict):
+                    requested = {key: value for key, value in output.items() if f'- "{key}":' in prompt}
+                    output = requested or output
+                return json.dumps(output)
+        return ""
+
+    def delay(self, prompt_tokens: int, completion_tokens: int) -> float:
+        """Seconds one call takes"""
+        seconds = self.latency.sample(self.rng)
+        if self.prompt_tokens_per_second:
+            seconds += prompt_tokens / self.prompt_tokens_per_second
+        if self.tokens_per_second:
+            seconds += completion_tokens / self.tokens_per_second
+        return seconds
+
+    async def complete(self, messages: List[Dict[str, str]], **kwargs) -> Any:
+        prompt = messages[-1]["content"]
+        content = self.reply(prompt)
+        prompt_tokens = sum(count_tokens(message["content"]) for message in messages)
+        completion_tokens = count_tokens(content)
+        self.calls += 1
+        await asyncio.sleep(self.delay(prompt_tokens, completion_tokens))
+
+        if self.rng.random() < self.error_rate:
+            self.errors += 1
+            raise FakeLLMError(self.error_status, self.retry_after if self.error_status == 429 else None)
+
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                  total_tokens=prompt_tokens + completion_tokens)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens
+        }
+
+def create_backend() -> LLMBackend:
+    """
+    Create the LLM backend as configured by the environment.
+
+    LLM_BACKEND selects "groq" (default) or "fake"; LLM_MODEL names the model.
+    """
+    model = os.getenv("LLM_MODEL")
+    if os.getenv("LLM_BACKEND", "groq") == "fake":
+        return FakeBackend.from_env(model or "fake")
+    return GroqBackend(model or DEFAULT_MODEL)
@@ -0,0 +1,295 @@
+import math
+import re
+import numpy as np
+from typing import Dict, Iterator, List, Tuple
+from shared.constants import EMOJI_MOOD_MAP
+
+# Weighted cue words and phrases for each mood in EMOJI_MOOD_MAP
+MOOD_LEXICON: Dict[str, Dict[str, float]] = {
+    "devastated": {
+        "devastated": 3.0, "devastating": 2.5, "destroyed": 2.5, "shattered": 2.5, "broken": 2.0,
+        "heartbroken": 2.5, "crushed": 2.0, "unbearable": 2.5, "overwhelmed": 1.5, "overwhelming": 1.5,
+        "collapse": 1.5, "collapsed": 1.5, "can't go on": 3.0, "cannot go on": 3.0, "falling apart": 2.5,
+        "wrecked": 2.0, "agony": 2.5, "despair": 2.5, "hopeless": 2.0, "sobbing": 2.0, "world ended": 2.5,
+    },
+    "sad": {
+        "sad": 2.0, "sadness": 2.0, "cry": 1.5, "crying": 1.5, "cried": 1.5, "tears": 1.5, "miss": 1.5,
+        "missing": 1.5, "lonely": 1.5, "loneliness": 1.5, "alone": 1.0, "empty": 1.0, "grief": 1.0,
+        "grieving": 1.0, "hurt": 1.0, "hurts": 1.0, "pain": 1.0, "sorrow": 2.0, "down": 0.5,
+        "depressed": 2.0, "unhappy": 2.0, "heavy": 1.0, "longing": 1.5, "ache": 1.5, "aches": 1.5,
+    },
+    "anxious": {
+        "anxious": 2.5, "anxiety": 2.5, "worried": 2.0, "worry": 2.0, "worrying": 2.0, "scared": 2.0,
+        "afraid": 2.0, "fear": 2.0, "panic": 2.5, "panicking": 2.5, "nervous": 2.0, "restless": 1.5,
+        "can't sleep": 1.5, "on edge": 2.0, "terrified": 2.5, "uncertain": 1.0, "what if": 1.5,
+        "overthinking": 1.5, "racing": 1.0, "tense": 1.5, "dread": 2.0,
+    },
+    "angry": {
+        "angry": 2.5, "anger": 2.5, "furious": 3.0, "mad": 2.0, "rage": 3.0, "resent": 2.0,
+        "resentment": 2.0, "unfair": 2.0, "blame": 1.5, "frustrated": 2.0, "frustration": 2.0,
+        "hate": 2.0, "bitter": 2.0, "irritated": 1.5, "betrayed": 2.0, "why me": 1.5, "livid": 3.0,
+    },
+    "numb": {
+        "numb": 3.0, "numbness": 3.0, "nothing": 1.0, "blank": 1.5, "hollow": 2.0, "detached": 2.0,
+        "disconnected": 2.0, "unreal": 2.0, "surreal": 1.5, "autopilot": 2.0, "can't feel": 3.0,
+        "cannot feel": 3.0, "feel nothing": 3.0, "shock": 2.0, "fog": 1.5, "frozen": 1.5,
+        "going through the motions": 2.5,
+    },
+    "hopeful": {
+        "hopeful": 3.0, "hope": 2.0, "hoping": 1.5, "better": 1.0, "brighter": 1.5, "healing": 1.5,
+        "heal": 1.5, "optimistic": 2.5, "looking forward": 2.0, "future": 1.0, "progress": 1.5,
+        "stronger": 1.5, "improving": 1.5, "one day": 1.0, "new beginning": 2.0, "step by step": 1.5,
+    },
+    "accepting": {
+        "accept": 2.5, "accepted": 2.5, "accepting": 2.5, "acceptance": 2.5, "peace": 2.0,
+        "peaceful": 2.0, "at peace": 2.5, "calm": 1.5, "understand": 1.0, "come to terms": 2.5,
+        "let go": 2.0, "letting go": 2.0, "moving forward": 1.5, "okay": 0.5, "part of life": 2.0,
+        "settled": 1.5, "ready": 1.0,
+    },
+    "grateful": {
+        "grateful": 3.0, "gratitude": 3.0, "thankful": 3.0, "thank": 1.5, "thanks": 1.5,
+        "blessed": 2.5, "appreciate": 2.0, "appreciative": 2.0, "lucky": 1.5, "fortunate": 2.0,
+        "cherish": 2.0, "treasure": 2.0, "memories": 0.5, "love": 0.5, "gift": 1.5,
+    },
+}
+
+NEGATORS = {"not", "no", "never", "without", "hardly", "barely", "nor", "isn't", "wasn't",
+            "don't", "doesn't", "didn't", "can't", "cannot", "won't", "aren't", "couldn't"}
+# A negator followed by one of these is not negating the cue after it: "can't stop crying"
+NEGATION_BREAKERS = {"stop", "help"}
+INTENSIFIERS = {"very": 1.5, "so": 1.3, "really": 1.3, "extremely": 1.8, "completely": 1.6,
+                "totally": 1.6, "deeply": 1.5, "incredibly": 1.7, "always": 1.2}
+NEGATION_WINDOW = 3  # Tokens a negator reaches forward
+NEGATED_WEIGHT = -0.5  # A negated cue counts against its mood, at half strength
+EVIDENCE_SCALE = 3.0  # Total cue weight at which confidence saturates to ~63% of the margin
+
+_TOKEN_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+_CLAUSE_PATTERN = re.compile(r"[.!?;,\n]+|\bbut\b")
+# Batched texts are joined with the record separator and their clause breaks replaced by "."
+_TEXT_SEPARATOR = "\x1e"
+_BATCH_TOKEN_PATTERN = re.compile(r"\x1e|\.|[a-z]+(?:'[a-z]+)?")
+
+class MoodClassifier:
+    """
+    In-process lexicon classifier mapping free text onto the EMOJI_MOOD_MAP moods.
+
+    Texts are split into clauses and tokens; every lexicon phrase (up to four
+    words) found adds its weight to its mood, scaled by a preceding
+    intensifier. Phrases are matched longest first and do not overlap, so the
+    words of "feel nothing" are not counted again on their own. A negator
+    within the previous few tokens of the same clause turns the cue against
+    its mood instead, unless the negator belongs to a matched phrase ("can't
+    go on") or is followed by "stop" or "help" ("can't stop crying").
+    Confidence combines how far the winning mood is ahead with how much
+    evidence was found.
+
+    The lexicon is also held as a phrase x mood weight matrix and as sorted
+    integer keys of its phrases, which lets classify_batch match, weigh and
+    score a whole batch with array operations.
+    """
+    def __init__(self, lexicon: Dict[str, Dict[str, float]] = MOOD_LEXICON):
+        self.moods: List[str] = list(EMOJI_MOOD_MAP)
+        self.default_mood = "sad"
+        # Phrase (as a token tuple) -> row of the weight matrix
+        self._phrases: Dict[Tuple[str, ...], int] = {}
+        for terms in lexicon.values():
+            for term in terms:
+                self._phrases.setdefault(tuple(_TOKEN_PATTERN.findall(term)), len(self._phrases))
+        self._max_phrase_length = max(len(phrase) for phrase in self._phrases)
+        self._phrase_starts = {phrase[0] for phrase in self._phrases}
+
+        self._weights = np.zeros((len(self._phrases), len(self.moods)))
+        for mood, terms in lexicon.items():
+            for term, weight in terms.items():
+                self._weights[self._phrases[tuple(_TOKEN_PATTERN.findall(term))], self.moods.index(mood)] += weight
+        # Non-zero (mood, weight) pairs per phrase, for the single-text path
+        self._cues: List[List[Tuple[str, float]]] = [
+            [(self.moods[column], float(row[column])) for column in np.flatnonzero(row)] for row in self._weights
+        ]
+
+        # Batch path: phrase words get ids from 1 (0 is any other token), and each phrase of
+        # length n is the base-B number of its word ids, kept sorted per length for searchsorted
+        self._word_ids: Dict[str, int] = {}
+        for phrase in self._phrases:
+            for word in phrase:
+                self._word_ids.setdefault(word, len(self._word_ids) + 1)
+        self._base = len(self._word_ids) + 1
+        self._phrase_keys: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        for length in range(1, self._max_phrase_length + 1):
+            keyed = sorted((self._phrase_key(phrase), row) for phrase, row in self._phrases.items() if len(phrase) == length)
+            self._phrase_keys[length] = (np.array([key for key, _ in keyed], dtype=np.int64),
+                                         np.array([row for _, row in keyed], dtype=np.intp))
+
+    def _phrase_key(self, words: Tuple[str, ...]) -> int:
+        key = 0
+        for word in words:
+            key = key * self._base + self._word_ids[word]
+        return key
+
+    def tokenize(self, text: str) -> List[List[str]]:
+        """Lowercased tokens, grouped by clause"""
+        return [_TOKEN_PATTERN.findall(clause) for clause in _CLAUSE_PATTERN.split(text.lower())]
+
+    def score(self, text: str) -> Dict[str, float]:
+        """Raw weighted score per mood"""
+        return self.score_tokens(self.tokenize(text))
+
+    def score_tokens(self, clauses: List[List[str]]) -> Dict[str, float]:
+        scores = dict.fromkeys(self.moods, 0.0)
+        for phrase, multiplier in self._matches(clauses):
+            for mood, weight in self._cues[phrase]:
+                scores[mood] += weight * multiplier
+        return scores
+
+    def _matches(self, clauses: List[List[str]]) -> Iterator[Tuple[int, float]]:
+        """Yield (phrase row, multiplier) for every lexicon phrase in the text"""
+        for tokens in clauses:
+            phrase_end = 0  # End of the last matched phrase; negators inside it do not count
+            start = 0
+            while start < len(tokens):
+                length = self._match_length(tokens, start) if tokens[start] in self._phrase_starts else 0
+                if length:
+                    phrase = self._phrases[tuple(tokens[start:start + length])]
+                    yield phrase, self._context_multiplier(tokens, start, phrase_end)
+                    phrase_end = start + length
+                    start += length  # Longest phrase wins, and its words are not matched again
+                else:
+                    start += 1
+
+    def _match_length(self, tokens: List[str], start: int) -> int:
+        """Length of the longest lexicon phrase starting at `start`, or 0"""
+        for length in range(min(self._max_phrase_length, len(tokens) - start), 0, -1):
+            if tuple(tokens[start:start + length]) in self._phrases:
+                return length
+        return 0
+
+    def _context_multiplier(self, tokens: List[str], start: int, phrase_end: int = 0) -> float:
+        multiplier = INTENSIFIERS.get(tokens[start - 1], 1.0) if start else 1.0
+        for position in range(max(0, start - NEGATION_WINDOW, phrase_end), start):
+            if self._negates(tokens, position):
+                return multiplier * NEGATED_WEIGHT
+        return multiplier
+
+    def _negates(self, tokens: List[str], position: int) -> bool:
+        token = tokens[position]
+        if not (token in NEGATORS or token.endswith("n't")):
+            return False
+        return position + 1 >= len(tokens) or tokens[position + 1] not in NEGATION_BREAKERS
+
+    def classify_scores(self, scores: Dict[str, float]) -> Dict[str, object]:
+        """Turn per-mood scores into a mood, emoji and confidence in [0, 1]"""
+        positive = {mood: score for mood, score in scores.items() if score > 0}
+        if not positive:
+            return {"mood": self.default_mood, "emoji": EMOJI_MOOD_MAP[self.default_mood], "confidence": 0.0}
+
+        ranked = sorted(positive.values(), reverse=True)
+        mood = max(positive, key=positive.get)
+        total = sum(ranked)
+        runner_up = ranked[1] if len(ranked) > 1 else 0.0
+        margin = (ranked[0] - runner_up) / total
+        evidence = 1.0 - math.exp(-total / EVIDENCE_SCALE)
+        confidence = round((0.5 + 0.5 * margin) * evidence, 3)
+        return {"mood": mood, "emoji": EMOJI_MOOD_MAP[mood], "confidence": confidence}
+
+    def classify(self, text: str) -> Dict[str, object]:
+        """Classify one text; returns mood, emoji and confidence"""
+        return self.classify_scores(self.score(text))
+
+    def classify_batch(self, texts: List[str]) -> List[Dict[str, object]]:
+        """
+        Classify many texts at once; results are in input order, and equal to classify's.
+
+        The batch is tokenized by one regex pass over the joined texts. Tokens
+        become integer arrays (word id, negator, intensifier, clause and text
+        breaks), phrases are found by searching their base-B keys, and the
+        matches' multipliers come from shifted views of those arrays. Matches
+        form a sparse text x mood matrix, accumulated with one bincount.
+        """
+        if not texts:
+            return []
+        joined = _TEXT_SEPARATOR.join(texts)
+        if joined.count(_TEXT_SEPARATOR) != len(texts) - 1:
+            joined = _TEXT_SEPARATOR.join(text.replace(_TEXT_SEPARATOR, " ") for text in texts)
+        tokens = _BATCH_TOKEN_PATTERN.findall(_CLAUSE_PATTERN.sub(".", joined.lower()))
+        tokens.append(_TEXT_SEPARATOR)  # Every index + 1 below stays in range
+
+        # Per distinct token features, spread to every token through its distinct index
+        index = dict.fromkeys(tokens)
+        for position, token in enumerate(index):
+            index[token] = position
+        distinct = list(index)
+        inverse = np.fromiter(map(index.__getitem__, tokens), dtype=np.intp, count=len(tokens))
+        word_ids = np.array([self._word_ids.get(token, 0) for token in distinct], dtype=np.int64)[inverse]
+        negators = np.array([token in NEGATORS or token.endswith("n't") for token in distinct])[inverse]
+        breakers = np.array([token in NEGATION_BREAKERS for token in distinct])[inverse]
+        intensifiers = np.array([INTENSIFIERS.get(token, 1.0) for token in distinct])[inverse]
+        text_breaks = np.array([token == _TEXT_SEPARATOR for token in distinct])[inverse]
+        clause_breaks = text_breaks | np.array([token == "." for token in distinct])[inverse]
+
+        # Longest phrase at each position; breaks have word id 0, so no phrase spans them
+        count = len(tokens)
+        lengths = np.zeros(count, dtype=np.intp)
+        rows = np.zeros(count, dtype=np.intp)
+        for length in range(self._max_phrase_length, 0, -1):
+            keys, phrase_rows = self._phrase_keys[length]
+            if not len(keys) or count < length:
+                continue
+            key = np.zeros(count - length + 1, dtype=np.int64)
+            for offset in range(length):
+                key = key * self._base + word_ids[offset:count - length + 1 + offset]
+            found = np.minimum(np.searchsorted(keys, key), len(keys) - 1)
+            hits = np.flatnonzero((keys[found] == key) & (lengths[:len(key)] == 0))
+            lengths[hits] = length
+            rows[hits] = phrase_rows[found[hits]]
+
+        # Matches are taken left to right and skip past each other; overlapping runs resolve
+        # from their first match, one step per iteration
+        candidates = lengths > 0
+        selected = np.zeros(count, dtype=bool)
+        undecided = candidates.copy()
+        while undecided.any():
+            covered, maybe_covered = np.zeros(count, dtype=bool), np.zeros(count, dtype=bool)
+            for distance in range(1, self._max_phrase_length):
+                reaches = np.zeros(count, dtype=bool)
+                reaches[distance:] = lengths[:-distance] > distance
+                covered[distance:] |= selected[:-distance] & reaches[distance:]
+                maybe_covered[distance:] |= undecided[:-distance] & reaches[distance:]
+            selected |= undecided & ~covered & ~maybe_covered
+            undecided &= ~selected & ~covered
+
+        starts = np.flatnonzero(selected)
+        ends = starts + lengths[starts]
+        # Negation reaches back NEGATION_WINDOW tokens, not past the clause start or the previous match
+        clause_starts = np.maximum.accumulate(np.where(clause_breaks, np.arange(count), -1)) + 1
+        lower = np.maximum(np.maximum(starts - NEGATION_WINDOW, clause_starts[starts]),
+                           np.concatenate(([0], ends[:-1])))
+        negates = negators.copy()
+        negates[:-1] &= ~breakers[1:]
+        negated = np.zeros(len(starts), dtype=bool)
+        for distance in range(1, NEGATION_WINDOW + 1):
+            position = starts - distance
+            negated |= (position >= lower) & negates[np.maximum(position, 0)]
+        multipliers = np.where(starts > 0, intensifiers[np.maximum(starts - 1, 0)], 1.0)
+        multipliers = np.where(negated, multipliers * NEGATED_WEIGHT, multipliers)
+
+        # Sparse text x mood scores: one (text, mood) cell per match and mood
+        text_ids = np.cumsum(text_breaks)[starts]
+        moods = len(self.moods)
+        cells = (text_ids[:, None] * moods + np.arange(moods)).ravel()
+        contributions = (multipliers[:, None] * self._weights[rows[starts]]).ravel()
+        scores = np.bincount(cells, weights=contributions, minlength=len(texts) * moods).reshape(len(texts), moods)
+        positive = np.clip(scores, 0.0, None)
+
+        total = positive.sum(axis=1)
+        top_two = -np.sort(-positive, axis=1)[:, :2]
+        has_evidence = total > 0
+        safe_total = np.where(has_evidence, total, 1.0)
+        margin = (top_two[:, 0] - top_two[:, 1]) / safe_total
+        evidence = 1.0 - np.exp(-total / EVIDENCE_SCALE)
+        confidence = np.where(has_evidence, np.round((0.5 + 0.5 * margin) * evidence, 3), 0.0)
+        mood_index = np.where(has_evidence, positive.argmax(axis=1), self.moods.index(self.default_mood))
+
+        return [
+            {"mood": self.moods[index], "emoji": EMOJI_MOOD_MAP[self.moods[index]], "confidence": float(score)}
+            for index, score in zip(mood_index.tolist(), confidence.tolist())
+        ]
@@ -1,64 +1,411 @@
 import json
 import os
-from typing import Optional
+import threading
+import uuid
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
 from models.AssessmentModel import AssessmentModel
+from services.Repository import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor, format_timestamp
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process writers are serialized
+    fcntl = None
 
 class ProfileManager:
-    def __init__(self, data_dir: str = "data"):
+    """
+    Append-only, log-structured profile store.
+
+    Profiles are appended as single JSON lines to numbered segment files
+    (`profiles-00000001.jsonl`, ...). A new segment is started once the active
+    one reaches `segment_max_bytes`, and once `compact_threshold` sealed
+    segments have piled up they are merged into one, keeping only the latest
+    record per profile id. An in-memory index maps each id to its segment and
+    byte offset, and a sorted (created_at, id) list serves paginated reads.
+
+    Writes are serialized with a thread lock and, where available, an
+    exclusive `flock` on the segment, so concurrent writers never lose
+    records. Each save returns only after its line is fsynced; saves that
+    arrive while an fsync is in flight are committed together by the next one.
+    Lines that do not decode to a record are skipped and copied to
+    `quarantine.jsonl` rather than dropping the rest of the log.
+    """
+    SEGMENT_PREFIX = "profiles-"
+    SEGMENT_SUFFIX = ".jsonl"
+    OPEN_ATTEMPTS = 3  # Snapshots tried while a compaction moves segments underneath
+
+    def __init__(self, data_dir: str = "data", segment_max_bytes: int = 4 * 1024 * 1024, compact_threshold: int = 4):
         self.data_dir = data_dir
-        self.profiles_file = os.path.join(data_dir, "profiles.json")
+        self.profiles_file = os.path.join(data_dir, "profiles.json")  # Legacy single-array file
+        self.segments_dir = os.path.join(data_dir, "profiles")
+        self.quarantine_file = os.path.join(self.segments_dir, "quarantine.jsonl")
+        self.segment_max_bytes = segment_max_bytes
+        self.compact_threshold = compact_threshold
+
+        self._lock = threading.Lock()  # Guards the active segment and the index
+        self._sync_lock = threading.Lock()  # Held by the current group-commit leader
+        self._index: Dict[str, Tuple[int, int]] = {}  # profile id -> (segment, offset)
+        self._indexed_bytes: Dict[int, int] = {}  # segment -> bytes already indexed
+        self._order: List[Tuple[str, str]] = []  # Sorted (created_at, profile id)
+        self._quarantined: Set[Tuple[int, int]] = set()  # (segment, offset) of corrupt lines
+        self._written = 0
+        self._synced = 0
+        self._active_seq = 0
+        self._active_fd: Optional[int] = None
+
         self._ensure_data_directory()
-        self._ensure_profiles_file()
+        self._recover()
+        self._migrate_legacy_file()
 
     def _ensure_data_directory(self):
-        """Ensure the data directory exists."""
-        if not os.path.exists(self.data_dir):
-            os.makedirs(self.data_dir)
+        """Ensure the data and segment directories exist."""
+        if not os.path.exists(self.segments_dir):
+            os.makedirs(self.segments_dir)
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.segments_dir, f"{self.SEGMENT_PREFIX}{seq:08d}{self.SEGMENT_SUFFIX}")
+
+    def _list_segments(self) -> List[int]:
+        """Sequence numbers of the segments on disk, oldest first."""
+        seqs = []
+        for name in os.listdir(self.segments_dir):
+            if name.startswith(self.SEGMENT_PREFIX) and name.endswith(self.SEGMENT_SUFFIX):
+                seqs.append(int(name[len(self.SEGMENT_PREFIX):-len(self.SEGMENT_SUFFIX)]))
+        return sorted(seqs)
 
-    def _ensure_profiles_file(self):
-        """Ensure the profiles file exists with an empty list."""
+    def _fsync_directory(self):
+        """Make segment creation, renames and removals durable."""
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        fd = os.open(self.segments_dir, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _flock(self, fd: int, exclusive: bool = True):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+    def _funlock(self, fd: int):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def _recover(self):
+        """Truncate a torn final write left by a crash, then build the index."""
+        seqs = self._list_segments()
+        if seqs:
+            path = self._segment_path(seqs[-1])
+            fd = os.open(path, os.O_RDWR)
+            try:
+                self._flock(fd)
+                # Only the unterminated tail is torn; corrupt complete lines are quarantined on indexing
+                valid_end = 0
+                for offset, line in self._read_lines(path, 0):
+                    valid_end = offset + len(line)
+                if valid_end < os.fstat(fd).st_size:
+                    os.ftruncate(fd, valid_end)
+                    os.fsync(fd)
+            finally:
+                self._funlock(fd)
+                os.close(fd)
+        self._refresh_index()
+        self._open_active_segment(seqs[-1] if seqs else 1)
+
+    def _migrate_legacy_file(self):
+        """Import profiles from the old single-array profiles.json, once."""
         if not os.path.exists(self.profiles_file):
-            with open(self.profiles_file, 'w') as f:
-                json.dump([], f)
+            return
+        try:
+            with open(self.profiles_file, 'r') as f:
+                legacy_profiles = json.load(f)
+            for profile_dict in legacy_profiles:
+                self._append(str(uuid.uuid4()), profile_dict, created_at="")
+            os.replace(self.profiles_file, f"{self.profiles_file}.migrated")
+        except Exception as e:
+            print(f"Error migrating profiles: {str(e)}")
+
+    def _open_active_segment(self, seq: int):
+        if self._active_fd is not None:
+            os.close(self._active_fd)
+        path = self._segment_path(seq)
+        created = not os.path.exists(path)
+        self._active_fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._active_seq = seq
+        if created:
+            self._fsync_directory()
+
+    @classmethod
+    def _read_lines(cls, path: str, start: int) -> Iterator[Tuple[int, bytes]]:
+        """Yield (offset, line) for each complete line from `start` on."""
+        with open(path, 'rb') as f:
+            yield from cls._scan_lines(f, start)
+
+    @staticmethod
+    def _scan_lines(f: BinaryIO, start: int) -> Iterator[Tuple[int, bytes]]:
+        """Yield (offset, line) for each complete line of an open segment from `start` on."""
+        f.seek(start)
+        offset = start
+        for line in f:
+            if not line.endswith(b"\n"):
+                return  # Torn or in-progress write
+            yield offset, line
+            offset += len(line)
+
+    @staticmethod
+    def _parse_record(line: bytes) -> Optional[dict]:
+        """Decode one log line, or None if it is not a valid profile record."""
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        if (not isinstance(record, dict) or not isinstance(record.get("id"), str)
+                or not isinstance(record.get("created_at", ""), str) or "data" not in record):
+            return None
+        return record
+
+    def _quarantine(self, seq: int, offset: int, line: bytes):
+        """Copy a corrupt line aside, once, so it is skipped without being lost."""
+        if (seq, offset) in self._quarantined:
+            return
+        self._quarantined.add((seq, offset))
+        print(f"Error reading profile record: corrupt line at segment {seq}, offset {offset}; quarantined")
+        entry = {"segment": seq, "offset": offset, "line": line.decode("utf-8", "replace")}
+        try:
+            with open(self.quarantine_file, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print(f"Error quarantining profile record: {str(e)}")
+
+    def _refresh_index(self):
+        """Index records appended since the last refresh, including other processes' writes."""
+        seqs = self._list_segments()
+        if any(seq not in seqs for seq in self._indexed_bytes):
+            # A compaction removed segments we had indexed: rebuild from scratch
+            self._clear_index()
+        for seq in seqs:
+            path = self._segment_path(seq)
+            try:
+                for offset, line in self._read_lines(path, self._indexed_bytes.get(seq, 0)):
+                    record = self._parse_record(line)
+                    if record is None:
+                        self._quarantine(seq, offset, line)
+                    else:
+                        self._index_record(record["id"], record.get("created_at", ""), seq, offset)
+                    self._indexed_bytes[seq] = offset + len(line)
+            except FileNotFoundError:
+                continue
+
+    def _clear_index(self):
+        self._index.clear()
+        self._indexed_bytes.clear()
+        self._order.clear()
+
+    def _index_record(self, profile_id: str, created_at: str, seq: int, offset: int):
+        if profile_id not in self._index:
+            insort(self._order, (created_at, profile_id))
+        self._index[profile_id] = (seq, offset)
+
+    def _append(self, profile_id: str, profile_dict: dict, created_at: Optional[str] = None):
+        """Append one record and block until it has been fsynced."""
+        if created_at is None:
+            created_at = format_timestamp(datetime.now())
+        record = {"id": profile_id, "created_at": created_at, "data": profile_dict}
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            while True:
+                fd = self._active_fd
+                self._flock(fd)
+                if os.fstat(fd).st_nlink == 0:
+                    # Another process compacted this segment away: move to the newest one
+                    self._funlock(fd)
+                    self._open_active_segment(self._list_segments()[-1])
+                    continue
+                break
+            try:
+                offset = os.lseek(fd, 0, os.SEEK_END)
+                os.write(fd, line)
+            finally:
+                self._funlock(fd)
+
+            self._index_record(profile_id, created_at, self._active_seq, offset)
+            if self._indexed_bytes.get(self._active_seq, 0) == offset:
+                self._indexed_bytes[self._active_seq] = offset + len(line)
+            self._written += 1
+            ticket = self._written
+            rolled = offset + len(line) >= self.segment_max_bytes
+            if rolled:
+                os.fsync(fd)
+                self._synced = ticket
+                self._open_active_segment(self._active_seq + 1)
+
+        self._group_commit(ticket)
+        if rolled and len(self._list_segments()) - 1 >= self.compact_threshold:
+            self.compact()
+
+    def _group_commit(self, ticket: int):
+        """fsync the active segment, covering every write up to the latest one."""
+        with self._sync_lock:
+            if self._synced >= ticket:
+                return  # An earlier leader's fsync already covered this write
+            with self._lock:
+                target = self._written
+                fd = os.dup(self._active_fd)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            self._synced = max(self._synced, target)
+
+    def compact(self):
+        """Merge all sealed segments into one, keeping the latest record per profile."""
+        with self._lock:
+            sealed = [seq for seq in self._list_segments() if seq < self._active_seq]
+            if len(sealed) < 2:
+                return
+            fds = [os.open(self._segment_path(seq), os.O_RDONLY) for seq in sealed]
+            try:
+                for fd in fds:
+                    self._flock(fd)
+                self._refresh_index()
+
+                target_seq = sealed[-1]
+                tmp_path = f"{self._segment_path(target_seq)}.compact"
+                with open(tmp_path, 'wb') as out:
+                    for seq in sealed:
+                        for offset, line in self._read_lines(self._segment_path(seq), 0):
+                            record = self._parse_record(line)
+                            if record is not None and self._index.get(record["id"]) == (seq, offset):
+                                out.write(line)
+                    out.flush()
+                    os.fsync(out.fileno())
+                os.replace(tmp_path, self._segment_path(target_seq))
+                for seq in sealed[:-1]:
+                    os.remove(self._segment_path(seq))
+                self._fsync_directory()
+            finally:
+                for fd in fds:
+                    self._funlock(fd)
+                    os.close(fd)
+
+            self._clear_index()
+            self._refresh_index()
 
     def save_profile(self, profile_data: AssessmentModel) -> bool:
         """
-        Save a new profile to the profiles file.
-        
+        Save a new profile to the profile log.
+
         Args:
             profile_data: The profile data to save
-            
+
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            # Read existing profiles
-            with open(self.profiles_file, 'r') as f:
-                profiles = json.load(f)
-            
-            # Convert profile data to dict and add to profiles
-            profile_dict = profile_data.model_dump()
-            profiles.append(profile_dict)
-            
-            # Write updated profiles back to file
-            with open(self.profiles_file, 'w') as f:
-                json.dump(profiles, f, indent=2)
-            
+            self._append(str(uuid.uuid4()), profile_data.model_dump(mode="json"))
             return True
         except Exception as e:
             print(f"Error saving profile: {str(e)}")
             return False
 
-    def get_profiles(self) -> list:
+    def get_profiles(self) -> Iterator[dict]:
         """
-        Get all saved profiles.
-        
+        Stream all saved profiles from the segments, oldest first.
+
         Returns:
-            list: List of all saved profiles
+            Iterator[dict]: The saved profiles
         """
         try:
-            with open(self.profiles_file, 'r') as f:
-                return json.load(f)
+            index, segments = self._open_segments()
         except Exception as e:
             print(f"Error reading profiles: {str(e)}")
-            return [] 
\ No newline at end of file
+            return
+        try:
+            for seq, f in segments:
+                for offset, line in self._scan_lines(f, 0):
+                    record = self._parse_record(line)
+                    # Skip corrupt lines and records superseded by a later write of the same id
+                    if record is not None and index.get(record["id"]) == (seq, offset):
+                        yield record["data"]
+        except Exception as e:
+            print(f"Error reading profiles: {str(e)}")
+            return
+        finally:
+            for _, f in segments:
+                f.close()
+
+    def _open_segments(self) -> Tuple[Dict[str, Tuple[int, int]], List[Tuple[int, BinaryIO]]]:
+        """
+        Snapshot the index and open the segments it points into.
+
+        The open files stay readable even if a compaction replaces or removes
+        them afterwards. A segment that vanishes before it is opened means the
+        snapshot is stale, so the index is rebuilt and the snapshot retried.
+        """
+        for _ in range(self.OPEN_ATTEMPTS):
+            with self._lock:
+                self._refresh_index()
+                index = dict(self._index)
+                segments = []
+                try:
+                    for seq in sorted({seq for seq, _ in index.values()}):
+                        segments.append((seq, open(self._segment_path(seq), 'rb')))
+                    return index, segments
+                except FileNotFoundError:
+                    for _, f in segments:
+                        f.close()
+                    self._clear_index()
+        raise FileNotFoundError("profile segments kept moving during compaction")
+
+    def get_profiles_page(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                          since: Optional[datetime] = None, until: Optional[datetime] = None) -> Tuple[List[dict], Optional[str]]:
+        """
+        Get one page of saved profiles ordered by creation time.
+
+        Only the records on the page are read, located through the index.
+
+        Args:
+            limit: Maximum number of profiles in the page
+            cursor: The cursor returned with the previous page, if any
+            since: Only profiles saved at or after this time
+            until: Only profiles saved before this time
+
+        Returns:
+            The profiles, and the cursor of the next page or None on the last page
+
+        Raises:
+            ValueError: If the cursor is malformed
+            FileNotFoundError: If compactions keep moving the segments underneath
+        """
+        after = tuple(decode_cursor(cursor, str, str)) if cursor else None
+        for _ in range(self.OPEN_ATTEMPTS):
+            with self._lock:
+                self._refresh_index()
+                start = bisect_left(self._order, (format_timestamp(since),)) if since else 0
+                end = bisect_left(self._order, (format_timestamp(until),)) if until else len(self._order)
+                if after:
+                    start = max(start, bisect_right(self._order, after))
+                keys = self._order[start:min(start + limit, end)]
+                profiles = [self._read_indexed(profile_id) for _, profile_id in keys]
+                if any(profile is None for profile in profiles):
+                    # A compaction moved segments since the last refresh: rebuild and retry
+                    self._clear_index()
+                    continue
+
+            next_cursor = encode_cursor(*keys[-1]) if keys and start + limit < end else None
+            return profiles, next_cursor
+        raise FileNotFoundError("profile segments kept moving during compaction")
+
+    def _read_indexed(self, profile_id: str) -> Optional[dict]:
+        """Read a profile at its indexed position, or None if the index is stale there."""
+        seq, offset = self._index[profile_id]
+        try:
+            with open(self._segment_path(seq), 'rb') as f:
+                f.seek(offset)
+                record = self._parse_record(f.readline())
+        except FileNotFoundError:
+            return None
+        if record is None or record["id"] != profile_id:
+            return None
+        return record["data"]
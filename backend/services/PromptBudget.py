@@ -0,0 +1,124 @@
+import math
+import os
+import re
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+from services.MoodClassifier import MOOD_LEXICON
+
+# Token budgets for the free text pasted into each prompt
+STORY_TOKEN_BUDGET = int(os.getenv("STORY_TOKEN_BUDGET", "400"))
+PROMPT_BUDGETS: Dict[str, int] = {
+    "overview": STORY_TOKEN_BUDGET,  # assessment.story
+    "guide": STORY_TOKEN_BUDGET,  # assessment.story, in the single-call prompt
+    "mood": STORY_TOKEN_BUDGET,  # The text to analyze
+    "work_schedule": int(os.getenv("WORK_SCHEDULE_TOKEN_BUDGET", "100")),  # profile.work_schedule
+}
+
+_TOKEN_PATTERN = re.compile(r"\w+(?:'\w+)?|[^\w\s]")
+_SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD_PATTERN = re.compile(r"[a-z']+")
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "but", "if", "so", "of", "to", "in", "on", "at", "by", "for", "with",
+    "from", "as", "is", "was", "were", "are", "be", "been", "am", "it", "its", "this", "that", "these",
+    "those", "i", "me", "my", "we", "our", "you", "your", "he", "him", "his", "she", "her", "they",
+    "them", "their", "there", "then", "had", "has", "have", "do", "did", "not", "just", "very", "all",
+}
+# Sentences carrying feelings are the ones the overview and mood prompts need most
+CUE_WORDS = {term for terms in MOOD_LEXICON.values() for term in terms if " " not in term}
+CUE_BONUS = 1.0
+
+def count_tokens(text: str) -> int:
+    """Approximate BPE token count: one per short word or symbol, about one per four characters of longer words"""
+    return sum(1 if len(piece) <= 4 else math.ceil(len(piece) / 4) for piece in _TOKEN_PATTERN.findall(text))
+
+def summarize(text: str, budget: int) -> str:
+    """
+    Extractive summary of `text` within `budget` tokens.
+
+    Sentences are ranked by the average corpus frequency of their content
+    words, plus a bonus per emotion cue word; the first sentence, which
+    usually says what happened, is always ranked first. The best sentences
+    that fit are kept, in their original order; repeats are kept once.
+    """
+    sentences = [sentence.strip() for sentence in _SENTENCE_PATTERN.split(text) if sentence.strip()]
+    words = [[w for w in _WORD_PATTERN.findall(sentence.lower()) if w not in STOPWORDS] for sentence in sentences]
+    frequency = Counter(w for sentence_words in words for w in sentence_words)
+
+    def score(index: int) -> float:
+        if index == 0:
+            return math.inf
+        content = words[index]
+        if not content:
+            return 0.0
+        average = sum(frequency[w] for w in content) / len(content)
+        return average + CUE_BONUS * sum(w in CUE_WORDS for w in content)
+
+    kept, seen, used = [], set(), 0
+    for index in sorted(range(len(sentences)), key=score, reverse=True):
+        tokens = count_tokens(sentences[index])
+        if used + tokens <= budget and sentences[index].lower() not in seen:
+            kept.append(index)
+            seen.add(sentences[index].lower())
+            used += tokens
+    if not kept:
+        return truncate(text, budget)
+    return " ".join(sentences[index] for index in sorted(kept))
+
+def truncate(text: str, budget: int) -> str:
+    """Cut `text` to about `budget` tokens at a word boundary"""
+    used = 0
+    for match in re.finditer(r"\S+", text):
+        used += count_tokens(match.group())
+        if used > budget:
+            return text[:match.start()].rstrip() + "..."
+    return text
+
+@lru_cache(maxsize=1024)
+def fit(text: str, budget: int) -> Tuple[str, int, int]:
+    """Return `text`, summarized if it is over `budget` tokens, with its token counts before and after"""
+    before = count_tokens(text)
+    if before <= budget:
+        return text, before, before
+    fitted = summarize(text, budget)
+    return fitted, before, count_tokens(fitted)
+
+class TokenUsage:
+    """Token counts of one guide generation, per section"""
+    def __init__(self):
+        self.sections: Dict[str, Dict[str, int]] = {}
+        self.summarized = 0
+        self.tokens_saved = 0
+
+    def add(self, section: str, prompt_tokens: int, completion_tokens: int):
+        counts = self.sections.setdefault(section, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+        counts["calls"] += 1
+        counts["prompt_tokens"] += prompt_tokens
+        counts["completion_tokens"] += completion_tokens
+
+    def record_fit(self, before: int, after: int):
+        if after < before:
+            self.summarized += 1
+            self.tokens_saved += before - after
+
+    @property
+    def prompt_tokens(self) -> int:
+        return sum(counts["prompt_tokens"] for counts in self.sections.values())
+
+    @property
+    def completion_tokens(self) -> int:
+        return sum(counts["completion_tokens"] for counts in self.sections.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "summarized": self.summarized,
+            "tokens_saved": self.tokens_saved,
+            "sections": self.sections
+        }
+
+# The TokenUsage of the generation running in this context, if one is being tracked.
+# Tasks copy the context when created, so section tasks report into their generation.
+current_usage: ContextVar[Optional[TokenUsage]] = ContextVar("token_usage", default=None)
@@ -0,0 +1,296 @@
+import asyncio
+import itertools
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from services.LLMBackend import LLMBackend
+from services.PromptBudget import count_tokens
+
+INTERACTIVE_PRIORITY = 0  # A user is waiting on the result
+BATCH_PRIORITY = 1  # Background work; yields to interactive calls
+
+class PriorityLane:
+    """
+    The priority shared by a group of completions.
+
+    A lane can be promoted while its completions run or wait, e.g. when a
+    user starts waiting on background work; it is never demoted.
+    """
+    def __init__(self, level: int):
+        self.level = level
+
+    def promote(self, level: int):
+        self.level = min(self.level, level)
+
+_priority: ContextVar[PriorityLane] = ContextVar("llm_priority", default=PriorityLane(INTERACTIVE_PRIORITY))
+
+@contextmanager
+def priority(level: int) -> Iterator[PriorityLane]:
+    """Run the completions started in this block, and in tasks created from it, in a new lane at `level`"""
+    lane = PriorityLane(level)
+    token = _priority.set(lane)
+    try:
+        yield lane
+    finally:
+        _priority.reset(token)
+
+def current_lane() -> PriorityLane:
+    """The lane completions started here would run in"""
+    return _priority.get()
+
+class TokenBucket:
+    """
+    Holds up to `per_minute` units, refilled continuously at `per_minute` / 60 per second.
+
+    The level may go negative when a call turns out to cost more than was
+    reserved; later callers then wait for the debt to be repaid.
+    """
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until `amount` (at most a full bucket) is available"""
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def give(self, amount: float):
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+class RateLimiter:
+    """
+    Admits completions in priority order within request, token and concurrency budgets.
+
+    A caller waits until it is first in line (lowest current priority of its
+    lane, then arrival order), a concurrency slot is free and both the requests-per-minute
+    and tokens-per-minute buckets can cover it. A budget of 0 means unlimited.
+    After a 429, `hold` keeps every caller back until the provider's wait is over.
+    """
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0, max_concurrency: int = 8):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+        self._held_until = 0.0
+        self._waiters: List[Tuple[PriorityLane, int]] = []  # (lane, arrival); lanes can be promoted while waiting
+        self._front: Optional[Tuple[PriorityLane, int]] = None  # The waiter last seen first in line
+        self._arrivals = itertools.count()
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        """Budgets from GROQ_REQUESTS_PER_MINUTE, GROQ_TOKENS_PER_MINUTE and GROQ_MAX_CONCURRENCY"""
+        return cls(
+            requests_per_minute=int(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30")),
+            tokens_per_minute=int(os.getenv("GROQ_TOKENS_PER_MINUTE", "5000")),
+            max_concurrency=int(os.getenv("GROQ_MAX_CONCURRENCY", "8"))
+        )
+
+    def _get_condition(self) -> asyncio.Condition:
+        """Lazily create the condition inside the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+        return self._condition
+
+    def _delay(self, tokens: int) -> float:
+        """Seconds until the budgets can cover a call of `tokens` tokens"""
+        delays = [self._held_until - time.monotonic()]
+        if self.requests is not None:
+            delays.append(self.requests.delay(1))
+        if self.tokens is not None:
+            delays.append(self.tokens.delay(tokens))
+        return max(delays)
+
+    async def acquire(self, tokens: int, lane: Optional[PriorityLane] = None):
+        """Wait for this call's turn and budget, then reserve a slot and the estimated tokens"""
+        condition = self._get_condition()
+        entry = (lane or current_lane(), next(self._arrivals))
+        started = time.monotonic()
+        async with condition:
+            self._waiters.append(entry)
+            try:
+                while True:
+                    first = min(self._waiters, key=lambda waiter: (waiter[0].level, waiter[1]))
+                    if first is not self._front:
+                        # The line changed, possibly by a promotion: let the new front re-check its turn
+                        self._front = first
+                        condition.notify_all()
+                    timeout = None
+                    if first is entry and self.in_flight < self.max_concurrency:
+                        timeout = self._delay(tokens)
+                        if timeout <= 0:
+                            break
+                    try:
+                        await asyncio.wait_for(condition.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                self._waiters.remove(entry)
+                if self._front is entry:
+                    self._front = None
+                condition.notify_all()
+
+            self.in_flight += 1
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(tokens)
+
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            self.throttled += 1
+            self.wait_seconds += waited
+
+    async def release(self):
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify_all()
+
+    def settle(self, reserved: int, used: int):
+        """Correct the token bucket once a call's real usage is known"""
+        if self.tokens is not None:
+            if used < reserved:
+                self.tokens.give(reserved - used)
+            else:
+                self.tokens.take(used - reserved)
+
+    def hold(self, seconds: float):
+        """Keep every caller back for `seconds`, e.g. after a 429 with Retry-After"""
+        self._held_until = max(self._held_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "throttled": self.throttled,
+            "wait_seconds": round(self.wait_seconds, 3)
+        }
+
+class RateLimitedClient:
+    """
+    Runs an LLMBackend's chat completions through a RateLimiter with timeouts and retries.
+
+    Each attempt is bounded by `timeout` seconds. Timeouts, connection errors,
+    429s and 5xx responses are retried up to `max_retries` times with full
+    jitter exponential backoff, waiting at least as long as a Retry-After
+    header asks. Other errors are raised immediately.
+    """
+    def __init__(self, backend: LLMBackend, limiter: RateLimiter, max_retries: int = 4, timeout: float = 30.0,
+                 backoff_base: float = 0.5, backoff_cap: float = 20.0, expected_completion_tokens: int = 400):
+        self.backend = backend
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.expected_completion_tokens = expected_completion_tokens
+        self.calls = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    @classmethod
+    def from_env(cls, backend: LLMBackend, limiter: RateLimiter) -> "RateLimitedClient":
+        """Retry and timeout settings from GROQ_MAX_RETRIES and GROQ_TIMEOUT_SECONDS"""
+        return cls(
+            backend,
+            limiter,
+            max_retries=int(os.getenv("GROQ_MAX_RETRIES", "4")),
+            timeout=float(os.getenv("GROQ_TIMEOUT_SECONDS", "30"))
+        )
+
+    async def complete(self, messages: List[Dict[str, str]], **kwargs) -> Any:
+        """Create a chat completion at the current priority, retrying transient failures"""
+        lane = current_lane()
+        reserved = sum(count_tokens(message["content"]) for message in messages) + self.expected_completion_tokens
+        self.calls += 1
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(reserved, lane)
+            error = None
+            try:
+                response = await asyncio.wait_for(
+                    self.backend.complete(messages, **kwargs),
+                    self.timeout
+                )
+            except Exception as e:
+                error = e
+            finally:
+                await self.limiter.release()  # Free the slot before any backoff
+
+            if error is not None:
+                delay = self._retry_delay(error, attempt)
+                if delay is None:
+                    self.failures += 1
+                    raise error
+                self.retries += 1
+                await asyncio.sleep(delay)
+                continue
+
+            usage = getattr(response, "usage", None)
+            if usage is not None and getattr(usage, "total_tokens", None):
+                self.limiter.settle(reserved, usage.total_tokens)
+            return response
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying `error`, or None if it should be raised"""
+        if isinstance(error, asyncio.TimeoutError):
+            self.timeouts += 1
+        status = getattr(error, "status_code", None)
+        retryable = (
+            isinstance(error, asyncio.TimeoutError)
+            or type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+            or status == 429
+            or (status is not None and status >= 500)
+        )
+        if not retryable or attempt >= self.max_retries:
+            return None
+
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if status == 429:
+            self.limiter.hold(delay)
+        return delay
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            **self.limiter.stats(),
+            "model": self.backend.model,
+            "backend": self.backend.stats()
+        }
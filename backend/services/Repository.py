@@ -0,0 +1,562 @@
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, Type, TypeVar
+from pydantic import BaseModel
+from sortedcontainers import SortedList
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Builds the compact projection of a record kept next to it, e.g. a guide's summary for history listings
+Summarize = Callable[[Any], BaseModel]
+
+# Gives the indexed status of a record, e.g. a job's state, for list_by_status and delete_by_status
+Status = Callable[[Any], str]
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def format_timestamp(value: datetime) -> str:
+    """Fixed-width ISO timestamp, so stored values sort chronologically as strings"""
+    return value.isoformat(timespec="microseconds")
+
+def encode_cursor(*position: Any) -> str:
+    """Encode a position in a listing as an opaque, URL-safe cursor"""
+    return base64.urlsafe_b64encode(json.dumps(position, separators=(",", ":")).encode("utf-8")).decode("ascii")
+
+def make_etag(data: bytes) -> str:
+    """Strong ETag of a stored JSON encoding"""
+    return f'"{hashlib.blake2b(data, digest_size=16).hexdigest()}"'
+
+def combine_etags(etags: List[str], next_cursor: Optional[str]) -> str:
+    """Strong ETag of a page, from the ETags of its records and the cursor that follows it"""
+    return make_etag(",".join(etags + [next_cursor or ""]).encode("utf-8"))
+
+def decode_cursor(cursor: str, *types: type) -> List[Any]:
+    """Decode a cursor from encode_cursor holding values of `types`; raises ValueError if it is malformed"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if (not isinstance(position, list) or len(position) != len(types)
+            or not all(isinstance(value, kind) for value, kind in zip(position, types))):
+        raise ValueError("Invalid cursor")
+    return position
+
+class Repository(ABC, Generic[ModelT]):
+    """Storage for one kind of record, optionally owned by a profile"""
+
+    @abstractmethod
+    def add(self, record_id: str, record: ModelT, profile_id: Optional[str] = None, created_at: Optional[datetime] = None):
+        """Store a new record"""
+
+    @abstractmethod
+    def get(self, record_id: str) -> Optional[ModelT]:
+        """Get a record by ID, or None if it does not exist"""
+
+    @abstractmethod
+    def get_json(self, record_id: str) -> Optional[bytes]:
+        """Get a record's JSON encoding, made when it was stored, or None if it does not exist"""
+
+    @abstractmethod
+    def get_etag(self, record_id: str) -> Optional[str]:
+        """Get the ETag of a record's JSON encoding, without reading the record, or None if it does not exist"""
+
+    @abstractmethod
+    def update(self, record_id: str, record: ModelT) -> bool:
+        """Replace an existing record; returns False if it does not exist"""
+
+    @abstractmethod
+    def delete(self, record_id: str) -> bool:
+        """Delete a record; returns False if it does not exist"""
+
+    @abstractmethod
+    def delete_by_profile(self, profile_id: str) -> int:
+        """Delete every record of a profile; returns how many were deleted"""
+
+    @abstractmethod
+    def list_by_profile(self, profile_id: str) -> List[ModelT]:
+        """Get all records of a profile, oldest first"""
+
+    @abstractmethod
+    def list_all(self) -> List[ModelT]:
+        """Get every record, oldest first"""
+
+    @abstractmethod
+    def list_by_status(self, status: str) -> List[ModelT]:
+        """
+        Get the records whose status is `status`, without reading the others.
+
+        Raises:
+            TypeError: If the repository was created without a status function
+        """
+
+    @abstractmethod
+    def delete_by_status(self, status: str, before: datetime) -> int:
+        """
+        Delete the records with status `status` created before `before`; returns how many were deleted.
+
+        Raises:
+            TypeError: If the repository was created without a status function
+        """
+
+    @abstractmethod
+    def page_by_profile(self, profile_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                        since: Optional[datetime] = None, until: Optional[datetime] = None,
+                        descending: bool = False) -> Tuple[List[ModelT], Optional[str]]:
+        """
+        Get one page of a profile's records ordered by created_at.
+
+        Args:
+            profile_id: The owning profile
+            limit: Maximum number of records in the page
+            cursor: The cursor returned with the previous page, if any
+            since: Only records created at or after this time
+            until: Only records created before this time
+            descending: Newest first instead of oldest first
+
+        Returns:
+            The records, and the cursor of the next page or None on the last page
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+
+    @abstractmethod
+    def page_json_by_profile(self, profile_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                             since: Optional[datetime] = None, until: Optional[datetime] = None,
+                             descending: bool = False) -> Tuple[List[bytes], Optional[str]]:
+        """Like page_by_profile, but get each record's JSON encoding instead of the model"""
+
+    @abstractmethod
+    def page_summaries_by_profile(self, profile_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                                  since: Optional[datetime] = None, until: Optional[datetime] = None,
+                                  descending: bool = False) -> Tuple[List[bytes], Optional[str]]:
+        """
+        Like page_json_by_profile, but get the JSON of each record's summary, made when it was stored.
+
+        Raises:
+            ValueError: If the cursor is malformed
+            TypeError: If the repository was created without a summarize function
+        """
+
+    @abstractmethod
+    def page_etag_by_profile(self, profile_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                             since: Optional[datetime] = None, until: Optional[datetime] = None,
+                             descending: bool = False) -> str:
+        """
+        Get the ETag of the page page_json_by_profile would return, without reading the records.
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+
+    @abstractmethod
+    def __contains__(self, record_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+class InMemoryRepository(Repository[ModelT]):
+    """
+    Process-local dict storage; lost on restart.
+
+    Each profile's records are kept in a SortedList of (created_at, seq, id)
+    keys, and a reverse index maps every record to its profile and key, so
+    adds, deletes and page lookups are logarithmic instead of a scan. Records
+    are JSON-encoded once when stored, so they can be served without
+    re-serializing, and their ETags and summaries are computed at the same time.
+    With a status function, a status index maps each status to its records.
+    """
+
+    def __init__(self, model: Type[ModelT], summarize: Optional[Summarize] = None, status: Optional[Status] = None):
+        self.model = model
+        self.summarize = summarize
+        self.status = status
+        self._records: Dict[str, ModelT] = {}
+        self._encoded: Dict[str, bytes] = {}
+        self._etags: Dict[str, str] = {}
+        self._summaries: Dict[str, bytes] = {}
+        self._profile_keys: Dict[str, SortedList] = {}  # Maps profile_id to sorted record keys
+        self._record_keys: Dict[str, Tuple[str, Tuple[str, int, str]]] = {}  # Maps record id back to (profile_id, key)
+        self._statuses: Dict[str, Dict[str, str]] = {}  # Maps status to {record id: created_at}
+        self._record_statuses: Dict[str, str] = {}  # Maps record id back to its status
+        self._next_seq = 0
+
+    def add(self, record_id: str, record: ModelT, profile_id: Optional[str] = None, created_at: Optional[datetime] = None):
+        created_at = format_timestamp(created_at or getattr(record, "created_at", None) or datetime.now())
+        self._store(record_id, record, created_at)
+        if profile_id is not None:
+            self._next_seq += 1
+            key = (created_at, self._next_seq, record_id)
+            if profile_id not in self._profile_keys:
+                self._profile_keys[profile_id] = SortedList()
+            self._profile_keys[profile_id].add(key)
+            self._record_keys[record_id] = (profile_id, key)
+
+    def get(self, record_id: str) -> Optional[ModelT]:
+        return self._records.get(record_id)
+
+    def get_json(self, record_id: str) -> Optional[bytes]:
+        return self._encoded.get(record_id)
+
+    def get_etag(self, record_id: str) -> Optional[str]:
+        return self._etags.get(record_id)
+
+    def update(self, record_id: str, record: ModelT) -> bool:
+        if record_id not in self._records:
+            return False
+        self._store(record_id, record)
+        return True
+
+    def _store(self, record_id: str, record: ModelT, created_at: Optional[str] = None):
+        self._records[record_id] = record
+        self._encoded[record_id] = record.model_dump_json().encode("utf-8")
+        self._etags[record_id] = make_etag(self._encoded[record_id])
+        if self.summarize is not None:
+            self._summaries[record_id] = self.summarize(record).model_dump_json().encode("utf-8")
+        if self.status is not None:
+            if created_at is None:
+                created_at = self._statuses[self._record_statuses[record_id]][record_id]
+            self._unindex_status(record_id)
+            status = self.status(record)
+            self._statuses.setdefault(status, {})[record_id] = created_at
+            self._record_statuses[record_id] = status
+
+    def _unindex_status(self, record_id: str):
+        status = self._record_statuses.pop(record_id, None)
+        if status is not None:
+            records = self._statuses[status]
+            del records[record_id]
+            if not records:
+                del self._statuses[status]
+
+    def delete(self, record_id: str) -> bool:
+        if record_id not in self._records:
+            return False
+        if record_id in self._record_keys:
+            profile_id, key = self._record_keys.pop(record_id)
+            keys = self._profile_keys[profile_id]
+            keys.remove(key)
+            if not keys:
+                del self._profile_keys[profile_id]
+        del self._records[record_id]
+        del self._encoded[record_id]
+        del self._etags[record_id]
+        self._summaries.pop(record_id, None)
+        self._unindex_status(record_id)
+        return True
+
+    def delete_by_profile(self, profile_id: str) -> int:
+        keys = self._profile_keys.pop(profile_id, [])
+        for _, _, record_id in keys:
+            del self._records[record_id]
+            del self._encoded[record_id]
+            del self._etags[record_id]
+            self._summaries.pop(record_id, None)
+            self._unindex_status(record_id)
+            del self._record_keys[record_id]
+        return len(keys)
+
+    def list_by_profile(self, profile_id: str) -> List[ModelT]:
+        return [self._records[record_id] for _, _, record_id in self._profile_keys.get(profile_id, [])]
+
+    def list_all(self) -> List[ModelT]:
+        return list(self._records.values())
+
+    def list_by_status(self, status: str) -> List[ModelT]:
+        if self.status is None:
+            raise TypeError("Repository has no statuses")
+        records = sorted(self._statuses.get(status, {}).items(), key=lambda item: item[1])
+        return [self._records[record_id] for record_id, _ in records]
+
+    def delete_by_status(self, status: str, before: datetime) -> int:
+        if self.status is None:
+            raise TypeError("Repository has no statuses")
+        cutoff = format_timestamp(before)
+        expired = [record_id for record_id, created_at in self._statuses.get(status, {}).items() if created_at < cutoff]
+        for record_id in expired:
+            self.delete(record_id)
+        return len(expired)
+
+    def page_by_profile(self, profile_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                        since: Optional[datetime] = None, until: Optional[datetime] = None,
+                        descending: bool = False) -> Tuple[List[ModelT], Optional[str]]:
+        record_ids, next_cursor = self._page(profile_id, limit, cursor, since, until, descending)
+        return [self._records[record_id] for record_id in record_ids], next_cursor
+
+    def page_json_by_profile(self, profile_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                             since: Optional[datetime] = None, until: Optional[datetime] = None,
+                             descending: bool = False) -> Tuple[List[bytes], Optional[str]]:
+        record_ids, next_cursor = self._page(profile_id, limit, cursor, since, until, descending)
+        return [self._encoded[record_id] for record_id in record_ids], next_cursor
+
+    def page_summaries_by_profile(self, profile_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                                  since: Optional[datetime] = None, until: Optional[datetime] = None,
+                                  descending: bool = False) -> Tuple[List[bytes], Optional[str]]:
+        if self.summarize is None:
+            raise TypeError("Repository has no summaries")
+        record_ids, next_cursor = self._page(profile_id, limit, cursor, since, until, descending)
+        return [self._summaries[record_id] for record_id in record_ids], next_cursor
+
+    def page_etag_by_profile(self, profile_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                             since: Optional[datetime] = None, until: Optional[datetime] = None,
+                             descending: bool = False) -> str:
+        record_ids, next_cursor = self._page(profile_id, limit, cursor, since, until, descending)
+        return combine_etags([self._etags[record_id] for record_id in record_ids], next_cursor)
+
+    def _page(self, profile_id: str, limit: int, cursor: Optional[str], since: Optional[datetime],
+              until: Optional[datetime], descending: bool = False) -> Tuple[List[str], Optional[str]]:
+        """The ids in one page of a profile's records, and the next page's cursor"""
+        keys = self._profile_keys.get(profile_id) or SortedList()
+        start = keys.bisect_left((format_timestamp(since),)) if since else 0
+        end = keys.bisect_left((format_timestamp(until),)) if until else len(keys)
+        if descending:
+            if cursor:
+                created_at, seq = decode_cursor(cursor, str, int)
+                end = min(end, keys.bisect_left((created_at, seq)))
+            page = keys[max(start, end - limit):end][::-1]
+            more = end - limit > start
+        else:
+            if cursor:
+                created_at, seq = decode_cursor(cursor, str, int)
+                start = max(start, keys.bisect_left((created_at, seq + 1)))
+            page = keys[start:min(start + limit, end)]
+            more = start + limit < end
+
+        next_cursor = encode_cursor(*page[-1][:2]) if page and more else None
+        return [record_id for _, _, record_id in page], next_cursor
+
+    def __contains__(self, record_id: str) -> bool:
+        return record_id in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+class SQLiteRepository(Repository[ModelT]):
+    """
+    SQLite-backed storage shared by every worker process using the same file.
+
+    The database runs in WAL mode so readers never block the writer. Records
+    are stored as JSON next to indexed `profile_id` and `created_at` columns,
+    the ETag of the JSON, so conditional reads need not load it, the
+    JSON of the record's summary, if the repository has a summarize
+    function, and its status, indexed, if it has a status function. Each thread gets its own connection; the SQL text of every statement is
+    fixed, so sqlite3's per-connection statement cache reuses the prepared
+    statements.
+    """
+
+    def __init__(self, model: Type[ModelT], table: str, path: str, summarize: Optional[Summarize] = None,
+                 status: Optional[Status] = None):
+        self.model = model
+        self.summarize = summarize
+        self.status = status
+        self.table = table
+        self.path = path
+        self._local = threading.local()
+
+        self._insert_sql = f"INSERT INTO {table} (id, profile_id, created_at, data, etag, summary, status) VALUES (?, ?, ?, ?, ?, ?, ?)"
+        self._select_sql = f"SELECT data FROM {table} WHERE id = ?"
+        self._select_etag_sql = f"SELECT etag FROM {table} WHERE id = ?"
+        self._update_sql = f"UPDATE {table} SET data = ?, etag = ?, summary = ?, status = ? WHERE id = ?"
+        self._delete_sql = f"DELETE FROM {table} WHERE id = ?"
+        self._delete_by_profile_sql = f"DELETE FROM {table} WHERE profile_id = ?"
+        self._list_sql = f"SELECT data FROM {table} WHERE profile_id = ? ORDER BY created_at, rowid"
+        self._list_all_sql = f"SELECT data FROM {table} ORDER BY created_at, rowid"
+        self._list_by_status_sql = f"SELECT data FROM {table} WHERE status = ? ORDER BY created_at, rowid"
+        self._delete_by_status_sql = f"DELETE FROM {table} WHERE status = ? AND created_at < ?"
+        # Keyset pagination: resume strictly after the (created_at, rowid) of the previous page,
+        # in the direction of the listing
+        self._page_sql = {
+            (column, descending): (
+                f"SELECT rowid, created_at, {column} FROM {table} "
+                "WHERE profile_id = ? AND created_at >= ? AND created_at < ? "
+                + ("AND (created_at < ? OR (created_at = ? AND rowid < ?)) ORDER BY created_at DESC, rowid DESC LIMIT ?"
+                   if descending else
+                   "AND (created_at > ? OR (created_at = ? AND rowid > ?)) ORDER BY created_at, rowid LIMIT ?")
+            )
+            for column in ("data", "etag", "summary") for descending in (False, True)
+        }
+        self._exists_sql = f"SELECT 1 FROM {table} WHERE id = ?"
+        self._count_sql = f"SELECT COUNT(*) FROM {table}"
+
+        with self._connection() as conn:
+            conn.execute(f"""CREATE TABLE IF NOT EXISTS {table} (
+                id TEXT PRIMARY KEY,
+                profile_id TEXT,
+                created_at TEXT NOT NULL,
+                data TEXT NOT NULL,
+                etag TEXT,
+                summary TEXT,
+                status TEXT
+            )""")
+            columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+            if "etag" not in columns:
+                # Tables created before ETags: add the column and fill it in
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN etag TEXT")
+                rows = conn.execute(f"SELECT id, data FROM {table}").fetchall()
+                conn.executemany(f"UPDATE {table} SET etag = ? WHERE id = ?",
+                                 [(make_etag(data.encode("utf-8")), record_id) for record_id, data in rows])
+            if "summary" not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN summary TEXT")
+            if summarize is not None:
+                # Records stored before summaries, or while the repository had none
+                rows = conn.execute(f"SELECT id, data FROM {table} WHERE summary IS NULL").fetchall()
+                conn.executemany(f"UPDATE {table} SET summary = ? WHERE id = ?",
+                                 [(self._summary(model.model_validate_json(data)), record_id) for record_id, data in rows])
+            if "status" not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN status TEXT")
+            if status is not None:
+                # Records stored before statuses, or while the repository had none
+                rows = conn.execute(f"SELECT id, data FROM {table} WHERE status IS NULL").fetchall()
+                conn.executemany(f"UPDATE {table} SET status = ? WHERE id = ?",
+                                 [(status(model.model_validate_json(data)), record_id) for record_id, data in rows])
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_profile_created ON {table} (profile_id, created_at)")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_created ON {table} (created_at)")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_status_created ON {table} (status, created_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            conn = sqlite3.connect(self.path, timeout=30, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, record_id: str, record: ModelT, profile_id: Optional[str] = None, created_at: Optional[datetime] = None):
+        created_at = created_at or getattr(record, "created_at", None) or datetime.now()
+        with self._connection() as conn:
+            data = record.model_dump_json()
+            conn.execute(self._insert_sql, (record_id, profile_id, format_timestamp(created_at), data,
+                                            make_etag(data.encode("utf-8")), self._summary(record), self._status(record)))
+
+    def get(self, record_id: str) -> Optional[ModelT]:
+        row = self._connection().execute(self._select_sql, (record_id,)).fetchone()
+        return self.model.model_validate_json(row[0]) if row else None
+
+    def get_json(self, record_id: str) -> Optional[bytes]:
+        row = self._connection().execute(self._select_sql, (record_id,)).fetchone()
+        return row[0].encode("utf-8") if row else None
+
+    def get_etag(self, record_id: str) -> Optional[str]:
+        row = self._connection().execute(self._select_etag_sql, (record_id,)).fetchone()
+        return row[0] if row else None
+
+    def update(self, record_id: str, record: ModelT) -> bool:
+        data = record.model_dump_json()
+        with self._connection() as conn:
+            return conn.execute(self._update_sql, (data, make_etag(data.encode("utf-8")), self._summary(record),
+                                                   self._status(record), record_id)).rowcount > 0
+
+    def _summary(self, record: ModelT) -> Optional[str]:
+        return self.summarize(record).model_dump_json() if self.summarize is not None else None
+
+    def _status(self, record: ModelT) -> Optional[str]:
+        return self.status(record) if self.status is not None else None
+
+    def delete(self, record_id: str) -> bool:
+        with self._connection() as conn:
+            return conn.execute(self._delete_sql, (record_id,)).rowcount > 0
+
+    def delete_by_profile(self, profile_id: str) -> int:
+        with self._connection() as conn:
+            return conn.execute(self._delete_by_profile_sql, (profile_id,)).rowcount
+
+    def list_by_profile(self, profile_id: str) -> List[ModelT]:
+        rows = self._connection().execute(self._list_sql, (profile_id,)).fetchall()
+        return [self.model.model_validate_json(row[0]) for row in rows]
+
+    def list_all(self) -> List[ModelT]:
+        rows = self._connection().execute(self._list_all_sql).fetchall()
+        return [self.model.model_validate_json(row[0]) for row in rows]
+
+    def list_by_status(self, status: str) -> List[ModelT]:
+        if self.status is None:
+            raise TypeError("Repository has no statuses")
+        rows = self._connection().execute(self._list_by_status_sql, (status,)).fetchall()
+        return [self.model.model_validate_json(row[0]) for row in rows]
+
+    def delete_by_status(self, status: str, before: datetime) -> int:
+        if self.status is None:
+            raise TypeError("Repository has no statuses")
+        with self._connection() as conn:
+            return conn.execute(self._delete_by_status_sql, (status, format_timestamp(before))).rowcount
+
+    def page_by_profile(self, profile_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                        since: Optional[datetime] = None, until: Optional[datetime] = None,
+                        descending: bool = False) -> Tuple[List[ModelT], Optional[str]]:
+        data, next_cursor = self._page(profile_id, limit, cursor, since, until, descending)
+        return [self.model.model_validate_json(record) for record in data], next_cursor
+
+    def page_json_by_profile(self, profile_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                             since: Optional[datetime] = None, until: Optional[datetime] = None,
+                             descending: bool = False) -> Tuple[List[bytes], Optional[str]]:
+        data, next_cursor = self._page(profile_id, limit, cursor, since, until, descending)
+        return [record.encode("utf-8") for record in data], next_cursor
+
+    def page_summaries_by_profile(self, profile_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                                  since: Optional[datetime] = None, until: Optional[datetime] = None,
+                                  descending: bool = False) -> Tuple[List[bytes], Optional[str]]:
+        if self.summarize is None:
+            raise TypeError("Repository has no summaries")
+        summaries, next_cursor = self._page(profile_id, limit, cursor, since, until, descending, column="summary")
+        return [summary.encode("utf-8") for summary in summaries], next_cursor
+
+    def page_etag_by_profile(self, profile_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                             since: Optional[datetime] = None, until: Optional[datetime] = None,
+                             descending: bool = False) -> str:
+        etags, next_cursor = self._page(profile_id, limit, cursor, since, until, descending, column="etag")
+        return combine_etags(etags, next_cursor)
+
+    def _page(self, profile_id: str, limit: int, cursor: Optional[str], since: Optional[datetime],
+              until: Optional[datetime], descending: bool = False, column: str = "data") -> Tuple[List[str], Optional[str]]:
+        """One column of a page of a profile's records, and the next page's cursor"""
+        if cursor:
+            after_created_at, after_rowid = decode_cursor(cursor, str, int)
+        else:
+            after_created_at, after_rowid = ("\uffff", 0) if descending else ("", 0)
+        rows = self._connection().execute(self._page_sql[column, descending], (
+            profile_id,
+            format_timestamp(since) if since else "",
+            format_timestamp(until) if until else "\uffff",
+            after_created_at,
+            after_created_at,
+            after_rowid,
+            limit + 1  # One extra row tells us whether another page follows
+        )).fetchall()
+
+        last_rowid, last_created_at, _ = rows[limit - 1] if len(rows) > limit else (None, None, None)
+        next_cursor = encode_cursor(last_created_at, last_rowid) if len(rows) > limit else None
+        return [row[2] for row in rows[:limit]], next_cursor
+
+    def __contains__(self, record_id: str) -> bool:
+        return self._connection().execute(self._exists_sql, (record_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._connection().execute(self._count_sql).fetchone()[0]
+
+def create_repository(table: str, model: Type[ModelT], summarize: Optional[Summarize] = None,
+                      status: Optional[Status] = None) -> Repository[ModelT]:
+    """
+    Create the repository for a table as configured by the environment.
+
+    STORAGE_BACKEND selects "sqlite" (default) or "memory"; DATABASE_PATH sets
+    the SQLite file. With `summarize`, each record's summary is kept next to
+    it for page_summaries_by_profile; with `status`, each record's status is
+    indexed for list_by_status and delete_by_status.
+    """
+    if os.getenv("STORAGE_BACKEND", "sqlite") == "memory":
+        return InMemoryRepository(model, summarize, status)
+    return SQLiteRepository(model, table, os.getenv("DATABASE_PATH", os.path.join("data", "grief_support.db")),
+                            summarize, status)
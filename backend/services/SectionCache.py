@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+class SectionCache:
+    """
+    Content-addressed cache for generated guide sections.
+
+    Entries are keyed on a canonical hash of the inputs a section prompt reads,
+    so two assessments with the same features share one completion. The memory
+    tier is an LRU bounded by `max_entries`; every entry expires after
+    `ttl_seconds`. When `disk_dir` is set, entries are also written there as
+    JSON files and survive restarts. The disk tier is swept at startup and
+    every tenth of `max_disk_entries` writes: expired files are removed, then
+    the oldest written ones beyond `max_disk_entries`. Unreadable files are
+    removed when read.
+    """
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 86400, disk_dir: Optional[str] = None,
+                 max_disk_entries: int = 10000):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._disk_writes = 0  # Since the last sweep
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        if disk_dir:
+            if not os.path.exists(disk_dir):
+                os.makedirs(disk_dir)
+            self.sweep()
+
+    @classmethod
+    def from_env(cls) -> "SectionCache":
+        """Build a cache from the GUIDE_CACHE_* environment variables"""
+        return cls(
+            max_entries=int(os.getenv("GUIDE_CACHE_MAX_ENTRIES", "1024")),
+            ttl_seconds=float(os.getenv("GUIDE_CACHE_TTL_SECONDS", "86400")),
+            disk_dir=os.getenv("GUIDE_CACHE_DIR") or None,
+            max_disk_entries=int(os.getenv("GUIDE_CACHE_MAX_DISK_ENTRIES", "10000"))
+        )
+
+    @staticmethod
+    def make_key(section: str, features: Dict[str, Any]) -> str:
+        """Hash the section name and its normalized input features"""
+        canonical = json.dumps({"section": section, "features": features}, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, section: str, key: str) -> Optional[Any]:
+        """Return the cached value for a key, or None on a miss"""
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= now:
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            entry = self._read_disk(key, now)
+            if entry is not None:
+                self._remember(key, entry)
+        if entry is None:
+            self.misses[section] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits[section] += 1
+        return entry[1]
+
+    def set(self, section: str, key: str, value: Any):
+        """Store a value under a key in every tier"""
+        entry = (time.time() + self.ttl_seconds, value)
+        self._remember(key, entry)
+        self._write_disk(key, section, entry)
+
+    def clear(self):
+        """Drop every memory entry and reset the counters"""
+        self._entries.clear()
+        self.hits.clear()
+        self.misses.clear()
+
+    def sweep(self) -> int:
+        """Remove expired disk entries, then the oldest written beyond `max_disk_entries`; returns how many"""
+        if not self.disk_dir:
+            return 0
+        try:
+            names = os.listdir(self.disk_dir)
+        except OSError as e:
+            print(f"Error sweeping section cache: {str(e)}")
+            return 0
+        now = time.time()
+        removed = 0
+        live = []
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                written_at = os.stat(path).st_mtime
+            except OSError:
+                continue
+            if written_at + self.ttl_seconds <= now:
+                self._remove_disk(path)
+                removed += 1
+            else:
+                live.append((written_at, path))
+        if len(live) > self.max_disk_entries:
+            live.sort()
+            for _, path in live[:len(live) - self.max_disk_entries]:
+                self._remove_disk(path)
+                removed += 1
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit and miss counts per section"""
+        sections = sorted(set(self.hits) | set(self.misses))
+        return {
+            "entries": len(self._entries),
+            "sections": {
+                section: {"hits": self.hits[section], "misses": self.misses[section]}
+                for section in sections
+            }
+        }
+
+    def _remember(self, key: str, entry: Tuple[float, Any]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[float, Any]]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except OSError:
+            return None
+        except ValueError:
+            self._remove_disk(path)  # Truncated or not JSON
+            return None
+        try:
+            expires_at, value = float(data["expires_at"]), data["value"]
+        except (KeyError, TypeError, ValueError):
+            self._remove_disk(path)  # Not one of our entries
+            return None
+        if expires_at <= now:
+            self._remove_disk(path)
+            return None
+        return expires_at, value
+
+    @staticmethod
+    def _remove_disk(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _write_disk(self, key: str, section: str, entry: Tuple[float, Any]):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({"section": section, "expires_at": entry[0], "value": entry[1]}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing section cache: {str(e)}")
+            return
+        self._disk_writes += 1
+        if self._disk_writes >= max(1, self.max_disk_entries // 10):
+            self._disk_writes = 0
+            self.sweep()
@@ -0,0 +1,80 @@
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, Generic, Hashable, List, Tuple, TypeVar
+
+ResultT = TypeVar("ResultT")
+
+class SharedSectionStream(Generic[ResultT]):
+    """
+    Runs a (section, value) stream once, in its own task, for any number of followers.
+
+    Followers replay the sections produced so far and then receive new ones as
+    they arrive. Once the stream ends, `finish` turns the collected sections
+    into the final result. The work keeps running if a follower disconnects.
+    `state` holds anything the starter wants to share with the followers.
+    """
+    def __init__(self, sections: AsyncIterator[Tuple[str, Any]], finish: Callable[[Dict[str, Any]], ResultT], state: Any = None):
+        self.sections: List[Tuple[str, Any]] = []
+        self.state = state
+        self._condition = asyncio.Condition()
+        self.task: "asyncio.Task[ResultT]" = asyncio.ensure_future(self._run(sections, finish))
+        # Mark failures as retrieved even when every follower has gone away
+        self.task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def _run(self, sections: AsyncIterator[Tuple[str, Any]], finish: Callable[[Dict[str, Any]], ResultT]) -> ResultT:
+        try:
+            async for name, value in sections:
+                self.sections.append((name, value))
+                async with self._condition:
+                    self._condition.notify_all()
+            return finish(dict(self.sections))
+        finally:
+            async with self._condition:
+                self._condition.notify_all()
+
+    async def follow(self) -> AsyncIterator[Tuple[str, Any]]:
+        """Yield every section, including those produced before this follower joined"""
+        index = 0
+        while True:
+            while index < len(self.sections):
+                yield self.sections[index]
+                index += 1
+            if self.task.done():
+                return
+            async with self._condition:
+                await self._condition.wait_for(lambda: index < len(self.sections) or self.task.done())
+
+    async def result(self) -> ResultT:
+        """Wait for the final result; a cancelled follower does not cancel the shared work"""
+        return await asyncio.shield(self.task)
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key onto one in-flight SharedSectionStream.
+
+    `coalesced` counts the duplicate calls that joined an existing stream
+    instead of starting their own.
+    """
+    def __init__(self):
+        self._in_flight: Dict[Hashable, SharedSectionStream] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def join(self, key: Hashable, start: Callable[[], SharedSectionStream]) -> SharedSectionStream:
+        """Return the in-flight stream for `key`, starting one with `start()` if there is none"""
+        stream = self._in_flight.get(key)
+        if stream is not None:
+            self.coalesced += 1
+            return stream
+
+        stream = start()
+        self._in_flight[key] = stream
+        self.started += 1
+        stream.task.add_done_callback(lambda _: self._forget(key, stream))
+        return stream
+
+    def _forget(self, key: Hashable, stream: SharedSectionStream):
+        if self._in_flight.get(key) is stream:
+            del self._in_flight[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._in_flight), "started": self.started, "coalesced": self.coalesced}
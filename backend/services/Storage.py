@@ -0,0 +1,11 @@
+from models.AssessmentModel import AssessmentModel
+from models.GuideModel import GuideModel, GuideSummaryModel
+from models.JobModel import JobModel
+from models.ProfileModel import ProfileModel
+from services.Repository import Repository, create_repository
+
+# Process-wide repositories shared by the routers
+profiles: Repository[ProfileModel] = create_repository("profiles", ProfileModel)
+assessments: Repository[AssessmentModel] = create_repository("assessments", AssessmentModel)  # Indexed by profile_id
+guides: Repository[GuideModel] = create_repository("guides", GuideModel, GuideSummaryModel.from_guide)  # Indexed by profile_id, with summaries
+jobs: Repository[JobModel] = create_repository("jobs", JobModel, status=lambda job: job.status.value)  # Indexed by profile_id and status
@@ -0,0 +1,321 @@
+from typing import Any, Dict, List, Optional, Tuple
+from models.AssessmentModel import AssessmentModel
+from models.GuideModel import DailyActivity, WeeklySchedule, ReflectiveQuestion, Resource
+from models.ProfileModel import ProfileModel
+from services.MoodClassifier import MoodClassifier
+from shared.constants import (
+    CauseOfDeath,
+    CopingMethod,
+    EmploymentStatus,
+    Relationship,
+    SupportSystem,
+    TimeSinceLoss,
+    REFLECTIVE_PROMPTS,
+    RESOURCE_CATEGORIES,
+    TIME_PERIODS
+)
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+EARLY_MORNING, MORNING, LATE_MORNING, NOON, EARLY_AFTERNOON, AFTERNOON, LATE_AFTERNOON, EVENING, NIGHT = TIME_PERIODS
+GROUPS, PROFESSIONAL, CRISIS, SELF_CARE, EDUCATIONAL, COMMUNITY = RESOURCE_CATEGORIES
+
+# Overview paragraphs, picked by relationship, cause of death and time since loss
+
+RELATIONSHIP_OPENINGS: Dict[Relationship, str] = {
+    Relationship.PARENT: "Losing a parent changes the ground you stand on. The person who knew you from your first days is no longer a phone call away, and it is natural to feel unmoored.",
+    Relationship.CHILD: "There are no words big enough for the loss of a child. The love you carry for them does not end, and neither does your place as their parent.",
+    Relationship.SPOUSE: "Losing a partner means grieving both the person and the shared life you built, from the big plans to the small daily rituals.",
+    Relationship.SIBLING: "Losing a sibling means losing someone who shared your history and your memories of growing up. This grief is often overlooked, but it runs deep.",
+    Relationship.FRIEND: "Losing a close friend is losing someone you chose, and who chose you. That bond was real, and so is the grief you feel now.",
+    Relationship.GRANDPARENT: "Losing a grandparent can mean losing a keeper of family stories and a source of unconditional warmth. That loss deserves space to be felt.",
+    Relationship.OTHER: "Losing someone important to you leaves a gap no one else can fill, whatever others call the relationship you shared.",
+}
+
+CAUSE_LINES: Dict[CauseOfDeath, str] = {
+    CauseOfDeath.ILLNESS: "After an illness, grief can be mixed with exhaustion from caregiving, relief that their suffering has ended, and guilt about that relief. All of these are normal.",
+    CauseOfDeath.ACCIDENT: "An accident leaves no time to prepare or say goodbye, and the shock can make the loss feel unreal for a long time.",
+    CauseOfDeath.AGE: "Even when death comes at the end of a long life, the loss is still a loss. A full life does not make the absence any smaller.",
+    CauseOfDeath.SUDDEN: "A sudden death can leave you replaying the last moments and the things left unsaid. Shock and disbelief are common responses.",
+    CauseOfDeath.SUICIDE: "Losing someone to suicide often brings questions that may never have full answers, along with guilt or anger. It was not your fault, and you deserve support from people who understand this kind of loss.",
+    CauseOfDeath.OTHER: "However your loved one died, your grief is shaped by your own story, and there is no single right way to carry it.",
+}
+
+TIME_LINES: Dict[TimeSinceLoss, str] = {
+    TimeSinceLoss.DAYS: "It has only been days. For now it is enough to focus on the basics: rest, water, food and people who can sit with you.",
+    TimeSinceLoss.WEEKS: "In these first weeks the shock may be fading as the reality sets in. Expect hard days to arrive without warning.",
+    TimeSinceLoss.MONTHS: "Months on, others may expect you to have moved on while your grief still feels close. Your pace is the right pace.",
+    TimeSinceLoss.YEAR: "Around the first anniversary, memories and feelings can return strongly. Planning how to spend meaningful dates can help.",
+    TimeSinceLoss.YEARS: "Years later, grief often softens into something you carry rather than something that carries you, yet it can still return in waves.",
+}
+
+OVERVIEW_CLOSING = "This guide offers a gentle structure for the week ahead, with room for rest and for remembering. Take what helps and leave the rest."
+
+# Weekly routine building blocks: (activity, description)
+
+ENERGY_ACTIVITIES: Dict[int, Tuple[str, str]] = {
+    1: ("Slow start", "Get up, open the curtains, drink a glass of water and eat something small."),
+    2: ("Slow start", "Get up, open the curtains, drink a glass of water and eat something small."),
+    3: ("Morning walk", "A 15-minute walk to wake up your body and mind."),
+    4: ("Morning walk", "A 15-minute walk to wake up your body and mind."),
+    5: ("Active morning", "Exercise you enjoy, at a comfortable pace."),
+}
+
+COPING_ACTIVITIES: Dict[CopingMethod, Tuple[str, str]] = {
+    CopingMethod.EXERCISE: ("Gentle exercise", "A walk, a stretch or a light workout to release tension."),
+    CopingMethod.MEDITATION: ("Meditation", "Ten minutes of guided breathing or mindfulness."),
+    CopingMethod.JOURNALING: ("Journaling", "Write freely about how you feel today, or about a memory of your loved one."),
+    CopingMethod.ART: ("Creative time", "Draw, paint, play music or make something in their memory."),
+    CopingMethod.NATURE: ("Time outdoors", "Spend some time in a park, a garden or anywhere green."),
+    CopingMethod.WORK: ("Focused work block", "Work with a clear end time, then step away and rest."),
+    CopingMethod.TALKING: ("Talk it through", "Share a memory, or how today feels, with someone close to you."),
+    CopingMethod.NONE: ("Gentle check-in", "Spend five minutes noticing how you feel, without judging it."),
+}
+
+CONNECTION_ACTIVITY = ("Reach out", "Message or call someone you trust, even briefly.")
+REMEMBRANCE_ACTIVITY = ("Remembrance time", "Look through photos or visit a place that reminds you of them.")
+WIND_DOWN_ACTIVITY = ("Wind-down routine", "Dim the lights, put screens away and try slow breathing before bed.")
+REFLECTION_ACTIVITY = ("Quiet reflection", "Read, listen to music or look back gently on the day.")
+
+# Reflective questions: which REFLECTIVE_PROMPTS suit each stage, and a context for each prompt
+
+QUESTION_ORDER: Dict[TimeSinceLoss, List[int]] = {
+    TimeSinceLoss.DAYS: [0, 2, 5],
+    TimeSinceLoss.WEEKS: [0, 2, 5],
+    TimeSinceLoss.MONTHS: [0, 3, 5],
+    TimeSinceLoss.YEAR: [3, 5, 1],
+    TimeSinceLoss.YEARS: [1, 4, 5],
+}
+
+QUESTION_CONTEXTS = [
+    "Comforting memories can be a place to rest when the grief feels heavy.",
+    "Loss often changes what feels important; noticing that change is part of healing.",
+    "Saying what was left unsaid, even to an empty room, can ease some of its weight.",
+    "Gratitude can sit alongside grief, and remembering what your {relationship} gave you honours them.",
+    "Grief can also show you strengths you did not know you had.",
+    "Small, regular acts of remembrance keep the bond with your {relationship} alive.",
+]
+
+COPING_PROMPTS: Dict[CopingMethod, str] = {
+    CopingMethod.JOURNALING: "Write a letter that begins \"Dear ...\"",
+    CopingMethod.ART: "Draw or collect images that capture the feeling",
+    CopingMethod.MEDITATION: "Sit quietly and let a memory come to you",
+    CopingMethod.NATURE: "Think about it on a walk outside",
+    CopingMethod.EXERCISE: "Think about it on a walk outside",
+    CopingMethod.TALKING: "Talk it over with someone you trust",
+}
+
+# Resources by RESOURCE_CATEGORIES
+
+SUPPORT_GROUPS: Dict[Relationship, str] = {
+    Relationship.PARENT: "Support group for adults who have lost a parent",
+    Relationship.CHILD: "Support group for bereaved parents",
+    Relationship.SPOUSE: "Support group for widows and widowers",
+    Relationship.SIBLING: "Sibling loss support group",
+    Relationship.FRIEND: "Bereavement support group",
+    Relationship.GRANDPARENT: "Bereavement support group",
+    Relationship.OTHER: "Bereavement support group",
+}
+
+class TemplateGuideEngine:
+    """
+    Builds every guide section offline from the template tables above.
+
+    Sections are picked and filled by the assessment's enums, so a guide
+    takes well under a millisecond. It serves as an instant draft, as the
+    fallback for any model section that fails, and as the "template"
+    generation mode.
+    """
+    def __init__(self, mood_classifier: Optional[MoodClassifier] = None):
+        self.mood_classifier = mood_classifier or MoodClassifier()
+
+    def sections(self, profile: ProfileModel, assessment: AssessmentModel) -> Dict[str, Any]:
+        """Every guide section, keyed like the values of GroqService.stream_sections"""
+        return {
+            **self.rule_based_sections(assessment),
+            **{name: self.section(name, profile, assessment) for name in ("mood", "overview", "weekly_routine", "reflective_questions", "resources")}
+        }
+
+    def section(self, name: str, profile: ProfileModel, assessment: AssessmentModel) -> Any:
+        """One of the sections normally written by the model"""
+        if name == "mood":
+            return {**self.mood_classifier.classify(assessment.story), "source": "lexicon"}
+        if name == "overview":
+            return self.overview(assessment)
+        if name == "weekly_routine":
+            return self.weekly_routine(assessment)
+        if name == "reflective_questions":
+            return self.reflective_questions(assessment)
+        if name == "resources":
+            return self.resources(profile, assessment)
+        raise ValueError(f"Unknown section: {name}")
+
+    def rule_based_sections(self, assessment: AssessmentModel) -> Dict[str, Any]:
+        return {
+            "physical_activity": self._generate_physical_activity(assessment),
+            "meal_plan": self._generate_meal_plan(assessment),
+            "evening_ritual": self._generate_evening_ritual(assessment),
+            "coping_strategies": self._generate_coping_strategies(assessment)
+        }
+
+    def overview(self, assessment: AssessmentModel) -> str:
+        support = [s.value.lower() for s in assessment.current_support if s != SupportSystem.NONE]
+        if support:
+            support_line = f"Keep leaning on the support you have: {', '.join(support)}."
+        else:
+            support_line = "You do not have to carry this alone. Reaching out to even one person or a support group can make a difference."
+        return "\n\n".join([
+            RELATIONSHIP_OPENINGS[assessment.relationship],
+            f"{CAUSE_LINES[assessment.cause_of_death]} {TIME_LINES[assessment.time_since_loss]}",
+            f"{support_line} {OVERVIEW_CLOSING}"
+        ])
+
+    def weekly_routine(self, assessment: AssessmentModel) -> WeeklySchedule:
+        coping = [COPING_ACTIVITIES[m] for m in assessment.coping_methods] or [CONNECTION_ACTIVITY]
+        morning = ENERGY_ACTIVITIES[assessment.energy_level]
+        night = WIND_DOWN_ACTIVITY if assessment.sleep_quality <= 3 else REFLECTION_ACTIVITY
+        working = assessment.employment_status in (EmploymentStatus.EMPLOYED, EmploymentStatus.STUDENT)
+
+        schedule = {}
+        for index, day in enumerate(DAYS):
+            # Fit around work or classes on weekdays
+            busy = working and index < 5
+            slots = [
+                (EARLY_MORNING if busy else MORNING, morning),
+                (EVENING if busy else AFTERNOON, coping[index % len(coping)])
+            ]
+            if day == "wednesday" or (day == "saturday" and SupportSystem.NONE in assessment.current_support):
+                slots.append((EVENING, CONNECTION_ACTIVITY))
+            elif day == "sunday":
+                slots.append((AFTERNOON, REMEMBRANCE_ACTIVITY))
+            slots.append((NIGHT, night))
+            schedule[day] = [
+                DailyActivity(time_period=period, activity=activity, description=description)
+                for period, (activity, description) in sorted(slots, key=lambda slot: TIME_PERIODS.index(slot[0]))
+            ]
+        return WeeklySchedule(**schedule)
+
+    def reflective_questions(self, assessment: AssessmentModel) -> List[ReflectiveQuestion]:
+        relationship = "loved one" if assessment.relationship == Relationship.OTHER else assessment.relationship.value.lower()
+        extra = [COPING_PROMPTS[m] for m in assessment.coping_methods if m in COPING_PROMPTS][:1]
+        return [
+            ReflectiveQuestion(
+                question=REFLECTIVE_PROMPTS[index],
+                context=QUESTION_CONTEXTS[index].format(relationship=relationship),
+                suggested_prompts=["Think about...", "Remember when...", *extra]
+            )
+            for index in QUESTION_ORDER[assessment.time_since_loss]
+        ]
+
+    def resources(self, profile: ProfileModel, assessment: AssessmentModel) -> List[Resource]:
+        support = set(assessment.current_support)
+        resources = []
+        if SupportSystem.THERAPIST not in support:
+            resources.append(Resource(
+                title="Grief counselling",
+                description="A counsellor or therapist who specialises in bereavement can help you work through the loss at your own pace.",
+                category=PROFESSIONAL
+            ))
+        if assessment.cause_of_death == CauseOfDeath.SUICIDE:
+            resources.append(Resource(
+                title="Suicide loss survivors group",
+                description="Peer support for people who have lost someone to suicide.",
+                category=GROUPS
+            ))
+        elif SupportSystem.SUPPORT_GROUP not in support:
+            resources.append(Resource(
+                title=SUPPORT_GROUPS[assessment.relationship],
+                description=f"Look for in-person or online groups near {profile.location}; hearing from others who understand can ease isolation.",
+                category=GROUPS
+            ))
+        if SupportSystem.RELIGIOUS in support:
+            resources.append(Resource(
+                title="Your faith community",
+                description="Rituals, prayer and your community's leaders can offer comfort and practical support.",
+                category=COMMUNITY
+            ))
+        elif SupportSystem.NONE in support:
+            resources.append(Resource(
+                title="Local bereavement services",
+                description=f"Hospices, community centres and charities near {profile.location} often run free bereavement services.",
+                category=COMMUNITY
+            ))
+        if assessment.time_since_loss in (TimeSinceLoss.DAYS, TimeSinceLoss.WEEKS):
+            resources.append(Resource(
+                title="Books on early grief",
+                description="Short, gentle reads about the first weeks after a loss, for when concentrating is hard.",
+                category=EDUCATIONAL
+            ))
+        else:
+            resources.append(Resource(
+                title="Books on living with loss",
+                description="Memoirs and guides about carrying grief over the longer term.",
+                category=EDUCATIONAL
+            ))
+            resources.append(Resource(
+                title="Memory box or remembrance ritual",
+                description="Gather photos, letters and keepsakes, or set a yearly ritual to honour them.",
+                category=SELF_CARE
+            ))
+        resources.append(Resource(
+            title="Self-care check-ins",
+            description="Keep regular sleep, meals and movement; they make the hardest days more manageable.",
+            category=SELF_CARE
+        ))
+        resources.append(Resource(
+            title="Crisis support",
+            description="If grief ever feels unbearable or you think about harming yourself, contact your local emergency number or a crisis line right away.",
+            category=CRISIS
+        ))
+        return resources
+
+    def _generate_physical_activity(self, assessment: AssessmentModel) -> str:
+        if assessment.energy_level <= 2:
+            return "Gentle stretching and short walks"
+        elif assessment.energy_level <= 4:
+            return "Daily 15-minute walks and light yoga"
+        else:
+            return "Regular exercise including walks, yoga, or your preferred physical activity"
+
+    def _generate_meal_plan(self, assessment: AssessmentModel) -> str:
+        if assessment.appetite_changes:
+            return "Start with small, frequent meals. Focus on nutritious, easy-to-digest foods."
+        else:
+            return "Maintain regular meal times with balanced nutrition."
+
+    def _generate_evening_ritual(self, assessment: AssessmentModel) -> str:
+        components = []
+        if assessment.sleep_quality <= 3:
+            components.extend([
+                "Create a calm environment 1 hour before bed",
+                "Practice deep breathing or gentle stretching",
+                "Avoid screens 30 minutes before sleep"
+            ])
+        if CopingMethod.JOURNALING in assessment.coping_methods:
+            components.append("Write in your journal")
+        if CopingMethod.MEDITATION in assessment.coping_methods:
+            components.append("Practice a short meditation")
+
+        return " ".join(components) if components else "Develop a consistent bedtime routine"
+
+    def _generate_coping_strategies(self, assessment: AssessmentModel) -> List[str]:
+        strategies = []
+        for method in assessment.coping_methods:
+            if method == CopingMethod.EXERCISE:
+                strategies.append("Regular physical activity")
+            elif method == CopingMethod.MEDITATION:
+                strategies.append("Daily meditation practice")
+            elif method == CopingMethod.JOURNALING:
+                strategies.append("Express feelings through writing")
+            elif method == CopingMethod.ART:
+                strategies.append("Creative expression through art")
+            elif method == CopingMethod.NATURE:
+                strategies.append("Time in nature")
+
+        # Add general strategies
+        strategies.extend([
+            "Deep breathing exercises",
+            "Connecting with others",
+            "Self-compassion practice"
+        ])
+
+        return strategies[:5]  # Return top 5 strategies
@@ -0,0 +1,52 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from fastapi.testclient import TestClient
+from services.Compression import CompressedCache, CompressionMiddleware
+
+ETAG = '"abc"'
+
+def make_client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/big")
+    def big(request: Request):
+        if request.headers.get("if-none-match") == ETAG:
+            return Response(status_code=304, headers={"ETag": ETAG})
+        return JSONResponse({"text": "x" * 4096}, headers={"ETag": ETAG})
+
+    @app.get("/small")
+    def small():
+        return JSONResponse({"text": "x"}, headers={"Vary": "Origin"})
+
+    @app.get("/image")
+    def image():
+        return Response(b"\x89PNG" * 1024, media_type="image/png")
+
+    return TestClient(CompressionMiddleware(app, minimum_size=1024, cache=CompressedCache()))
+
+@pytest.mark.parametrize("accept_encoding", ["gzip", "identity", ""])
+def test_eligible_responses_vary_on_accept_encoding(accept_encoding):
+    client = make_client()
+    big = client.get("/big", headers={"Accept-Encoding": accept_encoding})
+    assert big.headers["vary"] == "Accept-Encoding"
+    assert big.headers.get("content-encoding") == ("gzip" if accept_encoding == "gzip" else None)
+    assert big.json() == {"text": "x" * 4096}
+
+    small = client.get("/small", headers={"Accept-Encoding": accept_encoding})
+    assert small.headers["vary"] == "Origin, Accept-Encoding"
+    assert "content-encoding" not in small.headers
+
+def test_ineligible_responses_do_not_vary():
+    response = make_client().get("/image", headers={"Accept-Encoding": "gzip"})
+    assert "vary" not in response.headers
+    assert "content-encoding" not in response.headers
+
+def test_compressed_etag_revalidates():
+    client = make_client()
+    first = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["etag"] == '"abc-gzip"'
+    again = client.get("/big", headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+    assert again.headers["etag"] == '"abc-gzip"'
+    assert again.headers["vary"] == "Accept-Encoding"
@@ -0,0 +1,58 @@
+import asyncio
+import socket
+from datetime import datetime, timedelta
+from models.JobModel import JobModel, JobStatus
+from services.JobQueue import JobQueue
+from services.Repository import InMemoryRepository
+
+def job_status(job: JobModel) -> str:
+    return job.status.value
+
+def make_queue(run=None, **kwargs) -> JobQueue:
+    async def finish(job: JobModel) -> str:
+        return f"guide_for_{job.id}"
+    return JobQueue(InMemoryRepository(JobModel, status=job_status), run or finish, **kwargs)
+
+def add_job(queue: JobQueue, job_id: str, status: JobStatus, worker: str = "gone:1", age: timedelta = timedelta()):
+    created_at = datetime.now() - age
+    job = JobModel(id=job_id, profile_id="p1", assessment_id="a1", status=status, worker=worker, created_at=created_at,
+                   started_at=created_at if status == JobStatus.RUNNING else None)
+    queue.jobs.add(job_id, job, profile_id="p1", created_at=created_at)
+
+def test_submit_and_wait():
+    async def scenario():
+        queue = make_queue()
+        job = queue.submit("p1", "a1")
+        finished = await queue.wait(job.id, 5)
+        assert finished.status == JobStatus.SUCCEEDED
+        assert finished.guide_id == f"guide_for_{job.id}"
+    asyncio.run(scenario())
+
+def test_recover_requeues_queued_and_fails_running():
+    async def scenario():
+        queue = make_queue()
+        add_job(queue, "queued", JobStatus.QUEUED, worker=None)
+        add_job(queue, "running", JobStatus.RUNNING, worker=f"{socket.gethostname()}:999999999")
+        add_job(queue, "other_host", JobStatus.RUNNING, worker="elsewhere:1")
+        add_job(queue, "done", JobStatus.SUCCEEDED, worker=None)
+
+        assert queue.recover() == 2
+        assert (await queue.wait("queued", 5)).status == JobStatus.SUCCEEDED
+        running = queue.jobs.get("running")
+        assert running.status == JobStatus.FAILED and running.error == "Interrupted by a server restart"
+        assert queue.jobs.get("other_host").status == JobStatus.RUNNING
+        assert queue.jobs.get("done").status == JobStatus.SUCCEEDED
+    asyncio.run(scenario())
+
+def test_prune_removes_only_expired_finished_jobs():
+    async def scenario():
+        queue = make_queue(retention=timedelta(days=1))
+        add_job(queue, "old_done", JobStatus.SUCCEEDED, age=timedelta(days=2))
+        add_job(queue, "old_failed", JobStatus.FAILED, age=timedelta(days=2))
+        add_job(queue, "new_done", JobStatus.SUCCEEDED)
+        add_job(queue, "old_running", JobStatus.RUNNING, worker="elsewhere:1", age=timedelta(days=2))
+
+        queue.recover()
+        assert "old_done" not in queue.jobs and "old_failed" not in queue.jobs
+        assert "new_done" in queue.jobs and "old_running" in queue.jobs
+    asyncio.run(scenario())
@@ -0,0 +1,138 @@
+import glob
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+import pytest
+from pydantic import BaseModel
+from services.ProfileManager import ProfileManager
+from services.Repository import encode_cursor
+
+class Note(BaseModel):
+    n: int
+
+def make_manager(data_dir, **kwargs) -> ProfileManager:
+    kwargs.setdefault("segment_max_bytes", 200)
+    kwargs.setdefault("compact_threshold", 100)
+    return ProfileManager(str(data_dir), **kwargs)
+
+def segments(data_dir):
+    return sorted(glob.glob(os.path.join(str(data_dir), "profiles", "profiles-*.jsonl")))
+
+def saved(manager):
+    return sorted(profile["n"] for profile in manager.get_profiles())
+
+def test_save_and_reopen(tmp_path):
+    manager = make_manager(tmp_path)
+    for n in range(10):
+        assert manager.save_profile(Note(n=n))
+    assert len(segments(tmp_path)) > 1
+    assert saved(manager) == list(range(10))
+    assert saved(make_manager(tmp_path)) == list(range(10))
+
+def test_concurrent_saves_are_all_kept(tmp_path):
+    manager = make_manager(tmp_path, segment_max_bytes=4096)
+    threads = [threading.Thread(target=manager.save_profile, args=(Note(n=n),)) for n in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert saved(manager) == list(range(40))
+    assert saved(make_manager(tmp_path, segment_max_bytes=4096)) == list(range(40))
+
+def test_compaction_merges_sealed_segments(tmp_path):
+    manager = make_manager(tmp_path)
+    for n in range(10):
+        manager.save_profile(Note(n=n))
+    before = len(segments(tmp_path))
+    manager.compact()
+    assert len(segments(tmp_path)) == 2  # The merged sealed segment and the active one
+    assert before > 2
+    assert saved(manager) == list(range(10))
+    assert saved(make_manager(tmp_path)) == list(range(10))
+
+def test_automatic_compaction(tmp_path):
+    manager = make_manager(tmp_path, compact_threshold=2)
+    for n in range(20):
+        manager.save_profile(Note(n=n))
+    assert len(segments(tmp_path)) <= 3
+    assert saved(manager) == list(range(20))
+
+def test_compaction_by_another_instance_during_read(tmp_path):
+    reader = make_manager(tmp_path)
+    for n in range(10):
+        reader.save_profile(Note(n=n))
+    compactor = make_manager(tmp_path)
+    refresh = reader._refresh_index
+    calls = []
+
+    def refresh_then_compact():
+        refresh()
+        calls.append(1)
+        if len(calls) == 1:
+            compactor.compact()
+
+    reader._refresh_index = refresh_then_compact
+    assert saved(reader) == list(range(10))
+    assert len(calls) == 2
+
+    calls.clear()
+    page, _ = reader.get_profiles_page(limit=4)
+    assert [profile["n"] for profile in page] == [0, 1, 2, 3]
+
+def test_torn_tail_is_truncated(tmp_path):
+    manager = make_manager(tmp_path, segment_max_bytes=4096)
+    for n in range(3):
+        manager.save_profile(Note(n=n))
+    path = segments(tmp_path)[-1]
+    size = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(b'{"id":"torn","created_at":"","da')
+
+    reopened = make_manager(tmp_path, segment_max_bytes=4096)
+    assert os.path.getsize(path) == size
+    reopened.save_profile(Note(n=3))
+    assert saved(make_manager(tmp_path, segment_max_bytes=4096)) == [0, 1, 2, 3]
+
+def test_corrupt_line_is_quarantined_not_truncated(tmp_path):
+    manager = make_manager(tmp_path, segment_max_bytes=4096)
+    manager.save_profile(Note(n=0))
+    path = segments(tmp_path)[-1]
+    with open(path, "ab") as f:
+        f.write(b'{"garbage\n')
+        f.write(b'["not", "a", "record"]\n')
+    manager.save_profile(Note(n=1))
+
+    reopened = make_manager(tmp_path, segment_max_bytes=4096)
+    assert saved(reopened) == [0, 1]
+    with open(reopened.quarantine_file) as f:
+        quarantined = [json.loads(line) for line in f]
+    assert [entry["line"] for entry in quarantined] == ['{"garbage\n', '["not", "a", "record"]\n']
+
+def test_paging(tmp_path):
+    manager = make_manager(tmp_path)
+    for n in range(7):
+        manager.save_profile(Note(n=n))
+
+    pages, cursor = [], None
+    while True:
+        page, cursor = manager.get_profiles_page(limit=3, cursor=cursor)
+        pages.append([profile["n"] for profile in page])
+        if cursor is None:
+            break
+    assert pages == [[0, 1, 2], [3, 4, 5], [6]]
+
+def test_paging_time_range(tmp_path):
+    manager = make_manager(tmp_path)
+    manager.save_profile(Note(n=0))
+    now = datetime.now()
+    page, cursor = manager.get_profiles_page(since=now + timedelta(days=1))
+    assert page == [] and cursor is None
+    page, _ = manager.get_profiles_page(until=now + timedelta(days=1))
+    assert [profile["n"] for profile in page] == [0]
+
+@pytest.mark.parametrize("cursor", ["not a cursor", encode_cursor(1, 2), encode_cursor("a")])
+def test_paging_rejects_bad_cursors(tmp_path, cursor):
+    manager = make_manager(tmp_path)
+    with pytest.raises(ValueError):
+        manager.get_profiles_page(cursor=cursor)
@@ -0,0 +1,74 @@
+import asyncio
+from services.RateLimitedClient import BATCH_PRIORITY, INTERACTIVE_PRIORITY, RateLimiter, current_lane, priority
+
+async def admitted_order(limiter: RateLimiter, waiters, promote=None):
+    """Start `waiters` (name, lane) behind a held slot, optionally promote a lane, and record admission order"""
+    order = []
+
+    async def wait(name, lane):
+        await limiter.acquire(1, lane)
+        order.append(name)
+        await limiter.release()
+
+    await limiter.acquire(1)
+    tasks = []
+    for name, lane in waiters:
+        tasks.append(asyncio.ensure_future(wait(name, lane)))
+        await asyncio.sleep(0)
+    if promote is not None:
+        promote.promote(INTERACTIVE_PRIORITY)
+    await limiter.release()
+    await asyncio.gather(*tasks)
+    return order
+
+def test_interactive_goes_before_earlier_batch():
+    async def scenario():
+        with priority(BATCH_PRIORITY) as batch:
+            pass
+        return await admitted_order(RateLimiter(max_concurrency=1), [("batch", batch), ("interactive", current_lane())])
+    assert asyncio.run(scenario()) == ["interactive", "batch"]
+
+def test_promoted_lane_overtakes_waiting_batch():
+    async def scenario():
+        with priority(BATCH_PRIORITY) as first:
+            pass
+        with priority(BATCH_PRIORITY) as second:
+            pass
+        return await admitted_order(RateLimiter(max_concurrency=1), [("first", first), ("second", second)], promote=second)
+    assert asyncio.run(scenario()) == ["second", "first"]
+
+def test_promoted_lane_overtakes_front_waiting_on_budget():
+    async def scenario():
+        limiter = RateLimiter(requests_per_minute=600)  # One request every 0.1s once the burst is spent
+        for _ in range(600):
+            await limiter.acquire(1)
+            await limiter.release()
+        with priority(BATCH_PRIORITY) as first:
+            pass
+        with priority(BATCH_PRIORITY) as second:
+            pass
+        order = []
+
+        async def wait(name, lane):
+            await limiter.acquire(1, lane)
+            order.append(name)
+            await limiter.release()
+
+        tasks = [asyncio.ensure_future(wait("first", first))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.ensure_future(wait("second", second)))
+        await asyncio.sleep(0)
+        second.promote(INTERACTIVE_PRIORITY)
+        await asyncio.wait_for(asyncio.gather(*tasks), 2)
+        return order
+    assert asyncio.run(scenario()) == ["second", "first"]
+
+def test_priority_lanes_nest_and_reset():
+    assert current_lane().level == INTERACTIVE_PRIORITY
+    with priority(BATCH_PRIORITY) as lane:
+        assert current_lane() is lane
+        lane.promote(INTERACTIVE_PRIORITY)
+        assert lane.level == INTERACTIVE_PRIORITY
+        lane.promote(BATCH_PRIORITY)
+        assert lane.level == INTERACTIVE_PRIORITY  # Never demoted
+    assert current_lane().level == INTERACTIVE_PRIORITY
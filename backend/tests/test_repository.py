@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+import pytest
+from pydantic import BaseModel
+from services.Repository import InMemoryRepository, SQLiteRepository, encode_cursor
+
+class Note(BaseModel):
+    text: str
+    state: str = "open"
+
+class NoteSummary(BaseModel):
+    initial: str
+
+def summarize(note: Note) -> NoteSummary:
+    return NoteSummary(initial=note.text[:1])
+
+def state(note: Note) -> str:
+    return note.state
+
+@pytest.fixture(params=["memory", "sqlite"])
+def repository(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryRepository(Note, summarize, state)
+    return SQLiteRepository(Note, "notes", str(tmp_path / "notes.db"), summarize, state)
+
+START = datetime(2024, 1, 1)
+
+def fill(repository, profile_id="p1", count=5):
+    for i in range(count):
+        repository.add(f"{profile_id}-{i}", Note(text=f"{profile_id} note {i}"), profile_id, START + timedelta(minutes=i))
+
+def walk(repository, descending=False, limit=2, **kwargs):
+    pages, cursor = [], None
+    while True:
+        page, cursor = repository.page_by_profile("p1", limit, cursor, descending=descending, **kwargs)
+        pages.append([note.text[-1] for note in page])
+        if cursor is None:
+            return pages
+
+def test_add_get_update(repository):
+    repository.add("a", Note(text="first"), "p1")
+    assert repository.get("a") == Note(text="first")
+    assert "a" in repository and len(repository) == 1
+    etag = repository.get_etag("a")
+    assert repository.update("a", Note(text="second"))
+    assert repository.get_json("a") == b'{"text":"second","state":"open"}'
+    assert repository.get_etag("a") != etag
+    assert not repository.update("missing", Note(text="x"))
+    assert repository.get("missing") is None
+
+def test_cursor_pagination(repository):
+    fill(repository)
+    assert walk(repository) == [["0", "1"], ["2", "3"], ["4"]]
+    assert walk(repository, descending=True) == [["4", "3"], ["2", "1"], ["0"]]
+
+def test_cursor_pagination_with_equal_timestamps(repository):
+    for i in range(5):
+        repository.add(f"n{i}", Note(text=f"note {i}"), "p1", START)
+    assert walk(repository) == [["0", "1"], ["2", "3"], ["4"]]
+    assert walk(repository, descending=True) == [["4", "3"], ["2", "1"], ["0"]]
+
+def test_pagination_time_range(repository):
+    fill(repository)
+    assert walk(repository, since=START + timedelta(minutes=1), until=START + timedelta(minutes=4)) == [["1", "2"], ["3"]]
+
+def test_page_views_agree(repository):
+    fill(repository)
+    page, cursor = repository.page_json_by_profile("p1", 2)
+    assert page == [repository.get_json("p1-0"), repository.get_json("p1-1")]
+    summaries, summary_cursor = repository.page_summaries_by_profile("p1", 2)
+    assert summaries == [b'{"initial":"p"}'] * 2
+    assert summary_cursor == cursor
+    assert repository.page_etag_by_profile("p1", 2) == repository.page_etag_by_profile("p1", 2)
+    assert repository.page_etag_by_profile("p1", 2) != repository.page_etag_by_profile("p1", 3)
+
+@pytest.mark.parametrize("cursor", ["not a cursor", encode_cursor("a", "b"), encode_cursor(1)])
+def test_bad_cursor(repository, cursor):
+    fill(repository)
+    with pytest.raises(ValueError):
+        repository.page_by_profile("p1", 2, cursor)
+
+def test_delete(repository):
+    fill(repository)
+    assert repository.delete("p1-2")
+    assert not repository.delete("p1-2")
+    assert "p1-2" not in repository
+    assert walk(repository) == [["0", "1"], ["3", "4"]]
+
+def test_delete_by_profile_cascades_only_that_profile(repository):
+    fill(repository, "p1")
+    fill(repository, "p2", count=3)
+    repository.add("loose", Note(text="no profile"))
+
+    assert repository.delete_by_profile("p1") == 5
+    assert repository.list_by_profile("p1") == []
+    assert repository.page_by_profile("p1") == ([], None)
+    assert all(f"p1-{i}" not in repository for i in range(5))
+    assert [note.text for note in repository.list_by_profile("p2")] == ["p2 note 0", "p2 note 1", "p2 note 2"]
+    assert "loose" in repository and len(repository) == 4
+    assert repository.delete_by_profile("p1") == 0
+
+def test_status_index(repository):
+    fill(repository)
+    repository.update("p1-3", Note(text="p1 note 3", state="closed"))
+    repository.update("p1-1", Note(text="p1 note 1", state="closed"))
+    assert [note.text for note in repository.list_by_status("closed")] == ["p1 note 1", "p1 note 3"]
+    assert len(repository.list_by_status("open")) == 3
+    assert repository.list_by_status("missing") == []
+
+    repository.delete("p1-1")
+    assert [note.text for note in repository.list_by_status("closed")] == ["p1 note 3"]
+
+def test_delete_by_status(repository):
+    fill(repository)
+    for i in range(5):
+        repository.update(f"p1-{i}", Note(text=f"p1 note {i}", state="closed"))
+    assert repository.delete_by_status("closed", START + timedelta(minutes=3)) == 3
+    assert repository.delete_by_status("open", START + timedelta(days=1)) == 0
+    assert walk(repository) == [["3", "4"]]
+    assert [note.text for note in repository.list_by_status("closed")] == ["p1 note 3", "p1 note 4"]
+
+def test_status_requires_status_function(tmp_path):
+    for repository in (InMemoryRepository(Note), SQLiteRepository(Note, "notes", str(tmp_path / "notes.db"))):
+        with pytest.raises(TypeError):
+            repository.list_by_status("open")
+        with pytest.raises(TypeError):
+            repository.delete_by_status("open", START)
@@ -0,0 +1,49 @@
+import json
+import os
+import time
+import pytest
+from services.SectionCache import SectionCache
+
+def disk_files(cache):
+    return sorted(name for name in os.listdir(cache.disk_dir) if name.endswith(".json"))
+
+def test_memory_and_disk_tiers(tmp_path):
+    cache = SectionCache(disk_dir=str(tmp_path))
+    key = SectionCache.make_key("overview", {"mood": "sad"})
+    assert cache.get("overview", key) is None
+    cache.set("overview", key, {"text": "hello"})
+    assert cache.get("overview", key) == {"text": "hello"}
+
+    restarted = SectionCache(disk_dir=str(tmp_path))
+    assert restarted.get("overview", key) == {"text": "hello"}
+    assert restarted.stats()["sections"]["overview"] == {"hits": 1, "misses": 0}
+
+@pytest.mark.parametrize("content", ["{\"expires_at\": 1", "{}", "[1, 2]", "{\"expires_at\": \"soon\", \"value\": 1}", "null"])
+def test_unreadable_disk_entries_are_misses_and_removed(tmp_path, content):
+    cache = SectionCache(disk_dir=str(tmp_path))
+    key = SectionCache.make_key("overview", {})
+    with open(os.path.join(str(tmp_path), f"{key}.json"), "w") as f:
+        f.write(content)
+    assert cache.get("overview", key) is None
+    assert disk_files(cache) == []
+
+def test_expired_disk_entries_are_swept(tmp_path):
+    cache = SectionCache(ttl_seconds=60, disk_dir=str(tmp_path))
+    cache.set("overview", "old", 1)
+    cache.set("overview", "new", 2)
+    old_path = os.path.join(str(tmp_path), "old.json")
+    os.utime(old_path, (time.time() - 120, time.time() - 120))
+    assert cache.sweep() == 1
+    assert disk_files(cache) == ["new.json"]
+
+def test_disk_tier_is_bounded(tmp_path):
+    cache = SectionCache(disk_dir=str(tmp_path), max_disk_entries=10)
+    for i in range(25):
+        cache.set("overview", f"key{i:02d}", i)
+        path = os.path.join(str(tmp_path), f"key{i:02d}.json")
+        os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+    assert len(disk_files(cache)) <= 10
+    cache.sweep()
+    assert disk_files(cache) == [f"key{i:02d}.json" for i in range(15, 25)]
+    with open(os.path.join(str(tmp_path), "key24.json")) as f:
+        assert json.load(f)["value"] == 24
@@ -1,11 +1,16 @@
 import streamlit as st
 import requests
+import logging
 from datetime import datetime
 import os
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
+logging.basicConfig(level=logging.INFO)
+
+from services.ApiClient import get_api_client
+from services.GuideHistory import fetch_guide, fetch_guide_history, iter_history
 
 # Configure page
 st.set_page_config(
@@ -22,11 +27,6 @@ if "current_page" not in st.session_state:
     st.session_state.current_page = "home"
 if "assessment_id" not in st.session_state:
     st.session_state.assessment_id = None
-if "guide_history" not in st.session_state:
-    st.session_state.guide_history = []
-
-# API configuration
-API_BASE_URL = "http://localhost:8000/api/v1"
 
 def get_emoji_for_mood(mood: str) -> str:
     emoji_map = {
@@ -99,7 +99,11 @@ def display_profile():
                 "ethnicity": ethnicity
             }
             
-            response = requests.post(f"{API_BASE_URL}/profile", json=profile_data)
+            try:
+                response = get_api_client().post("/profile", json=profile_data)
+            except requests.exceptions.RequestException:
+                st.error("Connection error. Please check if the server is running.")
+                return
             if response.status_code == 200:
                 st.session_state.profile_id = response.json()["profile_id"]
                 st.success("Profile saved successfully!")
@@ -119,16 +123,26 @@ def main():
     # Other pages will be imported from the pages directory
     
     # Display guide history in sidebar if available
-    if st.session_state.guide_history:
+    history = None
+    if st.session_state.profile_id:
+        try:
+            history = fetch_guide_history(st.session_state.profile_id)
+        except requests.exceptions.RequestException:
+            pass
+    if history and history["months"]:
         with st.sidebar:
             st.write("## Your Guide History")
-            for guide in st.session_state.guide_history:
+            for _, _, guide in iter_history(history):
                 with st.expander(f"{get_emoji_for_mood(guide['detected_mood'])} {guide['created_at'][:10]}"):
                     st.write(guide['overview'][:100] + "...")
                     if st.button("View Guide", key=guide['id']):
-                        st.session_state.current_guide = guide
-                        st.session_state.current_page = "guide"
-                        st.rerun()
+                        try:
+                            st.session_state.current_guide = fetch_guide(guide['id'])
+                        except requests.exceptions.RequestException:
+                            st.error("Could not load this guide. Please try again.")
+                        else:
+                            st.session_state.current_page = "guide"
+                            st.rerun()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,5 +1,6 @@
 import streamlit as st
-from datetime import datetime
+import requests
+from services.GuideHistory import latest_guide
 
 def display_navigation_bar():
     """Display the navigation bar with mood and user info"""
@@ -25,13 +26,13 @@ def display_navigation_bar():
 def display_user_section():
     """Display user information and current mood"""
     # Get the most recent guide for mood display
-    if st.session_state.guide_history:
-        latest_guide = max(
-            st.session_state.guide_history,
-            key=lambda x: datetime.fromisoformat(x['created_at'])
-        )
-        mood = latest_guide['detected_mood']
-        emoji = latest_guide['mood_emoji']
+    try:
+        guide = latest_guide(st.session_state.profile_id)
+    except requests.exceptions.RequestException:
+        guide = None
+    if guide:
+        mood = guide['detected_mood']
+        emoji = guide['mood_emoji']
         
         with st.container():
             st.write(f"{emoji} {mood.capitalize()}")
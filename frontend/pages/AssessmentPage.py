@@ -4,6 +4,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 import streamlit as st
 import requests
+import json
+from pages.GuideDisplayPage import display_guide_section
+from services.ApiClient import get_api_client
+from services.GuideHistory import invalidate_guide_history
 from shared.constants import (
     Relationship,
     CauseOfDeath,
@@ -91,10 +95,7 @@ def display_profile_step():
             }
             
             try:
-                response = requests.post(
-                    "http://localhost:8000/api/v1/profile",
-                    json=profile_data
-                )
+                response = get_api_client().post("/profile", json=profile_data)
                 if response.status_code == 200:
                     st.session_state.profile_id = response.json()["profile_id"]
                     st.session_state.assessment_step = 2
@@ -267,45 +268,79 @@ def display_story_step():
                 st.session_state.assessment_step = 4
                 st.rerun()
         with col_submit:
-            if st.form_submit_button("Create Support Guide"):
-                if len(story.strip()) < 50:
-                    st.error("Please share a bit more about your experience (minimum 50 characters)")
-                    return
+            create_guide = st.form_submit_button("Create Support Guide")
+    
+    if create_guide:
+        if len(story.strip()) < 50:
+            st.error("Please share a bit more about your experience (minimum 50 characters)")
+            return
+        
+        st.session_state.temp_assessment["story"] = story
+        
+        try:
+            # Submit assessment
+            response = get_api_client().post(
+                "/assessment",
+                json=st.session_state.temp_assessment,
+                params={"profile_id": st.session_state.profile_id}
+            )
+            
+            if response.status_code == 200:
+                assessment_id = response.json()["assessment_id"]
+                st.session_state.assessment_id = assessment_id
                 
-                st.session_state.temp_assessment["story"] = story
+                guide_id = stream_guide(st.session_state.profile_id, assessment_id)
+                if guide_id is None:
+                    st.error("Error generating your support guide. Please try again.")
+                    return
+                invalidate_guide_history()
                 
-                try:
-                    # Submit assessment
-                    response = requests.post(
-                        "http://localhost:8000/api/v1/assessment",
-                        json=st.session_state.temp_assessment,
-                        params={"profile_id": st.session_state.profile_id}
-                    )
-                    
-                    if response.status_code == 200:
-                        assessment_id = response.json()["assessment_id"]
-                        st.session_state.assessment_id = assessment_id
-                        
-                        # Generate guide
-                        guide_response = requests.post(
-                            "http://localhost:8000/api/v1/generate-guide",
-                            params={
-                                "profile_id": st.session_state.profile_id,
-                                "assessment_id": assessment_id
-                            }
-                        )
-                        
-                        if guide_response.status_code == 200:
-                            guide = guide_response.json()
-                            st.session_state.current_guide = guide
-                            if "guide_history" not in st.session_state:
-                                st.session_state.guide_history = []
-                            st.session_state.guide_history.append(guide)
-                            st.session_state.current_page = "guide"
-                            st.rerun()
-                        else:
-                            st.error("Error generating your support guide. Please try again.")
-                    else:
-                        st.error("Error saving your assessment. Please try again.")
-                except Exception as e:
-                    st.error("Connection error. Please check if the server is running.") 
\ No newline at end of file
+                guide_response = get_api_client().get(f"/guide/{guide_id}")
+                if guide_response.status_code == 200:
+                    guide = guide_response.json()
+                    st.session_state.current_guide = guide
+                    st.session_state.current_page = "guide"
+                    st.rerun()
+                else:
+                    st.error("Error generating your support guide. Please try again.")
+            else:
+                st.error("Error saving your assessment. Please try again.")
+        except requests.exceptions.RequestException:
+            st.error("Connection error. Please check if the server is running.")
+
+def iter_sse_events(response):
+    """Yield (event, data) pairs from a Server-Sent Events response"""
+    event = "message"
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            event = "message"
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            yield event, json.loads(line[len("data:"):].strip())
+
+def stream_guide(profile_id: str, assessment_id: str):
+    """
+    Generate a guide through the streaming endpoint, rendering each section as it arrives.
+    
+    Returns:
+        The id of the persisted guide, or None if generation failed
+    """
+    st.write("### ✨ Creating your support guide...")
+    
+    with get_api_client().stream(
+        "POST",
+        "/generate-guide/stream",
+        params={"profile_id": profile_id, "assessment_id": assessment_id}
+    ) as response:
+        if response.status_code != 200:
+            return None
+        
+        for event, data in iter_sse_events(response):
+            if event == "section":
+                display_guide_section(data["section"], data["data"])
+            elif event == "complete":
+                return data["guide_id"]
+            elif event == "error":
+                return None
+    return None
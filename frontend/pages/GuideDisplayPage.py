@@ -1,32 +1,23 @@
 import streamlit as st
 from datetime import datetime
 
-def display_guide():
-    """Display the generated grief guide"""
-    if "current_guide" not in st.session_state:
-        st.error("No guide to display. Please complete the assessment first.")
-        return
-    
-    guide = st.session_state.current_guide
-    
-    # Header with mood
-    st.write(f"# Your Personal Grief Guide {guide['mood_emoji']}")
-    st.write(f"*Generated on {datetime.fromisoformat(guide['created_at']).strftime('%B %d, %Y')}*")
-    
-    # Overview section
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+def display_overview(overview: str):
+    """Display the overview section"""
     st.write("## Overview")
-    st.write(guide['overview'])
-    
-    # Weekly routine
+    st.write(overview)
+
+def display_weekly_routine(weekly_routine: dict):
+    """Display the weekly routine as one tab per day"""
     st.write("## Your Weekly Routine")
-    days = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
     
-    tab_titles = [day.capitalize() for day in days]
+    tab_titles = [day.capitalize() for day in DAYS]
     tabs = st.tabs(tab_titles)
     
-    for day, tab in zip(days, tabs):
+    for day, tab in zip(DAYS, tabs):
         with tab:
-            activities = guide['weekly_routine'][day]
+            activities = weekly_routine[day]
             if activities:
                 for activity in activities:
                     with st.expander(f"📅 {activity['time_period']}"):
@@ -34,52 +25,95 @@ def display_guide():
                         st.write(activity['description'])
             else:
                 st.info("No specific activities scheduled for this day. Take time for self-care.")
-    
-    # Reflective questions
+
+def display_reflective_questions(reflective_questions: list):
+    """Display the reflective questions section"""
     st.write("## Reflective Questions")
     st.write("Take time to consider these questions when you feel ready.")
     
-    for i, question in enumerate(guide['reflective_questions'], 1):
+    for i, question in enumerate(reflective_questions, 1):
         with st.expander(f"Question {i}: {question['question']}"):
             st.write(f"*{question['context']}*")
             st.write("\nSuggested prompts to consider:")
             for prompt in question['suggested_prompts']:
                 st.write(f"- {prompt}")
-    
-    # Daily recommendations
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.write("### Physical Activity")
-        with st.expander("View Recommendation"):
-            st.write(guide['physical_activity'])
-    
-    with col2:
-        st.write("### Meal Planning")
-        with st.expander("View Recommendation"):
-            st.write(guide['meal_plan'])
-    
-    with col3:
-        st.write("### Evening Ritual")
-        with st.expander("View Recommendation"):
-            st.write(guide['evening_ritual'])
-    
-    # Coping strategies
+
+def display_recommendation(title: str, recommendation: str):
+    """Display one of the daily recommendations"""
+    st.write(f"### {title}")
+    with st.expander("View Recommendation"):
+        st.write(recommendation)
+
+def display_coping_strategies(coping_strategies: list):
+    """Display the recommended coping strategies"""
     st.write("## Recommended Coping Strategies")
-    strategy_cols = st.columns(len(guide['coping_strategies']))
-    for col, strategy in zip(strategy_cols, guide['coping_strategies']):
+    strategy_cols = st.columns(len(coping_strategies))
+    for col, strategy in zip(strategy_cols, coping_strategies):
         with col:
             st.markdown(f"### 🌟\n{strategy}")
-    
-    # Resources
+
+def display_resources(resources: list):
+    """Display the support resources section"""
     st.write("## Support Resources")
-    for resource in guide['resources']:
+    for resource in resources:
         with st.expander(f"{resource['title']} ({resource['category']})"):
             st.write(resource['description'])
             if resource.get('url'):
                 st.write(f"[Learn More]({resource['url']})")
             if resource.get('contact'):
                 st.write(f"Contact: {resource['contact']}")
+
+def display_guide_section(section: str, data):
+    """Display a single guide section as it arrives from the streaming endpoint"""
+    if section == "mood":
+        st.write(f"### {data['emoji']} {data['mood'].capitalize()}")
+    elif section == "overview":
+        display_overview(data)
+    elif section == "weekly_routine":
+        display_weekly_routine(data)
+    elif section == "reflective_questions":
+        display_reflective_questions(data)
+    elif section == "physical_activity":
+        display_recommendation("Physical Activity", data)
+    elif section == "meal_plan":
+        display_recommendation("Meal Planning", data)
+    elif section == "evening_ritual":
+        display_recommendation("Evening Ritual", data)
+    elif section == "coping_strategies":
+        display_coping_strategies(data)
+    elif section == "resources":
+        display_resources(data)
+
+def display_guide():
+    """Display the generated grief guide"""
+    if "current_guide" not in st.session_state:
+        st.error("No guide to display. Please complete the assessment first.")
+        return
+    
+    guide = st.session_state.current_guide
+    
+    # Header with mood
+    st.write(f"# Your Personal Grief Guide {guide['mood_emoji']}")
+    st.write(f"*Generated on {datetime.fromisoformat(guide['created_at']).strftime('%B %d, %Y')}*")
+    
+    display_overview(guide['overview'])
+    display_weekly_routine(guide['weekly_routine'])
+    display_reflective_questions(guide['reflective_questions'])
+    
+    # Daily recommendations
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        display_recommendation("Physical Activity", guide['physical_activity'])
+    
+    with col2:
+        display_recommendation("Meal Planning", guide['meal_plan'])
+    
+    with col3:
+        display_recommendation("Evening Ritual", guide['evening_ritual'])
+    
+    display_coping_strategies(guide['coping_strategies'])
+    display_resources(guide['resources'])
     
     # Navigation buttons
     col1, col2, col3 = st.columns([1, 2, 1])
@@ -91,4 +125,4 @@ def display_guide():
         if st.button("Start New Assessment →"):
             st.session_state.assessment_step = 1
             st.session_state.current_page = "assessment"
-            st.rerun() 
\ No newline at end of file
+            st.rerun()
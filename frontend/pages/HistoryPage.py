@@ -1,30 +1,44 @@
 import streamlit as st
-from datetime import datetime
+import requests
+from services.GuideHistory import fetch_guide, fetch_guide_history, iter_history
+
+def load_history_pages(profile_id: str, pages: int):
+    """Fetch up to `pages` history pages, following their cursors; returns the entries and whether more follow"""
+    entries = []
+    cursor = None
+    for _ in range(pages):
+        history = fetch_guide_history(profile_id, cursor)
+        entries.extend(iter_history(history))
+        cursor = history["next_cursor"]
+        if cursor is None:
+            break
+    return entries, cursor is not None
 
 def display_history():
     """Display the user's guide history"""
     st.write("# Your Journey")
     
-    if not st.session_state.guide_history:
+    if "history_pages" not in st.session_state:
+        st.session_state.history_pages = 1
+    
+    entries, has_more = [], False
+    if st.session_state.profile_id:
+        try:
+            entries, has_more = load_history_pages(st.session_state.profile_id, st.session_state.history_pages)
+        except requests.exceptions.RequestException:
+            st.error("Connection error. Please check if the server is running.")
+            return
+    
+    if not entries:
         st.info("You haven't generated any guides yet. Complete an assessment to get started.")
         if st.button("Start Assessment"):
             st.session_state.current_page = "assessment"
             st.rerun()
         return
     
-    # Sort guides by date (newest first)
-    sorted_guides = sorted(
-        st.session_state.guide_history,
-        key=lambda x: datetime.fromisoformat(x['created_at']),
-        reverse=True
-    )
-    
-    # Group guides by month
+    # Guides arrive newest first and grouped by month
     current_month = None
-    for guide in sorted_guides:
-        guide_date = datetime.fromisoformat(guide['created_at'])
-        month_year = guide_date.strftime("%B %Y")
-        
+    for month_year, day, guide in entries:
         if month_year != current_month:
             st.write(f"## {month_year}")
             current_month = month_year
@@ -34,26 +48,34 @@ def display_history():
             
             with col1:
                 st.write(f"### {guide['mood_emoji']}")
-                st.write(guide_date.strftime("%d %b"))
+                st.write(day)
             
             with col2:
                 with st.expander("View Guide Summary"):
-                    st.write(guide['overview'][:200] + "...")
+                    st.write(guide['overview'] + "...")
                     st.write("---")
                     st.write("### Key Elements:")
-                    st.write("- " + "\n- ".join(guide['coping_strategies'][:3]))
+                    st.write("- " + "\n- ".join(guide['coping_strategies']))
                     
                     if st.button("Open Full Guide", key=guide['id']):
-                        st.session_state.current_guide = guide
-                        st.session_state.current_page = "guide"
-                        st.rerun()
+                        try:
+                            st.session_state.current_guide = fetch_guide(guide['id'])
+                        except requests.exceptions.RequestException:
+                            st.error("Could not load this guide. Please try again.")
+                        else:
+                            st.session_state.current_page = "guide"
+                            st.rerun()
+    
+    if has_more and st.button("Show Older Guides"):
+        st.session_state.history_pages += 1
+        st.rerun()
     
     # Statistics section
     st.write("## Your Progress")
     
     # Calculate mood trends
     mood_counts = {}
-    for guide in sorted_guides:
+    for _, _, guide in entries:
         mood = guide['detected_mood']
         mood_counts[mood] = mood_counts.get(mood, 0) + 1
     
@@ -69,7 +91,7 @@ def display_history():
     
     # Most used coping strategies
     strategy_counts = {}
-    for guide in sorted_guides:
+    for _, _, guide in entries:
         for strategy in guide['coping_strategies']:
             strategy_counts[strategy] = strategy_counts.get(strategy, 0) + 1
     
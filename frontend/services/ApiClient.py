@@ -0,0 +1,77 @@
+import logging
+import os
+import time
+from typing import Optional, Tuple
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "http://localhost:8000/api/v1"
+
+class ApiClient:
+    """
+    Calls to the backend API over one pooled keep-alive session.
+
+    Connections are reused across calls and Streamlit sessions. Failed
+    connects are retried for every method; 429 and 5xx gateway responses
+    only for idempotent ones, so a POST is never sent twice. Every call has
+    a (connect, read) timeout and its latency is logged.
+    """
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, connect_timeout: float = 3.05,
+                 read_timeout: float = 30.0, stream_timeout: float = 120.0,
+                 retries: int = 3, pool_size: int = 20):
+        self.base_url = base_url.rstrip("/")
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        # Between events of a streamed guide, which can wait on a slow section
+        self.stream_timeout: Tuple[float, float] = (connect_timeout, stream_timeout)
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 502, 503, 504),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @classmethod
+    def from_env(cls) -> "ApiClient":
+        """Base URL from API_BASE_URL, timeouts from API_TIMEOUT_SECONDS and API_STREAM_TIMEOUT_SECONDS"""
+        return cls(
+            base_url=os.getenv("API_BASE_URL", DEFAULT_BASE_URL),
+            read_timeout=float(os.getenv("API_TIMEOUT_SECONDS", "30")),
+            stream_timeout=float(os.getenv("API_STREAM_TIMEOUT_SECONDS", "120")),
+            retries=int(os.getenv("API_MAX_RETRIES", "3")),
+            pool_size=int(os.getenv("API_POOL_SIZE", "20"))
+        )
+
+    def request(self, method: str, path: str, timeout: Optional[Tuple[float, float]] = None, **kwargs) -> requests.Response:
+        """Send a request to `path` under the base URL; a streamed response is timed to its headers"""
+        start = time.perf_counter()
+        status = "error"
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", timeout=timeout or self.timeout, **kwargs)
+            status = response.status_code
+            return response
+        finally:
+            logger.info("%s %s -> %s in %.1f ms", method, path, status, (time.perf_counter() - start) * 1000)
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def stream(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Open a streamed response, to be used as a context manager so its connection returns to the pool"""
+        return self.request(method, path, timeout=self.stream_timeout, stream=True, **kwargs)
+
+@st.cache_resource
+def get_api_client() -> ApiClient:
+    """The API client shared by every session of this Streamlit server process"""
+    return ApiClient.from_env()
@@ -0,0 +1,41 @@
+import os
+from typing import Iterator, Optional, Tuple
+import streamlit as st
+from services.ApiClient import get_api_client
+
+HISTORY_TTL_SECONDS = int(os.getenv("GUIDE_HISTORY_TTL_SECONDS", "300"))
+
+@st.cache_data(ttl=HISTORY_TTL_SECONDS, show_spinner=False)
+def fetch_guide_history(profile_id: str, cursor: Optional[str] = None) -> dict:
+    """
+    Get one page of a profile's guide summaries, newest first and grouped by month.
+    
+    Pages are cached per profile and cursor for GUIDE_HISTORY_TTL_SECONDS,
+    so reruns do not refetch them; failed fetches raise and are not cached.
+    """
+    params = {"cursor": cursor} if cursor else {}
+    response = get_api_client().get(f"/guides/profile/{profile_id}/history", params=params)
+    response.raise_for_status()
+    return response.json()
+
+@st.cache_data(ttl=HISTORY_TTL_SECONDS, show_spinner=False)
+def fetch_guide(guide_id: str) -> dict:
+    """Get a full guide, for opening one from its summary"""
+    response = get_api_client().get(f"/guide/{guide_id}")
+    response.raise_for_status()
+    return response.json()
+
+def invalidate_guide_history():
+    """Drop the cached history pages, once a new guide is stored"""
+    fetch_guide_history.clear()
+
+def iter_history(history: dict) -> Iterator[Tuple[str, str, dict]]:
+    """Yield (month label, day label, guide summary) for each guide of a history page, in order"""
+    for month in history["months"]:
+        for entry in month["guides"]:
+            yield month["label"], entry["day"], entry["guide"]
+
+def latest_guide(profile_id: str) -> Optional[dict]:
+    """The summary of the profile's most recent guide, from the cached first history page"""
+    history = fetch_guide_history(profile_id)
+    return history["months"][0]["guides"][0]["guide"] if history["months"] else None